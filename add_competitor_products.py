@@ -5,8 +5,8 @@ print("="*100)
 print("ADDING COMPETITOR PRODUCT DATA TO PHASE 7 OUTPUT")
 print("="*100)
 
-# Load Phase 7 deduplicated data
-phase7_path = r"ibsa-poc-eda\outputs\phase7\IBSA_ModelReady_Enhanced_WithPredictions_DEDUP.csv"
+# Load Phase 7 predictions (unique per NPI)
+phase7_path = r"ibsa-poc-eda\outputs\phase7\IBSA_ModelReady_Enhanced_WithPredictions.csv"
 print(f"\n1. Loading Phase 7 data: {phase7_path}")
 df_phase7 = pd.read_csv(phase7_path)
 print(f"   ✅ Loaded {len(df_phase7):,} HCPs")
@@ -0,0 +1,270 @@
+"""
+Artifact Registry - versioned, hot-swappable serving artifacts
+
+The API's compliance rules, templates, content/FAISS index and trained models
+are loaded together as one immutable version. ArtifactRegistry builds a new
+version in the background (on a source-file change or an admin request) and
+flips a single reference once it is fully loaded:
+
+- requests take a lease on the version that is current when they start and
+  use it to the end, so in-flight requests finish on the old version
+- the old version is closed (engine stopped, pools terminated) only after its
+  last lease is released, or after a drain timeout
+- a failed load is logged and the current version keeps serving
+
+Usage:
+    registry = ArtifactRegistry(load_artifacts, close_artifacts, watched_sources)
+    await registry.reload(force=True)       # initial load
+    registry.start_watching(10.0)           # poll source files
+
+    with registry.lease() as artifacts:     # in a request handler
+        ...
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Generic, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+DEFAULT_DRAIN_SECONDS = 120.0
+DRAIN_POLL_SECONDS = 0.05
+
+
+def sources_fingerprint(sources: Dict[str, Path]) -> str:
+    """Short fingerprint of a set of source files (name, size, mtime; missing files included)"""
+    digest = hashlib.sha1()
+    for name in sorted(sources):
+        try:
+            stat = Path(sources[name]).stat()
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except FileNotFoundError:
+            digest.update(f"{name}:missing;".encode())
+    return digest.hexdigest()[:12]
+
+
+class ArtifactVersion(Generic[T]):
+    """One loaded version of the artifacts plus its lease count"""
+
+    def __init__(self, version: str, value: T, generation: int):
+        self.version = version
+        self.value = value
+        self.generation = generation
+        self.loaded_at = time.time()
+        self.leases = 0
+        self.closed = False  # Set once its closer has been started (never closed twice)
+
+
+class ArtifactRegistry(Generic[T]):
+    """
+    Holds the current artifact version and swaps in new ones atomically
+    """
+
+    def __init__(self, loader: Callable[[], Awaitable[T]],
+                 closer: Optional[Callable[[T], Awaitable[None]]] = None,
+                 sources: Optional[Callable[[], Dict[str, Path]]] = None,
+                 drain_timeout: float = DEFAULT_DRAIN_SECONDS):
+        """
+        Args:
+            loader: Builds a complete new artifact set
+            closer: Releases an artifact set once no request is using it
+            sources: Files the artifacts are built from, by name (for change detection)
+            drain_timeout: Longest wait for in-flight requests before closing an old version
+        """
+        self._loader = loader
+        self._closer = closer
+        self._sources = sources or (lambda: {})
+        self.drain_timeout = drain_timeout
+
+        self._current: Optional[ArtifactVersion[T]] = None
+        self._retiring: List[ArtifactVersion[T]] = []
+        self._retire_tasks: List[asyncio.Task] = []
+        self._lease_lock = threading.Lock()  # Leases are also released from streaming threads
+        self._reload_lock: Optional[asyncio.Lock] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._failed_version: Optional[str] = None
+
+        # Reload statistics (exposed via health checks)
+        self.generation = 0
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def current(self) -> Optional[T]:
+        """Current artifacts (None before the first successful load)"""
+        entry = self._current
+        return entry.value if entry is not None else None
+
+    @property
+    def version(self) -> Optional[str]:
+        entry = self._current
+        return entry.version if entry is not None else None
+
+    def acquire(self) -> ArtifactVersion[T]:
+        """Lease the current version; pair with release()"""
+        with self._lease_lock:
+            entry = self._current
+            if entry is None:
+                raise RuntimeError("No artifacts loaded")
+            entry.leases += 1
+            return entry
+
+    def release(self, entry: ArtifactVersion[T]):
+        with self._lease_lock:
+            entry.leases -= 1
+
+    @contextmanager
+    def lease(self) -> Iterator[T]:
+        """Use the current version for the duration of a request"""
+        entry = self.acquire()
+        try:
+            yield entry.value
+        finally:
+            self.release(entry)
+
+    def sources_changed(self) -> bool:
+        version = sources_fingerprint(self._sources())
+        return version != self.version and version != self._failed_version
+
+    async def reload(self, force: bool = False, reason: str = 'requested') -> bool:
+        """
+        Load a new version and swap it in
+
+        Args:
+            force: Reload even if no source file changed
+            reason: Logged with the reload
+
+        Returns:
+            True if a new version was swapped in
+
+        Raises:
+            Exception: Only when the initial load fails (later failures keep the current version)
+        """
+        if self._reload_lock is None:
+            self._reload_lock = asyncio.Lock()
+
+        async with self._reload_lock:
+            # Fingerprint before loading: a change made mid-load triggers another reload
+            version = sources_fingerprint(self._sources())
+            if not force and self._current is not None and version == self._current.version:
+                return False
+
+            logger.info(f"Loading artifacts {version} ({reason})...")
+            started = time.perf_counter()
+            try:
+                value = await self._loader()
+            except Exception as e:
+                self.failed_reloads += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._failed_version = version
+                if self._current is None:
+                    raise
+                logger.error(f"Artifact reload failed, still serving {self._current.version}: {e}", exc_info=True)
+                return False
+
+            self.generation += 1
+            new = ArtifactVersion(version, value, self.generation)
+            with self._lease_lock:
+                old, self._current = self._current, new
+            self._failed_version = None
+            self.last_error = None
+
+            elapsed = time.perf_counter() - started
+            if old is None:
+                logger.info(f"[OK] Artifacts {version} loaded in {elapsed:.1f}s")
+                return True
+
+            self.reloads += 1
+            logger.info(f"[OK] Swapped artifacts {old.version} -> {version} in {elapsed:.1f}s "
+                        f"({old.leases} requests still on the old version)")
+            self._retiring.append(old)
+            task = asyncio.create_task(self._retire(old))
+            self._retire_tasks.append(task)
+            task.add_done_callback(self._retire_tasks.remove)
+            return True
+
+    async def _retire(self, entry: ArtifactVersion[T]):
+        """Close an old version once its in-flight requests have finished"""
+        deadline = time.monotonic() + self.drain_timeout
+        while entry.leases > 0 and time.monotonic() < deadline:
+            await asyncio.sleep(DRAIN_POLL_SECONDS)
+        if entry.leases > 0:
+            logger.warning(f"Closing artifacts {entry.version} with {entry.leases} requests still running")
+
+        try:
+            await self._close_entry(entry)
+            logger.info(f"[OK] Retired artifacts {entry.version}")
+        except Exception as e:
+            logger.error(f"Failed to close artifacts {entry.version}: {e}", exc_info=True)
+        finally:
+            if entry in self._retiring:  # close() may already have taken it
+                self._retiring.remove(entry)
+
+    async def _close_entry(self, entry: ArtifactVersion[T]):
+        """Run the closer for a version at most once"""
+        if entry.closed:
+            return
+        entry.closed = True
+        if self._closer is not None:
+            await self._closer(entry.value)
+
+    async def watch(self, interval: float):
+        """Poll the source files and reload when any of them changes"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if self.sources_changed():
+                    await self.reload(reason='source files changed')
+            except Exception as e:
+                logger.error(f"Artifact watcher error: {e}", exc_info=True)
+
+    def start_watching(self, interval: float):
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self.watch(interval))
+
+    async def close(self):
+        """Stop watching and close every loaded version"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+        # Let cancelled retire tasks finish unwinding before taking over their versions
+        tasks = list(self._retire_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        entries = self._retiring + ([self._current] if self._current is not None else [])
+        self._retiring, self._current = [], None
+        for entry in entries:
+            try:
+                await self._close_entry(entry)  # Skips versions a retire task already closed
+            except Exception as e:
+                logger.error(f"Failed to close artifacts {entry.version}: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """Registry state for health checks"""
+        entry = self._current
+        return {
+            'version': entry.version if entry else None,
+            'generation': entry.generation if entry else 0,
+            'loaded_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(entry.loaded_at)) if entry else None,
+            'active_requests': entry.leases if entry else 0,
+            'retiring_versions': [old.version for old in self._retiring],
+            'reloads': self.reloads,
+            'failed_reloads': self.failed_reloads,
+            'last_error': self.last_error,
+            'watching': self._watcher is not None and not self._watcher.done()
+        }
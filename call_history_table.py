@@ -0,0 +1,267 @@
+"""
+Call History Table - NPI-indexed columnar side table for CRM call history
+
+Replaces the per-HCP JSON blobs Phase 7 used to embed in every predictions
+row. Calls are stored once, sorted by NPI (calls of one NPI newest first),
+with an offsets index, so "last N calls for NPI X" is a binary search plus a
+contiguous range read:
+
+    call_history/
+        calls.parquet        # all call columns, fixed-size row groups
+        npis.npy             # sorted unique NPIs
+        offsets.npy          # calls of npis[i] are rows offsets[i]:offsets[i+1]
+        last_call_date.npy   # most recent call date per NPI
+        manifest.json
+
+The top-N-calls-per-HCP trimming reduce_call_history.py used to do is the
+max_calls_per_hcp parameter of build().
+
+Usage:
+    table = CallHistoryTable.open_or_build('ibsa-poc-eda/data/call_history.csv',
+                                           'ibsa-poc-eda/data/call_history')
+    table.calls('1234567', last_n=3)           # DataFrame, newest first
+    table.call_counts(chunk['NPI'].to_numpy()) # vectorized per-row counts
+"""
+
+import json
+import logging
+import shutil
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+TABLE_VERSION = 1
+ROW_GROUP_ROWS = 16384
+ROW_GROUP_CACHE = 8  # Decoded row groups kept for repeated range reads
+NPI_COLUMN = 'npi'
+DATE_COLUMN = 'call_date'
+
+
+def _clean_npis(values) -> np.ndarray:
+    return pd.Series(values).astype(str).str.strip().str.replace(r'\.0$', '', regex=True).to_numpy(dtype=str)
+
+
+def trim_calls(calls: pd.DataFrame, max_calls_per_hcp: Optional[int] = None) -> pd.DataFrame:
+    """
+    Calls sorted by NPI, newest first within each NPI, optionally keeping the
+    most recent max_calls_per_hcp per NPI
+    """
+    calls = calls.copy()
+    calls[NPI_COLUMN] = _clean_npis(calls[NPI_COLUMN])
+    calls[DATE_COLUMN] = pd.to_datetime(calls[DATE_COLUMN], errors='coerce').dt.strftime('%Y-%m-%d')
+
+    # Stable sort: NPI ascending, date descending (missing dates last)
+    calls = calls.sort_values([NPI_COLUMN, DATE_COLUMN], ascending=[True, False],
+                              na_position='last', kind='mergesort')
+    if max_calls_per_hcp is not None:
+        calls = calls[calls.groupby(NPI_COLUMN, sort=False).cumcount() < max_calls_per_hcp]
+    return calls.reset_index(drop=True)
+
+
+class CallHistoryTable:
+    """
+    Read side of the call history table (index memory-mapped, calls read by range)
+    """
+
+    def __init__(self, table_dir: Union[str, Path]):
+        if not HAS_PYARROW:
+            raise ImportError("pyarrow is required for the call history table: pip install pyarrow")
+        self.table_dir = Path(table_dir)
+        with open(self.table_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('version') != TABLE_VERSION:
+            raise ValueError(f"Call history table version {self.manifest.get('version')} is not supported "
+                             f"(expected {TABLE_VERSION}). Rebuild the table.")
+
+        self.npis = np.load(self.table_dir / 'npis.npy', mmap_mode='r')
+        self.offsets = np.load(self.table_dir / 'offsets.npy', mmap_mode='r')
+        self.last_call_date = np.load(self.table_dir / 'last_call_date.npy', mmap_mode='r')
+        self.row_group_rows = int(self.manifest['row_group_rows'])
+        self.columns: List[str] = self.manifest['columns']
+        self._file = pq.ParquetFile(self.table_dir / 'calls.parquet')
+        self._row_groups: 'OrderedDict[int, pd.DataFrame]' = OrderedDict()
+        self._frame: Optional[pd.DataFrame] = None
+
+    def __len__(self) -> int:
+        return len(self.npis)
+
+    def __contains__(self, npi: Any) -> bool:
+        return bool(self._lookup(np.array([npi]))[1][0])
+
+    @property
+    def total_calls(self) -> int:
+        return int(self.offsets[-1]) if len(self.offsets) else 0
+
+    def _lookup(self, npis) -> tuple:
+        """(positions in self.npis, found mask) for an array of NPIs"""
+        keys = _clean_npis(npis)
+        if len(self.npis) == 0:
+            return np.zeros(len(keys), dtype=np.intp), np.zeros(len(keys), dtype=bool)
+        positions = np.searchsorted(self.npis, keys)
+        clipped = np.minimum(positions, len(self.npis) - 1)
+        found = (positions < len(self.npis)) & (np.asarray(self.npis[clipped]) == keys)
+        return clipped, found
+
+    def call_counts(self, npis) -> np.ndarray:
+        """Number of calls per NPI (0 where the NPI has none)"""
+        positions, found = self._lookup(npis)
+        counts = np.asarray(self.offsets[positions + 1]) - np.asarray(self.offsets[positions])
+        return np.where(found, counts, 0)
+
+    def last_call_dates(self, npis) -> np.ndarray:
+        """Most recent call date per NPI (None where the NPI has no calls)"""
+        positions, found = self._lookup(npis)
+        dates = np.asarray(self.last_call_date[positions]).astype(object)
+        dates[~found | (dates == '')] = None
+        return dates
+
+    def _row_group(self, index: int) -> pd.DataFrame:
+        frame = self._row_groups.get(index)
+        if frame is None:
+            frame = self._file.read_row_group(index).to_pandas()
+            self._row_groups[index] = frame
+            if len(self._row_groups) > ROW_GROUP_CACHE:
+                self._row_groups.popitem(last=False)
+        else:
+            self._row_groups.move_to_end(index)
+        return frame
+
+    def _read_rows(self, start: int, end: int) -> pd.DataFrame:
+        if end <= start:
+            return pd.DataFrame(columns=self.columns)
+        if self._frame is not None:
+            return self._frame.iloc[start:end]
+        first, last = start // self.row_group_rows, (end - 1) // self.row_group_rows
+        parts = [self._row_group(i) for i in range(first, last + 1)]
+        frame = parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+        base = first * self.row_group_rows
+        return frame.iloc[start - base:end - base]
+
+    def calls(self, npi: Any, last_n: Optional[int] = None) -> pd.DataFrame:
+        """Calls for one NPI, newest first (the last_n most recent if given)"""
+        positions, found = self._lookup(np.array([npi]))
+        if not found[0]:
+            return pd.DataFrame(columns=self.columns)
+        start, end = int(self.offsets[positions[0]]), int(self.offsets[positions[0] + 1])
+        if last_n is not None:
+            end = min(end, start + last_n)
+        return self._read_rows(start, end).reset_index(drop=True)
+
+    def records(self, npi: Any, last_n: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.calls(npi, last_n).to_dict('records')
+
+    def json_column(self, npis: Sequence[Any]) -> List[str]:
+        """
+        Per-row JSON call lists for legacy consumers that still expect call_history_json
+
+        Loads the whole table once (it is only used for the legacy CSV export).
+        """
+        if self._frame is None:
+            self._frame = self._file.read().to_pandas()
+        positions, found = self._lookup(npis)
+        out = []
+        for position, has_calls in zip(positions, found):
+            if not has_calls:
+                out.append('[]')
+                continue
+            start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+            out.append(json.dumps(self._frame.iloc[start:end].to_dict('records')))
+        return out
+
+    def is_stale(self, source_file: Union[str, Path]) -> bool:
+        """True if the source CSV changed since the table was built"""
+        stat = Path(source_file).stat()
+        return (self.manifest.get('source_size') != stat.st_size
+                or self.manifest.get('source_mtime_ns') != stat.st_mtime_ns)
+
+    @classmethod
+    def build(cls, calls: pd.DataFrame, table_dir: Union[str, Path],
+              max_calls_per_hcp: Optional[int] = None,
+              source_file: Optional[Union[str, Path]] = None) -> 'CallHistoryTable':
+        """
+        Write the table from a calls DataFrame (needs at least npi and call_date)
+
+        Args:
+            calls: One row per call
+            table_dir: Output directory (replaced atomically)
+            max_calls_per_hcp: Keep only the most recent N calls per NPI
+            source_file: CSV the calls came from (recorded for staleness checks)
+        """
+        if not HAS_PYARROW:
+            raise ImportError("pyarrow is required for the call history table: pip install pyarrow")
+        table_dir = Path(table_dir)
+        calls = trim_calls(calls, max_calls_per_hcp)
+
+        npi_values = calls[NPI_COLUMN].to_numpy(dtype=str)
+        if len(npi_values):
+            starts = np.flatnonzero(np.r_[True, npi_values[1:] != npi_values[:-1]])
+        else:
+            starts = np.array([], dtype=np.int64)
+        npis = npi_values[starts]
+        offsets = np.r_[starts, len(npi_values)].astype(np.int64)
+        last_call_date = calls[DATE_COLUMN].fillna('').to_numpy(dtype=str)[starts]
+
+        tmp_dir = table_dir.with_name(f".{table_dir.name}.{uuid.uuid4().hex}.tmp")
+        tmp_dir.mkdir(parents=True)
+        try:
+            pq.write_table(pa.Table.from_pandas(calls, preserve_index=False), tmp_dir / 'calls.parquet',
+                           row_group_size=ROW_GROUP_ROWS, compression='zstd', write_statistics=True)
+            np.save(tmp_dir / 'npis.npy', npis.astype(str), allow_pickle=False)
+            np.save(tmp_dir / 'offsets.npy', offsets, allow_pickle=False)
+            np.save(tmp_dir / 'last_call_date.npy', last_call_date.astype(str), allow_pickle=False)
+
+            manifest = {
+                'version': TABLE_VERSION,
+                'rows': int(len(calls)),
+                'npis': int(len(npis)),
+                'columns': list(calls.columns),
+                'row_group_rows': ROW_GROUP_ROWS,
+                'max_calls_per_hcp': max_calls_per_hcp
+            }
+            if source_file is not None:
+                stat = Path(source_file).stat()
+                manifest.update(source=str(source_file), source_size=stat.st_size,
+                                source_mtime_ns=stat.st_mtime_ns)
+            with open(tmp_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+
+            old_dir = table_dir.with_name(f".{table_dir.name}.{uuid.uuid4().hex}.old")
+            if table_dir.exists():
+                table_dir.rename(old_dir)
+            tmp_dir.rename(table_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        logger.info(f"Call history table: {len(calls):,} calls for {len(npis):,} NPIs -> {table_dir}")
+        return cls(table_dir)
+
+    @classmethod
+    def open_or_build(cls, source_file: Union[str, Path], table_dir: Union[str, Path],
+                      max_calls_per_hcp: Optional[int] = None) -> 'CallHistoryTable':
+        """Open the table, (re)building it from the calls CSV if it is missing or stale"""
+        table_dir = Path(table_dir)
+        if (table_dir / 'manifest.json').exists():
+            try:
+                table = cls(table_dir)
+                if not table.is_stale(source_file) and table.manifest.get('max_calls_per_hcp') == max_calls_per_hcp:
+                    return table
+            except ValueError as e:
+                logger.info(f"Rebuilding call history table: {e}")
+
+        calls = pd.read_csv(source_file, dtype={NPI_COLUMN: str})
+        return cls.build(calls, table_dir, max_calls_per_hcp, source_file=source_file)
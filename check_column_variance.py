@@ -1,8 +1,8 @@
 import pandas as pd
 import numpy as np
 
-# Load the deduplicated CSV
-csv_path = r"ibsa-poc-eda\outputs\phase7\IBSA_ModelReady_Enhanced_WithPredictions_DEDUP.csv"
+# Load the Phase 7 predictions CSV (unique per NPI)
+csv_path = r"ibsa-poc-eda\outputs\phase7\IBSA_ModelReady_Enhanced_WithPredictions.csv"
 print(f"Loading data from: {csv_path}")
 
 df = pd.read_csv(csv_path)
@@ -1,7 +1,7 @@
 import pandas as pd
 
-# Load the CSV
-csv_path = r"ibsa-poc-eda\outputs\phase7\IBSA_ModelReady_Enhanced_WithPredictions_DEDUP.csv"
+# Load the Phase 7 predictions CSV (one row per PrescriberId)
+csv_path = r"ibsa-poc-eda\outputs\phase7\IBSA_ModelReady_Enhanced_WithPredictions.csv"
 df = pd.read_csv(csv_path, nrows=1)
 
 print("="*100)
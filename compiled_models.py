@@ -0,0 +1,159 @@
+"""
+Compiled Models - native-code inference backend for the tree ensembles (optional)
+
+Compiles a trained sklearn RandomForest / ExtraTrees / DecisionTree or LightGBM
+model into a shared library with treelite + tl2cgen: every tree becomes nested
+C if/else code, so scoring a row is a straight run of native comparisons with
+no Python-level (or numpy-gather) traversal. The library is loaded with the
+system loader, so its code pages are shared between processes the same way
+the model pool's memory-mapped arrays are.
+
+CompiledTreeModel exposes the predict / predict_proba / classes_ /
+n_features_in_ surface the inference engine and score_model use. Compilation
+and parity checks against the original model are driven by ModelPool
+(model_pool.py); this module only knows how to build and load a library.
+
+Requires (optional):
+    pip install treelite tl2cgen
+plus a C toolchain (gcc / clang, or MSVC on Windows). Without them
+HAS_TREELITE is False and ModelPool falls back to the packed backend.
+"""
+
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import treelite
+    import tl2cgen
+    HAS_TREELITE = True
+except ImportError:
+    HAS_TREELITE = False
+
+if sys.platform == 'win32':
+    LIBRARY_NAME, DEFAULT_TOOLCHAIN = 'model.dll', 'msvc'
+elif sys.platform == 'darwin':
+    LIBRARY_NAME, DEFAULT_TOOLCHAIN = 'model.dylib', 'clang'
+else:
+    LIBRARY_NAME, DEFAULT_TOOLCHAIN = 'model.so', 'gcc'
+
+MAX_PARALLEL_COMP = 8  # Source files the generated C is split into (compile in parallel)
+
+
+def _is_supported(model: Any) -> bool:
+    if hasattr(model, 'booster_'):
+        return True
+    if getattr(model, 'n_outputs_', 1) != 1:
+        return False
+    return hasattr(model, 'tree_') or (hasattr(model, 'estimators_') and hasattr(model, 'n_estimators'))
+
+
+def _import_model(model: Any, work_dir: Path):
+    """treelite model for a LightGBM or sklearn tree ensemble"""
+    if hasattr(model, 'booster_'):
+        model_path = work_dir / 'lightgbm_model.txt'
+        model.booster_.save_model(str(model_path))
+        return treelite.frontend.load_lightgbm_model(str(model_path))
+    return treelite.sklearn.import_model(model)
+
+
+class CompiledTreeModel:
+    """
+    A tree ensemble compiled to native code, with the sklearn prediction surface
+    """
+
+    def __init__(self, directory: Path, meta: Dict[str, Any], nthread: Optional[int] = None):
+        self.directory = Path(directory)
+        self.meta = meta
+        self.kind = meta['kind']  # 'classifier' or 'regressor'
+        self.n_features_in_ = int(meta['n_features'])
+        self.input_dtype = np.dtype(meta['input_dtype'])
+        self.source_class = meta.get('source_class', '')
+        if self.kind == 'classifier':
+            self.classes_ = np.asarray(meta['classes'])
+        self._predictor = tl2cgen.Predictor(str(self.directory / meta['library']), nthread=nthread)
+
+    def __repr__(self) -> str:
+        return f"CompiledTreeModel({self.source_class}, features={self.n_features_in_})"
+
+    def _raw(self, X: np.ndarray) -> np.ndarray:
+        """Model outputs, shape (rows, outputs): class probabilities or the regression value"""
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected a (rows, {self.n_features_in_}) matrix, got {X.shape}")
+        # Same rounding as the source library (sklearn compares float32 inputs), then the
+        # float64 the compiled thresholds use
+        X = np.ascontiguousarray(X.astype(self.input_dtype, copy=False), dtype=np.float64)
+
+        out = np.asarray(self._predictor.predict(tl2cgen.DMatrix(X, dtype='float64')), dtype=np.float64)
+        out = out.reshape(X.shape[0], -1)
+        if self.kind == 'classifier' and out.shape[1] == 1:
+            out = np.hstack([1.0 - out, out])  # Binary objectives output P(class 1) only
+        return out
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.kind != 'classifier':
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._raw(X)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        raw = self._raw(X)
+        if self.kind == 'classifier':
+            return self.classes_[np.argmax(raw, axis=1)]
+        return raw[:, 0]
+
+    @classmethod
+    def load(cls, directory: Path, nthread: Optional[int] = None) -> 'CompiledTreeModel':
+        directory = Path(directory)
+        with open(directory / 'compiled.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(directory, meta, nthread=nthread)
+
+
+def compile_model(model: Any, directory: Path,
+                  toolchain: str = DEFAULT_TOOLCHAIN) -> Optional[CompiledTreeModel]:
+    """
+    Compile a tree ensemble into directory (library + compiled.json)
+
+    Returns:
+        The loaded compiled model, or None if the model type is not supported
+        or treelite is not installed
+    """
+    if not HAS_TREELITE or not _is_supported(model):
+        return None
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    tl_model = _import_model(model, directory)
+    tl2cgen.export_lib(
+        tl_model,
+        toolchain=toolchain,
+        libpath=str(directory / LIBRARY_NAME),
+        params={'parallel_comp': max(1, min(os.cpu_count() or 1, MAX_PARALLEL_COMP))},
+        verbose=False
+    )
+
+    is_classifier = hasattr(model, 'classes_')
+    meta = {
+        'kind': 'classifier' if is_classifier else 'regressor',
+        'library': LIBRARY_NAME,
+        'n_features': int(model.n_features_in_),
+        # sklearn trees split on float32 inputs; LightGBM on float64
+        'input_dtype': 'float64' if hasattr(model, 'booster_') else 'float32',
+        'source_class': type(model).__name__,
+        'treelite_version': getattr(treelite, '__version__', 'unknown'),
+        'toolchain': toolchain
+    }
+    if is_classifier:
+        meta['classes'] = np.asarray(model.classes_).tolist()
+    with open(directory / 'compiled.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    return CompiledTreeModel(directory, meta)
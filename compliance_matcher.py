@@ -0,0 +1,147 @@
+"""
+Compliance Matcher - single-pass multi-phrase matching for ComplianceChecker
+
+Builds an Aho-Corasick automaton once from every phrase the compliance checks
+look for (prohibited terms, off-label indicators, product names, fair-balance
+keywords, section markers) and scans a script exactly once, reporting every
+occurrence - including overlapping ones - with its character offsets into
+the original text (also when lower-casing changes the text's length).
+
+Each phrase carries one or more roles. A role decides the boundary rule:
+- whole_word=True  - the match must not be preceded or followed by a word
+                     character ("cure" does not match "secure" or "cures")
+- whole_word=False - only the start must be on a word boundary, so stems
+                     match inflections ("risk" matches "risks")
+
+Boundaries are checked against the surrounding characters rather than with
+regex \b, so phrases that start or end with punctuation ("#1", "100%
+effective") behave the same as plain words.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class PhraseRole:
+    """What a phrase means to the checker (e.g. kind='prohibited', label='cure')"""
+    kind: str
+    label: str
+    whole_word: bool = True
+
+
+@dataclass(frozen=True)
+class PhraseMatch:
+    """One occurrence of a phrase in the scanned text"""
+    start: int
+    end: int
+    role: PhraseRole
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _lowered(text: str) -> Tuple[str, Optional[List[int]]]:
+    """
+    Lower-cased text plus, if lower-casing changed its length (e.g. 'İ' -> 'i̇'),
+    the original index of every lowered character (None when they line up)
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered, None
+    chars, origin = [], []
+    for j, ch in enumerate(text):
+        low = ch.lower()
+        chars.append(low)
+        origin.extend([j] * len(low))
+    return ''.join(chars), origin
+
+
+class PhraseMatcher:
+    """
+    Case-insensitive Aho-Corasick matcher over a fixed phrase set
+
+    Usage:
+        matcher = PhraseMatcher()
+        matcher.add('weight loss', PhraseRole('prohibited', 'weight loss'))
+        matcher.build()
+        for match in matcher.scan(text): ...
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._phrases: List[List[Tuple[int, PhraseRole]]] = [[]]  # (phrase length, role) ending at each state
+        self._output: List[List[Tuple[int, PhraseRole]]] = [[]]  # Including suffix phrases (after build)
+        self._built = False
+
+    def __len__(self) -> int:
+        return sum(len(phrases) for phrases in self._phrases)
+
+    def add(self, phrase: str, role: PhraseRole):
+        """Register a phrase (matched case-insensitively) with a role"""
+        phrase = phrase.lower()
+        if not phrase:
+            return
+
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._phrases.append([])
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._phrases[state].append((len(phrase), role))
+        self._built = False
+
+    def build(self):
+        """Compute failure links (breadth-first); call after the last add()"""
+        self._output = [list(phrases) for phrases in self._phrases]
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                # Inherit the outputs of the longest proper suffix state
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+        self._built = True
+
+    def scan(self, text: str) -> Iterator[PhraseMatch]:
+        """Yield every boundary-respecting phrase occurrence in one pass over text"""
+        if not self._built:
+            self.build()
+
+        text, origin = _lowered(text)
+        n = len(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            for length, role in output[state]:
+                start = i - length + 1
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                if role.whole_word and i + 1 < n and _is_word_char(text[i + 1]) and _is_word_char(text[i]):
+                    continue
+                if origin is None:
+                    yield PhraseMatch(start, i + 1, role)
+                else:
+                    yield PhraseMatch(origin[start], origin[i] + 1, role)
@@ -0,0 +1,172 @@
+"""
+Approved Content Index - O(1) lookups into the MLR-approved content library
+
+Indexes compliance_approved_content.json (Phase 6B) by (product, category) and
+by content_id. Every item's approval is parsed once into ApprovalMetadata;
+lookups skip items whose approval has expired (checked at lookup time, so
+content expires mid-run without a rebuild). is_current() applies the same
+policy to items served from elsewhere (the vector index's semantic search).
+
+The index watches the library file. When it changes, a complete new snapshot
+is built and swapped in with a single reference assignment, so a lookup only
+ever sees the old or the new library, never a half-built one.
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from phase6b_compliance_content_library import ApprovalMetadata
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL_SECONDS = 5.0
+
+_APPROVAL_FIELDS = {f.name for f in fields(ApprovalMetadata)}
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Immutable index over one version of the library file"""
+    items: List[Dict[str, Any]]
+    by_key: Dict[Tuple[str, str], List[int]]  # (product lower, category) -> item positions, file order
+    by_id: Dict[str, int]
+    approvals: List[Optional[ApprovalMetadata]]
+    expires: List[Optional[datetime]]  # None = no usable approval
+    file_stat: Tuple[int, int]
+
+
+def _parse_approval(item: Dict[str, Any]) -> Tuple[Optional[ApprovalMetadata], Optional[datetime]]:
+    approval = item.get('approval') or {}
+    try:
+        metadata = ApprovalMetadata(**{k: v for k, v in approval.items() if k in _APPROVAL_FIELDS})
+        return metadata, datetime.fromisoformat(metadata.expires_at)
+    except (TypeError, ValueError):
+        return None, None
+
+
+class ApprovedContentIndex:
+    """Expiry-aware content lookups by (product, category) and content_id"""
+
+    def __init__(self, library_path: Union[str, Path], include_expired: bool = False):
+        """
+        Args:
+            library_path: compliance_approved_content.json
+            include_expired: Also return content whose approval has expired
+        """
+        self.library_path = Path(library_path)
+        self.include_expired = include_expired
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()  # Serialises rebuilds only; lookups never take it
+        self._last_check = 0.0
+        self.version = 0
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self._snapshot.items) if self._snapshot else 0
+
+    def _file_stat(self) -> Tuple[int, int]:
+        try:
+            stat = self.library_path.stat()
+        except FileNotFoundError:
+            return (-1, -1)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _rebuild(self):
+        file_stat = self._file_stat()
+        items: List[Dict[str, Any]] = []
+        if file_stat[0] >= 0:
+            with open(self.library_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            items = data.get('content', []) if isinstance(data, dict) else data
+
+        by_key: Dict[Tuple[str, str], List[int]] = {}
+        by_id: Dict[str, int] = {}
+        approvals, expires = [], []
+        for i, item in enumerate(items):
+            by_key.setdefault((item.get('product', '').lower(), item.get('category', '')), []).append(i)
+            if item.get('content_id'):
+                by_id.setdefault(item['content_id'], i)
+            approval, expiry = _parse_approval(item)
+            approvals.append(approval)
+            expires.append(expiry)
+
+        self._snapshot = _Snapshot(items, by_key, by_id, approvals, expires, file_stat)
+        self.version += 1
+
+        usable = self.usable_count()
+        logger.info(f"Approved content index v{self.version}: {len(items)} items, "
+                    f"{usable} with a current approval")
+        if items and usable == 0:
+            logger.error(f"No content in {self.library_path.name} has a current MLR approval - "
+                         f"every lookup will return the fallback until the library is re-approved")
+
+    def refresh(self, force: bool = False):
+        """Rebuild if the library file changed (stat check, rate-limited)"""
+        now = time.monotonic()
+        if not force and now - self._last_check < REFRESH_INTERVAL_SECONDS:
+            return
+        self._last_check = now
+
+        if self._snapshot is not None and self._file_stat() == self._snapshot.file_stat:
+            return
+        with self._lock:
+            if self._snapshot is None or self._file_stat() != self._snapshot.file_stat:
+                logger.info(f"{self.library_path.name} changed - rebuilding content index")
+                self._rebuild()
+
+    def _usable(self, snapshot: _Snapshot, position: int) -> bool:
+        if self.include_expired:
+            return True
+        expiry = snapshot.expires[position]
+        return expiry is not None and datetime.now() <= expiry
+
+    def is_current(self, item: Dict[str, Any]) -> bool:
+        """True if an item (matched by content_id, else by its own approval) may be served"""
+        if self.include_expired:
+            return True
+        snapshot = self._snapshot
+        position = snapshot.by_id.get(item.get('content_id')) if item.get('content_id') else None
+        if position is not None:
+            return self._usable(snapshot, position)
+        expiry = _parse_approval(item)[1]
+        return expiry is not None and datetime.now() <= expiry
+
+    def usable_count(self) -> int:
+        """Number of items that can currently be served"""
+        snapshot = self._snapshot
+        return sum(1 for position in range(len(snapshot.items)) if self._usable(snapshot, position))
+
+    def lookup(self, product: str, category: str) -> Optional[Dict[str, Any]]:
+        """First approved (unexpired) item for a product/category, in library order"""
+        self.refresh()
+        snapshot = self._snapshot
+        for position in snapshot.by_key.get((product.lower(), category), ()):
+            if self._usable(snapshot, position):
+                return snapshot.items[position]
+        return None
+
+    def get_content(self, product: str, category: str) -> str:
+        """Approved content text for a product/category ('' if none is approved)"""
+        item = self.lookup(product, category)
+        return item.get('content', '') if item else ''
+
+    def get_by_id(self, content_id: str) -> Optional[Dict[str, Any]]:
+        """Item by content_id, or None if unknown or its approval has expired"""
+        self.refresh()
+        snapshot = self._snapshot
+        position = snapshot.by_id.get(content_id)
+        if position is None or not self._usable(snapshot, position):
+            return None
+        return snapshot.items[position]
+
+    def approval(self, content_id: str) -> Optional[ApprovalMetadata]:
+        """Parsed approval metadata for a content_id"""
+        snapshot = self._snapshot
+        position = snapshot.by_id.get(content_id)
+        return snapshot.approvals[position] if position is not None else None
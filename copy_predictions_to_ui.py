@@ -1,46 +1,138 @@
 """
 Copy phase7 predictions to UI data folder with enhanced metadata
 Since PrescriberId is an internal index, we'll use descriptive names based on available metadata
+
+Publishes the same partitioned Parquet dataset Phase 7 writes (see
+prediction_dataset.py), streamed batch by batch, plus the CSV the current UI
+loader reads (PUBLISH_CSV). The CSV rows get the call_history_json column
+the UI detail page parses, rendered by NPI from the call history side table
+(see call_history_table.py); the Parquet dataset does not carry it.
 """
 import pandas as pd
 from pathlib import Path
 
+from call_history_table import HAS_PYARROW as HAS_CALL_HISTORY_TABLE, CallHistoryTable
+from prediction_dataset import HAS_PYARROW, PredictionDatasetWriter, iter_predictions
+
 # Paths
 BASE_DIR = Path(__file__).parent
+PREDICTIONS_DATASET = BASE_DIR / "ibsa-poc-eda" / "outputs" / "phase7" / "IBSA_ModelReady_Enhanced_WithPredictions"
 PREDICTIONS_FILE = BASE_DIR / "ibsa-poc-eda" / "outputs" / "phase7" / "IBSA_ModelReady_Enhanced_WithPredictions.csv"
+OUTPUT_DATASET = BASE_DIR / "ibsa_precall_ui" / "public" / "data" / "IBSA_ModelReady_Enhanced_WithPredictions"
 OUTPUT_FILE = BASE_DIR / "ibsa_precall_ui" / "public" / "data" / "IBSA_ModelReady_Enhanced_WithPredictions.csv"
+PUBLISH_CSV = True  # The Next.js data loader still parses the CSV
+CALL_HISTORY_FILE = BASE_DIR / "ibsa-poc-eda" / "data" / "call_history.csv"
+CALL_HISTORY_TABLE_DIR = BASE_DIR / "ibsa-poc-eda" / "data" / "call_history"
+CALL_HISTORY_COLUMN = 'call_history_json'
+BATCH_ROWS = 50000
 
-print("Loading predictions...")
-df = pd.read_csv(PREDICTIONS_FILE, low_memory=False)
-print(f"✓ Loaded {len(df):,} HCP predictions")
+# Reorder columns - put essential ones first
+ESSENTIAL_COLS = ['NPI', 'PrescriberName', 'Specialty', 'City', 'State', 'Territory', 'Tier',
+                  'TRx_Current', 'flector_trx', 'licart_trx']
 
-# Create a readable PrescriberName from available metadata
-# Format: "Specialty - City, State" for better UX
-df['PrescriberName'] = (df['Specialty'].fillna('Unknown Specialty') + ' - ' + 
-                         df['City'].fillna('Unknown City') + ', ' + 
-                         df['State'].fillna('??'))
+def prepare_for_ui(df):
+    """Readable names, Territory and Tier for one batch of predictions"""
+    # Create a readable PrescriberName from available metadata
+    # Format: "Specialty - City, State" for better UX
+    df['PrescriberName'] = (df['Specialty'].fillna('Unknown Specialty') + ' - ' +
+                             df['City'].fillna('Unknown City') + ', ' +
+                             df['State'].fillna('??'))
 
-# Set Territory to State (since we don't have territory mapping)
-df['Territory'] = df['State'].fillna('Unknown')
+    # Set Territory to State (since we don't have territory mapping)
+    df['Territory'] = df['State'].fillna('Unknown')
 
-# Set default Tier
-df['Tier'] = 'Silver'
+    # Set default Tier
+    df['Tier'] = 'Silver'
 
-# Reorder columns - put essential ones first
-essential_cols = ['NPI', 'PrescriberName', 'Specialty', 'City', 'State', 'Territory', 'Tier', 
-                  'TRx_Current', 'flector_trx', 'licart_trx']
-other_cols = [c for c in df.columns if c not in essential_cols]
-df = df[[c for c in essential_cols if c in df.columns] + other_cols]
+    other_cols = [c for c in df.columns if c not in ESSENTIAL_COLS]
+    return df[[c for c in ESSENTIAL_COLS if c in df.columns] + other_cols]
+
+def read_batches():
+    """Phase 7 predictions in batches (Parquet dataset, or the legacy CSV if that is all there is)"""
+    if HAS_PYARROW and PREDICTIONS_DATASET.exists():
+        print(f"Loading predictions from {PREDICTIONS_DATASET}...")
+        return iter_predictions(PREDICTIONS_DATASET, batch_rows=BATCH_ROWS)
+    print(f"Loading predictions from {PREDICTIONS_FILE}...")
+    return pd.read_csv(PREDICTIONS_FILE, chunksize=BATCH_ROWS, low_memory=False)
+
+def load_call_history():
+    """The call history side table Phase 7 builds, or None if it is unavailable"""
+    if not HAS_CALL_HISTORY_TABLE:
+        print("⚠️ pyarrow not installed - publishing call_history_json from the predictions file only")
+        return None
+    if not CALL_HISTORY_FILE.exists() and not (CALL_HISTORY_TABLE_DIR / 'manifest.json').exists():
+        print(f"⚠️ Call history not found: {CALL_HISTORY_FILE}")
+        return None
+    try:
+        if CALL_HISTORY_FILE.exists():
+            return CallHistoryTable.open_or_build(CALL_HISTORY_FILE, CALL_HISTORY_TABLE_DIR)
+        return CallHistoryTable(CALL_HISTORY_TABLE_DIR)
+    except Exception as e:
+        print(f"⚠️ Could not load call history: {e}")
+        return None
+
+def with_call_history(df, call_history):
+    """CSV rows with call_history_json filled by NPI ('[]' for HCPs without calls)"""
+    if call_history is not None:
+        return df.assign(**{CALL_HISTORY_COLUMN: call_history.json_column(df['NPI'])})
+    if CALL_HISTORY_COLUMN in df.columns:
+        return df.assign(**{CALL_HISTORY_COLUMN: df[CALL_HISTORY_COLUMN].fillna('[]')})
+    return df.assign(**{CALL_HISTORY_COLUMN: '[]'})
+
+def main():
+    dataset_writer = PredictionDatasetWriter(OUTPUT_DATASET) if HAS_PYARROW else None
+    if dataset_writer is None:
+        print("⚠️ pyarrow not installed - publishing the CSV only")
+    csv_tmp = OUTPUT_FILE.with_name(OUTPUT_FILE.name + '.tmp')
+    csv_file = open(csv_tmp, 'w', newline='', encoding='utf-8') if PUBLISH_CSV or dataset_writer is None else None
+    call_history = load_call_history() if csv_file is not None else None
+    if call_history is not None:
+        print(f"✓ Call history for {len(call_history):,} NPIs ({call_history.total_calls:,} calls)")
+
+    rows = 0
+    columns = None
+    sample = None
+    try:
+        for batch in read_batches():
+            df = prepare_for_ui(batch)
+            if columns is None:
+                columns = list(df.columns)
+                sample = df.head(5)
+            else:
+                df = df.reindex(columns=columns)
+
+            if dataset_writer is not None:
+                dataset_writer.write(df.drop(columns=[CALL_HISTORY_COLUMN], errors='ignore'))
+            if csv_file is not None:
+                with_call_history(df, call_history).to_csv(csv_file, index=False, header=rows == 0)
+            rows += len(df)
+    except BaseException:
+        if dataset_writer is not None:
+            dataset_writer.abort()
+        if csv_file is not None:
+            csv_file.close()
+            csv_tmp.unlink(missing_ok=True)
+        raise
+
+    print(f"✓ Loaded {rows:,} HCP predictions")
+    print(f"\n✓ Prepared data with {rows:,} HCPs")
+    if sample is not None:
+        print(f"✓ Sample names:")
+        print(sample[['NPI', 'PrescriberName']].to_string(index=False))
 
-print(f"\n✓ Prepared data with {len(df):,} HCPs")
-print(f"✓ Sample names:")
-print(df[['NPI', 'PrescriberName']].head(5).to_string(index=False))
+    # Save
+    if dataset_writer is not None:
+        manifest = dataset_writer.close()
+        print(f"\n✓ Published Parquet dataset to {OUTPUT_DATASET} ({len(manifest['partitions'])} partitions)")
+    if csv_file is not None:
+        csv_file.close()
+        csv_tmp.replace(OUTPUT_FILE)
+        print(f"✓ Saved {rows:,} HCPs to {OUTPUT_FILE}")
 
-# Save
-print(f"\nSaving to {OUTPUT_FILE}...")
-df.to_csv(OUTPUT_FILE, index=False)
-print(f"✓ Saved {len(df):,} HCPs")
+    # Show sample
+    if sample is not None:
+        print("\nSample row:")
+        print(sample[['NPI', 'PrescriberName', 'Specialty', 'Territory', 'City', 'State', 'Tier']].head(1).to_dict('records')[0])
 
-# Show sample
-print("\nSample row:")
-print(df[['NPI', 'PrescriberName', 'Specialty', 'Territory', 'City', 'State', 'Tier']].head(1).to_dict('records')[0])
+if __name__ == "__main__":
+    main()
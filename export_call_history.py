@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 """
 Extract Call History Data from IBSA Database
-Export to CSV for UI integration
+Export to CSV for UI integration, plus the NPI-indexed call history table
+Phase 7 and the UI read by range (see call_history_table.py)
 """
 
 import pyodbc
 import pandas as pd
 from pathlib import Path
 
+from call_history_table import HAS_PYARROW, CallHistoryTable, trim_calls
+
+MAX_CALLS_PER_HCP = 10  # Most recent calls kept per HCP (None keeps all)
+OUTPUT_PATH = Path('ibsa-poc-eda/data/call_history.csv')
+TABLE_DIR = Path('ibsa-poc-eda/data/call_history')
+
 # Database credentials
 SERVER = 'odsproduction.database.windows.net'
 DATABASE = 'DWHPRODIBSA'
@@ -229,9 +236,8 @@ type_mapping = {
 }
 final_df['call_type'] = final_df['call_type'].replace(type_mapping)
 
-# Sort by date descending and keep only most recent 10 calls per HCP
-final_df = final_df.sort_values('call_date', ascending=False)
-final_df = final_df.groupby('npi').head(10).reset_index(drop=True)
+# Sort by NPI and date descending and keep only the most recent calls per HCP
+final_df = trim_calls(final_df, MAX_CALLS_PER_HCP)
 
 print(f"✅ Final dataset: {len(final_df):,} calls")
 print(f"   Unique HCPs: {final_df['npi'].nunique():,}")
@@ -243,10 +249,17 @@ print("\n📊 Sample data:")
 print(final_df.head(10).to_string(index=False))
 
 # Save to CSV in the data source folder
-output_path = Path('ibsa-poc-eda/data/call_history.csv')
+output_path = OUTPUT_PATH
 output_path.parent.mkdir(parents=True, exist_ok=True)
 final_df.to_csv(output_path, index=False)
 
+# NPI-indexed side table (already trimmed, so no further limit)
+if HAS_PYARROW:
+    table = CallHistoryTable.build(final_df, TABLE_DIR, source_file=output_path)
+    print(f"\n✅ Call history table: {TABLE_DIR} ({table.total_calls:,} calls, {len(table):,} HCPs)")
+else:
+    print("\n⚠️ pyarrow not installed - skipping the call history table (Phase 7 builds it on demand)")
+
 print("\n" + "=" * 80)
 print(f"✅ EXPORT COMPLETE")
 print(f"   File: {output_path}")
@@ -0,0 +1,191 @@
+"""
+Feature Manifests - per-model feature contracts and compiled alignment plans
+
+Phase 6 training writes a manifest next to every pickled model:
+
+    model_Tirosint_call_success.pkl
+    model_Tirosint_call_success.features.json   <- ordered feature names,
+                                                   source dtypes, fill values
+
+Serving (phase6e) and batch scoring (phase7) compile the manifests once into a
+FeaturePlan against their input column layout. Turning a raw row or chunk into
+the exact float32 matrix each model expects is then a single column gather
+plus NaN fill - no per-call dtype scans, DataFrame copies or pad_{i} columns.
+Models sharing the same features and fill values share one matrix per batch.
+
+Models trained before manifests existed get a legacy manifest that reproduces
+the old positional behaviour (first N numeric columns, zero padding).
+"""
+
+import json
+import logging
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SUFFIX = '.features.json'
+MODEL_INPUT_DTYPE = np.float32
+
+
+@dataclass
+class FeatureManifest:
+    """Ordered feature contract for one trained model"""
+    model_key: str
+    feature_names: List[str]
+    dtypes: List[str]  # Source column dtypes at training time
+    fill_values: List[float]  # Imputation value per feature (training median)
+    input_dtype: str = 'float32'
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def save(self, path: Union[str, Path]):
+        """Write manifest JSON"""
+        with open(path, 'w') as f:
+            json.dump(asdict(self), f, indent=2)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'FeatureManifest':
+        """Read manifest JSON"""
+        with open(path, 'r') as f:
+            return cls(**json.load(f))
+
+    @classmethod
+    def legacy(cls, model_key: str, n_features: int, columns: List[str]) -> 'FeatureManifest':
+        """
+        Manifest for a model without one: first n_features of `columns`,
+        zero-padded with pad_{i} features if there are not enough columns
+        """
+        names = list(columns[:n_features])
+        names += [f'pad_{i}' for i in range(n_features - len(names))]
+        return cls(
+            model_key=model_key,
+            feature_names=names,
+            dtypes=['unknown'] * n_features,
+            fill_values=[0.0] * n_features,
+            created_at=''
+        )
+
+
+def manifest_path(model_path: Union[str, Path]) -> Path:
+    """Manifest location for a pickled model (model_X.pkl -> model_X.features.json)"""
+    return Path(model_path).with_suffix(MANIFEST_SUFFIX)
+
+
+def resolve_manifest(model_key: str, model: Any, model_path: Union[str, Path],
+                     legacy_columns: List[str]) -> FeatureManifest:
+    """
+    Load a model's manifest, falling back to the legacy positional layout
+
+    Falls back when the manifest is missing or does not match the model's
+    n_features_in_ (e.g. a manifest left over from a different training run).
+    """
+    path = manifest_path(model_path)
+    if path.exists():
+        manifest = FeatureManifest.load(path)
+        if manifest.n_features == model.n_features_in_:
+            return manifest
+        logger.error(f"Manifest {path.name} has {manifest.n_features} features but model expects "
+                     f"{model.n_features_in_} - using legacy positional alignment")
+    else:
+        logger.warning(f"No feature manifest for {model_key} - using legacy positional alignment")
+
+    return FeatureManifest.legacy(model_key, model.n_features_in_, legacy_columns)
+
+
+class FeaturePlan:
+    """
+    Column-index plan from one input layout to every model's feature matrix
+
+    Compiled once per (models, source_columns). At call time:
+        base = plan.base_from_array(raw)   # or plan.base_from_frame(chunk)
+        matrices = plan.model_matrices(base)
+    """
+
+    def __init__(self, manifests: Dict[str, FeatureManifest], source_columns: List[str]):
+        self.source_columns = list(source_columns)
+        source_pos = {col: i for i, col in enumerate(self.source_columns)}
+
+        # Union of features any model reads from the source, in first-seen order
+        self.input_columns: List[str] = []
+        input_pos: Dict[str, int] = {}
+        for manifest in manifests.values():
+            for name in manifest.feature_names:
+                if name in source_pos and name not in input_pos:
+                    input_pos[name] = len(self.input_columns)
+                    self.input_columns.append(name)
+
+        self.source_index = np.array([source_pos[c] for c in self.input_columns], dtype=np.intp)
+        self._source_is_input = self.input_columns == self.source_columns
+
+        # Models with identical (index, fill) share one materialised matrix
+        self._variants: List[Dict[str, Any]] = []
+        self._model_variant: Dict[str, int] = {}
+        variant_ids: Dict[Any, int] = {}
+
+        for model_key, manifest in manifests.items():
+            index = np.array([input_pos.get(name, -1) for name in manifest.feature_names], dtype=np.intp)
+            fill = np.asarray(manifest.fill_values, dtype=MODEL_INPUT_DTYPE)
+            signature = (index.tobytes(), fill.tobytes())
+
+            if signature not in variant_ids:
+                missing = index < 0
+                variant_ids[signature] = len(self._variants)
+                self._variants.append({
+                    'index': np.where(missing, 0, index),
+                    'fill': fill,
+                    'missing': missing,
+                    'identity': (not missing.any() and len(index) == len(self.input_columns)
+                                 and bool((index == np.arange(len(index))).all()))
+                })
+                if missing.any():
+                    logger.info(f"  {model_key}: {int(missing.sum())} features not in input, using fill values")
+
+            self._model_variant[model_key] = variant_ids[signature]
+
+    def base_from_array(self, raw: np.ndarray) -> np.ndarray:
+        """Input matrix from a raw array laid out in `source_columns` order"""
+        raw = np.asarray(raw, dtype=MODEL_INPUT_DTYPE)
+        if raw.ndim == 1:
+            raw = raw[np.newaxis, :]
+        if self._source_is_input:
+            return raw
+        return raw[:, self.source_index]
+
+    def base_from_frame(self, frame: Any) -> np.ndarray:
+        """Input matrix from a DataFrame (reads only the needed columns, no frame copy)"""
+        base = np.empty((len(frame), len(self.input_columns)), dtype=MODEL_INPUT_DTYPE)
+        for j, col in enumerate(self.input_columns):
+            base[:, j] = frame[col].to_numpy(dtype=MODEL_INPUT_DTYPE, na_value=np.nan)
+        return base
+
+    def model_matrices(self, base: np.ndarray) -> Dict[str, np.ndarray]:
+        """Exact float32 matrix per model key (shared between models where possible)"""
+        materialised = [self._materialise(variant, base) for variant in self._variants]
+        return {key: materialised[v] for key, v in self._model_variant.items()}
+
+    @staticmethod
+    def _materialise(variant: Dict[str, Any], base: np.ndarray) -> np.ndarray:
+        if base.shape[1] == 0:
+            return np.tile(variant['fill'], (base.shape[0], 1))
+
+        nan_mask = np.isnan(base)
+        if variant['identity']:
+            if not nan_mask.any():
+                return base
+            X = base.copy()
+        else:
+            X = base[:, variant['index']]
+            nan_mask = nan_mask[:, variant['index']]
+            nan_mask[:, variant['missing']] = True
+
+        rows, cols = np.nonzero(nan_mask)
+        X[rows, cols] = variant['fill'][cols]
+        return X
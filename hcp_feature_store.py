@@ -0,0 +1,307 @@
+"""
+HCP Feature Store - PrescriberId-keyed point lookups over the Phase 4B features
+
+Converts the feature-engineered CSV (~350K HCPs) into a memory-mapped columnar
+store once, so the API can answer any HCP lookup in O(1) without keeping a
+DataFrame slice in memory or re-scanning the CSV.
+
+On-disk layout (one directory per store, one subdirectory per build):
+- CURRENT           - name of the live build directory (switched atomically)
+- v_<id>/
+    manifest.json   - column order, numeric/text split, source file fingerprint
+    ids.npy         - int64 PrescriberId per row
+    numeric.npy     - float32 matrix (rows x numeric columns), memory-mapped
+    text_<i>.npy    - fixed-width unicode array per text column, memory-mapped
+
+A rebuild writes a new v_<id> directory and then replaces CURRENT, so the
+store is never missing or partly written: readers open either the old or the
+new build. Superseded builds are removed once they are older than
+RETAIN_OLD_BUILDS_SECONDS (a worker may still be opening one).
+
+Usage:
+    python hcp_feature_store.py <features_csv> <store_dir>
+"""
+
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+KEY_COLUMN = 'PrescriberId'
+BUILD_CHUNK_SIZE = 100000
+POINTER_FILE = 'CURRENT'
+RETAIN_OLD_BUILDS_SECONDS = 3600
+
+
+def _source_fingerprint(features_file: Path) -> Dict[str, Any]:
+    """Identify a feature CSV by name, size and mtime (cheap staleness check)"""
+    stat = features_file.stat()
+    return {
+        'name': features_file.name,
+        'size_bytes': stat.st_size,
+        'mtime': int(stat.st_mtime)
+    }
+
+
+def _build_dir(store_dir: Path) -> Optional[Path]:
+    """Live build directory of a store (None if nothing has been published)"""
+    try:
+        name = (store_dir / POINTER_FILE).read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        # Stores written before versioned builds keep their files at the top level
+        return store_dir if (store_dir / 'manifest.json').exists() else None
+    return store_dir / name
+
+
+def _numeric_values(chunk: pd.DataFrame, col: str) -> pd.Series:
+    """A numeric column as floats; raises if a later chunk holds values that are not numbers"""
+    values = pd.to_numeric(chunk[col], errors='coerce')
+    given = chunk[col].notna()
+    if chunk[col].dtype == object:
+        given &= chunk[col].astype(str).str.strip() != ''
+    lost = given & values.isna()
+    if lost.any():
+        examples = chunk.loc[lost, col].head(3).tolist()
+        raise ValueError(f"Column '{col}' is numeric in the first chunk but has {int(lost.sum()):,} "
+                         f"non-numeric value(s) later (e.g. {examples}) - fix the features file "
+                         f"rather than storing them as missing")
+    return values
+
+
+class HCPFeatureStore:
+    """
+    Read-only, memory-mapped feature store keyed by PrescriberId
+
+    All arrays are opened with mmap_mode='r', so pages are loaded lazily by the
+    OS and shared between every worker process that opens the same store.
+    """
+
+    def __init__(self, store_dir: Union[str, Path]):
+        self.store_dir = Path(store_dir)
+        self.build_dir = _build_dir(self.store_dir)
+        if self.build_dir is None:
+            raise FileNotFoundError(f"No feature store in {self.store_dir}")
+
+        with open(self.build_dir / 'manifest.json', 'r') as f:
+            self.manifest = json.load(f)
+
+        if self.manifest.get('version') != STORE_VERSION:
+            raise ValueError(
+                f"Feature store version {self.manifest.get('version')} is not supported "
+                f"(expected {STORE_VERSION}). Rebuild the store."
+            )
+
+        self.columns: List[str] = self.manifest['columns']
+        self.numeric_columns: List[str] = self.manifest['numeric_columns']
+        self.text_columns: List[str] = self.manifest['text_columns']
+
+        self.ids = np.load(self.build_dir / 'ids.npy', mmap_mode='r')
+        self.numeric = np.load(self.build_dir / 'numeric.npy', mmap_mode='r')
+        self.text = {
+            col: np.load(self.build_dir / f'text_{i}.npy', mmap_mode='r')
+            for i, col in enumerate(self.text_columns)
+        }
+
+        # First occurrence wins for duplicated PrescriberIds (matches iloc[0] lookups)
+        unique_ids, first_rows = np.unique(np.asarray(self.ids), return_index=True)
+        self._row_index: Dict[int, int] = dict(zip(unique_ids.tolist(), first_rows.tolist()))
+
+        self._numeric_pos = {col: i for i, col in enumerate(self.numeric_columns)}
+
+    def __len__(self) -> int:
+        return len(self._row_index)
+
+    @staticmethod
+    def exists(store_dir: Union[str, Path]) -> bool:
+        """True if a store has been published in store_dir"""
+        build_dir = _build_dir(Path(store_dir))
+        return build_dir is not None and (build_dir / 'manifest.json').exists()
+
+    def __contains__(self, hcp_id: Any) -> bool:
+        return self.row_number(hcp_id) is not None
+
+    def row_number(self, hcp_id: Any) -> Optional[int]:
+        """Row position for an HCP, or None if the HCP is not in the store"""
+        try:
+            key = int(float(hcp_id))
+        except (TypeError, ValueError):
+            return None
+        return self._row_index.get(key)
+
+    def numeric_row(self, hcp_id: Any) -> Optional[np.ndarray]:
+        """float32 vector of numeric features in `numeric_columns` order"""
+        row = self.row_number(hcp_id)
+        if row is None:
+            return None
+        return np.asarray(self.numeric[row])
+
+    def get(self, hcp_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Full feature record for an HCP in original column order
+
+        Returns:
+            Dict of column -> value (NaN for missing numerics, None for missing text),
+            or None if the HCP is not in the store
+        """
+        row = self.row_number(hcp_id)
+        if row is None:
+            return None
+
+        numeric_values = self.numeric[row]
+        record = {}
+        for col in self.columns:
+            if col == KEY_COLUMN:
+                record[col] = int(self.ids[row])
+            elif col in self._numeric_pos:
+                record[col] = float(numeric_values[self._numeric_pos[col]])
+            else:
+                value = str(self.text[col][row])
+                record[col] = value if value else None
+        return record
+
+    def get_series(self, hcp_id: Any) -> Optional[pd.Series]:
+        """Feature record as a pandas Series (drop-in for `df.iloc[0]` lookups)"""
+        record = self.get(hcp_id)
+        return pd.Series(record) if record is not None else None
+
+    def is_stale(self, features_file: Union[str, Path]) -> bool:
+        """True if the store was built from a different version of features_file"""
+        features_file = Path(features_file)
+        if not features_file.exists():
+            return False
+        return self.manifest.get('source') != _source_fingerprint(features_file)
+
+    @classmethod
+    def build(cls, features_file: Union[str, Path], store_dir: Union[str, Path],
+              chunksize: int = BUILD_CHUNK_SIZE) -> 'HCPFeatureStore':
+        """
+        Build the store from a feature-engineered CSV in a single streaming pass
+
+        The build is written to its own v_<id> directory and published by
+        atomically replacing the CURRENT pointer file, so concurrent workers
+        always open a complete build (the old one until the switch). Workers
+        racing to rebuild each publish a full build; the last switch wins.
+        """
+        features_file = Path(features_file)
+        store_dir = Path(store_dir)
+        store_dir.parent.mkdir(parents=True, exist_ok=True)
+
+        logger.info(f"Building HCP feature store from {features_file.name}...")
+
+        columns = None
+        numeric_columns: List[str] = []
+        text_columns: List[str] = []
+        id_chunks, numeric_chunks = [], []
+        text_chunks: Dict[str, List[np.ndarray]] = {}
+
+        for chunk in pd.read_csv(features_file, chunksize=chunksize, low_memory=False):
+            if columns is None:
+                if KEY_COLUMN not in chunk.columns:
+                    raise ValueError(f"{features_file.name} has no '{KEY_COLUMN}' column")
+                columns = list(chunk.columns)
+                numeric_columns = [c for c in columns if c != KEY_COLUMN and
+                                   pd.api.types.is_numeric_dtype(chunk[c])]
+                text_columns = [c for c in columns if c != KEY_COLUMN and c not in numeric_columns]
+                text_chunks = {c: [] for c in text_columns}
+
+            ids = pd.to_numeric(chunk[KEY_COLUMN], errors='coerce')
+            valid = ids.notna().values
+            if not valid.all():
+                logger.warning(f"  Skipping {(~valid).sum():,} rows without a {KEY_COLUMN}")
+                chunk = chunk[valid]
+                ids = ids[valid]
+
+            id_chunks.append(ids.astype(np.int64).values)
+            numeric_chunks.append(
+                np.column_stack([_numeric_values(chunk, c).to_numpy(dtype=np.float32, na_value=np.nan)
+                                 for c in numeric_columns])
+                if numeric_columns else np.empty((len(chunk), 0), dtype=np.float32)
+            )
+            for col in text_columns:
+                text_chunks[col].append(chunk[col].fillna('').astype(str).values.astype(str))
+
+        if columns is None:
+            raise ValueError(f"{features_file.name} is empty")
+
+        store_dir.mkdir(parents=True, exist_ok=True)
+        build_name = f"v_{uuid.uuid4().hex}"
+        build_dir = store_dir / build_name
+        build_dir.mkdir()
+        try:
+            ids = np.concatenate(id_chunks)
+            np.save(build_dir / 'ids.npy', ids)
+            np.save(build_dir / 'numeric.npy', np.concatenate(numeric_chunks))
+            for i, col in enumerate(text_columns):
+                np.save(build_dir / f'text_{i}.npy', np.concatenate(text_chunks[col]))
+
+            manifest = {
+                'version': STORE_VERSION,
+                'key_column': KEY_COLUMN,
+                'columns': columns,
+                'numeric_columns': numeric_columns,
+                'text_columns': text_columns,
+                'row_count': int(len(ids)),
+                'source': _source_fingerprint(features_file)
+            }
+            with open(build_dir / 'manifest.json', 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            # Publish: one atomic replace of the pointer file
+            pointer_tmp = store_dir / f".{POINTER_FILE}.{uuid.uuid4().hex}.tmp"
+            pointer_tmp.write_text(build_name, encoding='utf-8')
+            os.replace(pointer_tmp, store_dir / POINTER_FILE)
+        except BaseException:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+
+        cls._remove_old_builds(store_dir)
+        store = cls(store_dir)
+        logger.info(f"[OK] Feature store built: {len(store):,} HCPs, "
+                    f"{len(numeric_columns)} numeric + {len(text_columns)} text columns")
+        return store
+
+    @staticmethod
+    def _remove_old_builds(store_dir: Path):
+        """Delete superseded builds old enough that no worker can still be opening them"""
+        live = _build_dir(store_dir)
+        cutoff = time.time() - RETAIN_OLD_BUILDS_SECONDS
+        for path in store_dir.glob('v_*'):
+            try:
+                if path != live and path.stat().st_mtime < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    @classmethod
+    def open_or_build(cls, features_file: Union[str, Path],
+                      store_dir: Union[str, Path]) -> 'HCPFeatureStore':
+        """Open an existing store, (re)building it if missing or out of date"""
+        store_dir = Path(store_dir)
+        if cls.exists(store_dir):
+            store = cls(store_dir)
+            if not store.is_stale(features_file):
+                return store
+            logger.info(f"Feature store is stale for {Path(features_file).name}, rebuilding...")
+        return cls.build(features_file, store_dir)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if len(sys.argv) != 3:
+        print("Usage: python hcp_feature_store.py <features_csv> <store_dir>")
+        sys.exit(1)
+
+    store = HCPFeatureStore.build(sys.argv[1], sys.argv[2])
+    print(f"✓ Feature store ready: {len(store):,} HCPs in {store.store_dir}")
@@ -0,0 +1,148 @@
+"""
+HCP Rules - vectorized business rules derived from the model predictions
+
+The single definition of the fields built on top of the 12 model outputs,
+shared by Phase 7 batch scoring (one call per chunk) and the API's
+/predict-hcp (one row):
+
+- call_success_prob      - mean of the per-product call success probabilities
+- forecasted_lift        - sum of the per-product prescription lift forecasts
+- sample_effectiveness, churn_risk, churn_risk_level, expected_roi
+- hcp_segment_name       - Champions / Growth Opportunities / At-Risk / Maintain / Deprioritize
+- next_best_action       - Maintain Engagement / Increase Calls / Sample Drop Only / Detail Only
+- ngd_classification     - NGD class label (LabelEncoder order) -> Decliner / Grower / New
+- sample_allocation
+
+Every rule is an np.select over whole columns (first matching condition
+wins, like the if/elif chains it replaces) or an array lookup, so a chunk
+is derived without any per-row Python.
+"""
+
+from typing import Dict, Mapping
+
+import numpy as np
+
+# Thresholds (shared by batch and online scoring)
+CHAMPION_MIN_SUCCESS = 0.7
+CHAMPION_MIN_LIFT = 10
+GROWTH_MIN_LIFT = 5
+AT_RISK_MIN_CHURN = 0.6
+MAINTAIN_MIN_SUCCESS = 0.5
+HIGH_CHURN = 0.7
+MEDIUM_CHURN = 0.4
+INCREASE_CALLS_MIN_LIFT = 10
+SAMPLE_DROP_MAX_EFFECTIVENESS = 0.05
+SAMPLE_EFFECTIVENESS_FACTOR = 0.3
+ROI_PER_LIFT = 15
+MAX_SAMPLE_ALLOCATION = 50
+DEFAULT_CALL_SUCCESS = 0.5
+
+# ngd_category models predict LabelEncoder codes (alphabetical): 0 = DECLINER, 1 = GROWER, 2 = NEW
+NGD_LABELS = np.array(['Decliner', 'Grower', 'New'], dtype=object)
+NGD_DEFAULT = 'Stable'
+
+# Columns derive_fields returns, in order
+DERIVED_FIELDS = ('call_success_prob', 'forecasted_lift', 'sample_effectiveness', 'ngd_classification',
+                  'churn_risk', 'churn_risk_level', 'hcp_segment_name', 'expected_roi',
+                  'next_best_action', 'sample_allocation')
+
+
+def _column(values) -> np.ndarray:
+    return np.atleast_1d(np.asarray(values, dtype=np.float64))
+
+
+def _prediction_columns(predictions: Mapping[str, np.ndarray], suffix: str) -> np.ndarray:
+    """Per-product prediction columns ending in suffix, stacked as (rows, products)"""
+    columns = [_column(values) for name, values in predictions.items()
+               if name.endswith(suffix) and name != suffix]
+    return np.column_stack(columns) if columns else np.empty((0, 0))
+
+
+def churn_risk_level(churn_risk) -> np.ndarray:
+    churn_risk = _column(churn_risk)
+    return np.select([churn_risk > HIGH_CHURN, churn_risk > MEDIUM_CHURN], ['High', 'Medium'], 'Low')
+
+
+def hcp_segment(call_success_prob, forecasted_lift, churn_risk) -> np.ndarray:
+    call_success_prob, forecasted_lift, churn_risk = map(_column, (call_success_prob, forecasted_lift, churn_risk))
+    conditions = [
+        (call_success_prob > CHAMPION_MIN_SUCCESS) & (forecasted_lift > CHAMPION_MIN_LIFT),
+        forecasted_lift > GROWTH_MIN_LIFT,
+        churn_risk > AT_RISK_MIN_CHURN,
+        call_success_prob > MAINTAIN_MIN_SUCCESS
+    ]
+    choices = ['Champions', 'Growth Opportunities', 'At-Risk', 'Maintain']
+    return np.select(conditions, choices, 'Deprioritize')
+
+
+def next_best_action(churn_risk, forecasted_lift, sample_effectiveness) -> np.ndarray:
+    churn_risk, forecasted_lift, sample_effectiveness = map(_column, (churn_risk, forecasted_lift, sample_effectiveness))
+    conditions = [
+        churn_risk > HIGH_CHURN,
+        forecasted_lift > INCREASE_CALLS_MIN_LIFT,
+        sample_effectiveness < SAMPLE_DROP_MAX_EFFECTIVENESS
+    ]
+    choices = ['Maintain Engagement', 'Increase Calls', 'Sample Drop Only']
+    return np.select(conditions, choices, 'Detail Only')
+
+
+def ngd_classification(ngd_pred) -> np.ndarray:
+    """NGD class codes -> labels (missing or unknown codes are 'Stable')"""
+    codes = _column(ngd_pred)
+    labels = np.full(codes.shape, NGD_DEFAULT, dtype=object)
+    known = np.isin(codes, np.arange(len(NGD_LABELS)))
+    labels[known] = NGD_LABELS[codes[known].astype(np.intp)]
+    return labels
+
+
+def sample_allocation(sample_effectiveness) -> np.ndarray:
+    allocation = np.clip(np.round(_column(sample_effectiveness) * 100), 0, MAX_SAMPLE_ALLOCATION)
+    return np.nan_to_num(allocation).astype(int)
+
+
+def derive_fields(predictions: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    All derived fields for a batch of HCPs
+
+    Args:
+        predictions: Per-model prediction columns (e.g. Tirosint_call_success_prob,
+            Flector_prescription_lift_pred, Tirosint_ngd_category_pred), each a
+            scalar or a 1-D array over the same rows
+
+    Returns:
+        Column name -> array, one entry per row
+    """
+    rows = max((len(_column(values)) for name, values in predictions.items()
+                if name.endswith(('_prob', '_pred'))), default=1)
+
+    call_success = _prediction_columns(predictions, 'call_success_prob')
+    if call_success.size:
+        # Mean over the products that have a value (NaN-skipping, like DataFrame.mean)
+        counts = np.sum(~np.isnan(call_success), axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            call_success_prob = np.nansum(call_success, axis=1) / counts
+    else:
+        call_success_prob = np.full(rows, DEFAULT_CALL_SUCCESS)
+
+    lift = _prediction_columns(predictions, 'prescription_lift_pred')
+    forecasted_lift = np.nansum(lift, axis=1) if lift.size else np.zeros(rows)
+
+    # The first product's NGD model drives the classification
+    ngd_columns = [name for name in predictions if name.endswith('_ngd_category_pred')]
+    ngd_pred = _column(predictions[ngd_columns[0]]) if ngd_columns else np.full(rows, np.nan)
+
+    sample_effectiveness = call_success_prob * SAMPLE_EFFECTIVENESS_FACTOR
+    churn_risk = 1 - call_success_prob
+
+    return {
+        'call_success_prob': call_success_prob,
+        'forecasted_lift': forecasted_lift,
+        'sample_effectiveness': sample_effectiveness,
+        'ngd_classification': ngd_classification(ngd_pred),
+        'churn_risk': churn_risk,
+        'churn_risk_level': churn_risk_level(churn_risk),
+        'hcp_segment_name': hcp_segment(call_success_prob, forecasted_lift, churn_risk),
+        'expected_roi': forecasted_lift * ROI_PER_LIFT,
+        'next_best_action': next_best_action(churn_risk, forecasted_lift, sample_effectiveness),
+        'sample_allocation': sample_allocation(sample_effectiveness)
+    }
@@ -0,0 +1,293 @@
+"""
+Model Inference - shared scoring for the 12 product x outcome models
+
+Used by the FastAPI service (phase6e) for online predictions and by the
+Phase 7 batch scorer. Feature alignment is driven by a compiled FeaturePlan
+(see feature_manifest.py) when one is supplied.
+
+MicroBatchInferenceEngine coalesces concurrent /predict-hcp requests that
+arrive within a few milliseconds into one feature matrix, runs every model
+once per batch and fans the per-row results back out to the waiting
+requests. Classification models are scored with a single predict_proba call;
+the class prediction is derived from the probabilities instead of a second
+predict() dispatch.
+
+PredictionCache holds recent per-HCP results keyed by (HCP, model version) so
+/predict-hcp and /generate-call-script share one inference pass per HCP.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from feature_manifest import FeaturePlan
+
+logger = logging.getLogger(__name__)
+
+# Product and outcome definitions
+PRODUCTS = ['Tirosint', 'Flector', 'Licart']
+OUTCOMES = ['call_success', 'prescription_lift', 'ngd_category', 'wallet_share_growth']
+CLASSIFICATION_OUTCOMES = ['call_success', 'ngd_category']
+
+# Micro-batching defaults
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+
+# Prediction cache defaults
+DEFAULT_CACHE_SIZE = 50000
+
+
+def model_outcome(model_key: str) -> str:
+    """Outcome name for a '{product}_{outcome}' model key"""
+    return model_key.split('_', 1)[1]
+
+
+def model_version(model_files: Dict[str, Path]) -> str:
+    """Short fingerprint of a set of model files (name, size, mtime)"""
+    digest = hashlib.sha1()
+    for name in sorted(model_files):
+        stat = Path(model_files[name]).stat()
+        digest.update(f"{name}:{stat.st_size}:{int(stat.st_mtime)};".encode())
+    return digest.hexdigest()[:12]
+
+
+def align_features(X: np.ndarray, expected_features: int) -> np.ndarray:
+    """Zero-pad or truncate columns to the width a model was trained on"""
+    n_features = X.shape[1]
+    if n_features == expected_features:
+        return X
+    if n_features > expected_features:
+        return X[:, :expected_features]
+    padded = np.zeros((X.shape[0], expected_features), dtype=X.dtype)
+    padded[:, :n_features] = X
+    return padded
+
+
+def score_model(model_key: str, model: Any, X: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Score one model over an aligned feature matrix
+
+    Returns:
+        Column arrays keyed '{model_key}_pred' (and '_prob' for classifiers)
+    """
+    if model_outcome(model_key) in CLASSIFICATION_OUTCOMES:
+        if hasattr(model, 'predict_proba'):
+            proba = model.predict_proba(X)
+            pred = model.classes_[np.argmax(proba, axis=1)]
+            prob = proba[:, 1] if proba.shape[1] > 1 else pred.astype(float)
+        else:
+            pred = model.predict(X)
+            prob = pred.astype(float)
+        return {f"{model_key}_pred": pred, f"{model_key}_prob": prob}
+
+    return {f"{model_key}_pred": model.predict(X)}
+
+
+def score_models(models: Dict[str, Any], X: np.ndarray,
+                 plan: Optional[FeaturePlan] = None) -> Dict[str, np.ndarray]:
+    """
+    Run every model once over a feature matrix
+
+    Args:
+        models: Trained models keyed by '{product}_{outcome}'
+        X: Raw feature matrix (rows x plan.source_columns, or rows x features without a plan)
+        plan: Compiled feature plan; without one, columns are padded/truncated positionally
+
+    Returns:
+        Column arrays keyed '{product}_{outcome}_pred' (and '_prob' for classifiers)
+    """
+    matrices = plan.model_matrices(plan.base_from_array(X)) if plan is not None else None
+
+    results = {}
+    for model_key, model in models.items():
+        if matrices is not None:
+            X_model = matrices[model_key]
+        else:
+            X_model = align_features(X, model.n_features_in_)
+        results.update(score_model(model_key, model, X_model))
+
+    return results
+
+
+class MicroBatchInferenceEngine:
+    """
+    Coalesces concurrent single-HCP prediction requests into batched model calls
+
+    Requests are queued on the event loop; a background task waits up to
+    `max_wait_ms` after the first request (or until `max_batch_size` requests
+    are queued), stacks them into one matrix and scores it in a worker thread
+    so the event loop stays responsive.
+    """
+
+    def __init__(self, models: Dict[str, Any],
+                 plan: Optional[FeaturePlan] = None,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+                 executor: Optional[Executor] = None,
+                 model_version: str = ''):
+        self.models = models
+        self.plan = plan
+        self.model_version = model_version
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Batch statistics (exposed via health checks)
+        self.batches_run = 0
+        self.requests_served = 0
+
+    async def start(self):
+        """Start the background batching task on the running event loop"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+            logger.info(f"[OK] Inference engine started (max_batch={self.max_batch_size}, "
+                        f"max_wait={self.max_wait * 1000:.1f}ms, models={len(self.models)})")
+
+    async def stop(self):
+        """Cancel the batching task and fail any requests still queued"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Inference engine stopped"))
+
+    async def predict(self, features: np.ndarray) -> Dict[str, Any]:
+        """
+        Score one HCP feature vector (awaits the batch it is coalesced into)
+
+        Args:
+            features: Raw feature row in plan.source_columns order
+
+        Returns:
+            Predictions keyed '{product}_{outcome}_pred' / '_prob' as Python scalars
+        """
+        if self._worker is None:
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((np.asarray(features, dtype=np.float32).ravel(), future))
+        return await future
+
+    def predict_batch(self, X: np.ndarray) -> List[Dict[str, Any]]:
+        """Score a matrix synchronously and split the results back into per-row dicts"""
+        columns = score_models(self.models, X, self.plan)
+
+        rows = [{} for _ in range(X.shape[0])]
+        for key, values in columns.items():
+            is_class_pred = key.endswith('_pred') and model_outcome(key[:-len('_pred')]) in CLASSIFICATION_OUTCOMES
+            for row, value in zip(rows, values.tolist()):
+                row[key] = int(value) if is_class_pred else float(value)
+        return rows
+
+    async def _collect_batch(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        """Wait for the first request, then gather more until full or the window closes"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect_batch()
+            batch = [(features, future) for features, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            try:
+                X = np.vstack([features for features, _ in batch])
+                results = await loop.run_in_executor(self._executor, self.predict_batch, X)
+            except Exception as e:
+                logger.error(f"Batch inference failed ({len(batch)} requests): {e}", exc_info=True)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.requests_served += len(batch)
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU of per-HCP prediction dicts keyed by (hcp_id, model_version)
+
+    Entries for an old model version are never returned once the version
+    changes; they simply age out of the LRU.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[Tuple[str, str], Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(hcp_id: Any, version: str) -> Tuple[str, str]:
+        try:
+            hcp_key = str(int(float(hcp_id)))
+        except (TypeError, ValueError):
+            hcp_key = str(hcp_id).strip()
+        return hcp_key, version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, hcp_id: Any, version: str) -> Optional[Dict[str, Any]]:
+        """Cached predictions for an HCP under a model version, or None"""
+        key = self._key(hcp_id, version)
+        with self._lock:
+            predictions = self._entries.get(key)
+            if predictions is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return predictions
+
+    def put(self, hcp_id: Any, version: str, predictions: Dict[str, Any]):
+        """Store predictions, evicting the least recently used entry when full"""
+        key = self._key(hcp_id, version)
+        with self._lock:
+            self._entries[key] = predictions
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,666 @@
+"""
+Model Pool - memory-mapped, shared-page model store for API workers and Phase 7
+
+Each trained model (.pkl) is exported once into the pool directory and every
+process after that memory-maps it instead of unpickling:
+
+- tree ensembles (sklearn RandomForest / ExtraTrees / DecisionTree, LightGBM
+  regressors) are flattened into contiguous node arrays (.npy) and scored by
+  PackedTreeEnsemble with a vectorized traversal. np.load(mmap_mode='r')
+  maps the files read-only, so N Uvicorn workers share one copy of the trees
+  in the page cache and "loading" a model is an mmap call.
+- anything else falls back to joblib with mmap_mode='r' (numpy arrays inside
+  the model are shared; the rest is unpickled per process).
+
+Unpickled sklearn trees cannot be shared this way: Tree.__setstate__ copies
+its node arrays into private buffers, which is why the trees are re-packed.
+
+Exports are checked for numeric parity against the original model before
+they are published, and published atomically into a directory versioned by
+the source file's fingerprint, so concurrent workers never see a half-written
+export and a retrained .pkl is re-exported automatically.
+
+Inference backends (selectable per model, see backend_for()):
+  compiled  - native code built with treelite (compiled_models.py), stored in
+              the entry's compiled/ directory; parity-checked like the export
+              and falls back to packed when treelite is missing or parity fails
+  packed    - the memory-mapped export above (joblib for unsupported types)
+  original  - the unpickled source model (reference behaviour)
+
+Usage:
+    python model_pool.py [models_dir]             # export every model_*.pkl up front
+    python model_pool.py [models_dir] --compile   # ... and build the compiled backend
+"""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+import sys
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import joblib
+import numpy as np
+
+from compiled_models import HAS_TREELITE, CompiledTreeModel, compile_model
+
+logger = logging.getLogger(__name__)
+
+POOL_FORMAT_VERSION = 1
+DEFAULT_BLOCK_ROWS = 1024  # Rows traversed at once (bounds the rows x trees work arrays)
+PARITY_ROWS = 512
+PARITY_RTOL = 1e-6
+PARITY_ATOL = 1e-9
+LIGHTGBM_ZERO_THRESHOLD = 1e-35
+LIGHTGBM_IDENTITY_OBJECTIVES = {'regression', 'regression_l1', 'huber', 'fair', 'quantile', 'mape'}
+
+BACKENDS = ('compiled', 'packed', 'original')
+
+_PACKED_ARRAYS = ('left', 'right', 'feature', 'threshold', 'value',
+                  'default_left', 'nan_as_zero', 'zero_missing', 'roots')
+
+
+class PackedTreeEnsemble:
+    """
+    A tree ensemble flattened into node arrays, scored without the original library
+
+    Node arrays cover every tree back to back; roots holds each tree's first
+    node. Leaves point to themselves, so a fixed max_depth number of steps
+    lands every row on its leaf. A row goes left when x <= threshold; missing
+    values follow the per-node rules of the source library:
+      nan_as_zero  - NaN is compared as 0.0 (LightGBM missing_type None/Zero)
+      zero_missing - 0.0 is treated as missing (LightGBM missing_type Zero)
+      default_left - direction of missing values
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.meta = meta
+        for name in _PACKED_ARRAYS:
+            setattr(self, name, np.asarray(arrays[name]))
+        self.kind = meta['kind']  # 'classifier' or 'regressor'
+        self.aggregation = meta['aggregation']  # 'mean' (random forest) or 'sum' (boosting)
+        self.max_depth = int(meta['max_depth'])
+        self.input_dtype = np.dtype(meta['input_dtype'])
+        self.n_features_in_ = int(meta['n_features'])
+        self.source_class = meta.get('source_class', '')
+        if self.kind == 'classifier':
+            self.classes_ = np.asarray(meta['classes'])
+        self._has_missing_rules = bool(self.zero_missing.any() or self.nan_as_zero.any())
+
+    def __repr__(self) -> str:
+        return (f"PackedTreeEnsemble({self.source_class}, trees={len(self.roots)}, "
+                f"nodes={len(self.left)}, features={self.n_features_in_})")
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index per (row, tree)"""
+        nodes = np.repeat(self.roots[np.newaxis, :], X.shape[0], axis=0)
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        check_missing = self._has_missing_rules or np.isnan(X).any()
+
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            threshold = self.threshold[nodes]
+            if check_missing:
+                is_nan = np.isnan(x)
+                as_zero = is_nan & self.nan_as_zero[nodes]
+                x = np.where(as_zero, 0.0, x)
+                missing = (is_nan & ~as_zero) | (self.zero_missing[nodes] & (np.abs(x) <= LIGHTGBM_ZERO_THRESHOLD))
+                go_left = np.where(missing, self.default_left[nodes], x <= threshold)
+            else:
+                go_left = x <= threshold
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def _raw(self, X: np.ndarray, block_rows: int = DEFAULT_BLOCK_ROWS) -> np.ndarray:
+        """Aggregated leaf values, shape (rows, outputs)"""
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected a (rows, {self.n_features_in_}) matrix, got {X.shape}")
+        X = X.astype(self.input_dtype, copy=False).astype(np.float64, copy=False)
+
+        out = np.empty((X.shape[0], self.value.shape[1]), dtype=np.float64)
+        for start in range(0, X.shape[0], block_rows):
+            leaves = self._leaves(X[start:start + block_rows])
+            total = self.value[leaves].sum(axis=1)
+            out[start:start + block_rows] = total / self.n_trees if self.aggregation == 'mean' else total
+        return out
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.kind != 'classifier':
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._raw(X)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        raw = self._raw(X)
+        if self.kind == 'classifier':
+            return self.classes_[np.argmax(raw, axis=1)]
+        return raw[:, 0]
+
+    def save(self, directory: Path):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in _PACKED_ARRAYS:
+            np.save(directory / f'{name}.npy', getattr(self, name), allow_pickle=False)
+        with open(directory / 'packed.json', 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=2)
+
+    @classmethod
+    def load(cls, directory: Path, mmap_mode: Optional[str] = 'r') -> 'PackedTreeEnsemble':
+        """Load node arrays (memory-mapped read-only by default)"""
+        directory = Path(directory)
+        with open(directory / 'packed.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(directory / f'{name}.npy', mmap_mode=mmap_mode, allow_pickle=False)
+                  for name in _PACKED_ARRAYS}
+        return cls(arrays, meta)
+
+
+class _NodeBuffer:
+    """Accumulates flattened nodes while walking a nested (LightGBM JSON) tree dump"""
+
+    def __init__(self, n_outputs: int):
+        self.n_outputs = n_outputs
+        self.left: List[int] = []
+        self.right: List[int] = []
+        self.feature: List[int] = []
+        self.threshold: List[float] = []
+        self.value: List[np.ndarray] = []
+        self.default_left: List[bool] = []
+        self.nan_as_zero: List[bool] = []
+        self.zero_missing: List[bool] = []
+        self.roots: List[int] = []
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        return len(self.left)
+
+    def add(self, feature=0, threshold=0.0, value=None, default_left=True,
+            nan_as_zero=False, zero_missing=False) -> int:
+        node = len(self.left)
+        self.left.append(node)  # Leaves point to themselves; internal nodes are linked later
+        self.right.append(node)
+        self.feature.append(int(feature))
+        self.threshold.append(float(threshold))
+        self.value.append(np.zeros(self.n_outputs) if value is None else np.asarray(value, dtype=np.float64))
+        self.default_left.append(bool(default_left))
+        self.nan_as_zero.append(bool(nan_as_zero))
+        self.zero_missing.append(bool(zero_missing))
+        return node
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'left': np.asarray(self.left, dtype=np.int32),
+            'right': np.asarray(self.right, dtype=np.int32),
+            'feature': np.asarray(self.feature, dtype=np.int32),
+            'threshold': np.asarray(self.threshold, dtype=np.float64),
+            'value': np.vstack(self.value).astype(np.float64),
+            'default_left': np.asarray(self.default_left, dtype=bool),
+            'nan_as_zero': np.asarray(self.nan_as_zero, dtype=bool),
+            'zero_missing': np.asarray(self.zero_missing, dtype=bool),
+            'roots': np.asarray(self.roots, dtype=np.int32)
+        }
+
+
+def _sklearn_trees(model: Any) -> Optional[List[Any]]:
+    if hasattr(model, 'estimators_') and hasattr(model, 'n_estimators'):
+        estimators = model.estimators_
+    elif hasattr(model, 'tree_'):
+        estimators = [model]
+    else:
+        return None
+    trees = []
+    for estimator in np.ravel(estimators):
+        if not hasattr(estimator, 'tree_'):
+            return None
+        trees.append(estimator.tree_)
+    return trees
+
+
+def _pack_sklearn(model: Any) -> Optional[PackedTreeEnsemble]:
+    trees = _sklearn_trees(model)
+    if not trees or getattr(model, 'n_outputs_', 1) != 1:
+        return None
+
+    is_classifier = hasattr(model, 'classes_')
+    if is_classifier and np.asarray(model.classes_).dtype.kind not in 'iub':
+        return None  # Packed metadata stores integer class labels only
+
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name in _PACKED_ARRAYS}
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        n_nodes = tree.node_count
+        nodes = tree.__getstate__()['nodes']
+        own = np.arange(n_nodes)
+        leaf = tree.children_left == -1
+
+        values = tree.value[:, 0, :].astype(np.float64)
+        if is_classifier:
+            totals = values.sum(axis=1, keepdims=True)
+            values = values / np.where(totals == 0, 1.0, totals)
+
+        parts['left'].append(np.where(leaf, own, tree.children_left) + offset)
+        parts['right'].append(np.where(leaf, own, tree.children_right) + offset)
+        parts['feature'].append(np.where(leaf, 0, tree.feature))
+        parts['threshold'].append(np.where(leaf, 0.0, tree.threshold))
+        parts['value'].append(values)
+        if 'missing_go_to_left' in (nodes.dtype.names or ()):
+            parts['default_left'].append(nodes['missing_go_to_left'].astype(bool))
+        else:
+            parts['default_left'].append(np.ones(n_nodes, dtype=bool))
+        parts['nan_as_zero'].append(np.zeros(n_nodes, dtype=bool))
+        parts['zero_missing'].append(np.zeros(n_nodes, dtype=bool))
+        parts['roots'].append(np.array([offset]))
+
+        offset += n_nodes
+        max_depth = max(max_depth, int(tree.max_depth))
+
+    dtypes = {'left': np.int32, 'right': np.int32, 'feature': np.int32, 'threshold': np.float64,
+              'value': np.float64, 'default_left': bool, 'nan_as_zero': bool, 'zero_missing': bool,
+              'roots': np.int32}
+    arrays = {name: np.concatenate(parts[name]).astype(dtypes[name]) for name in _PACKED_ARRAYS}
+
+    meta = {
+        'kind': 'classifier' if is_classifier else 'regressor',
+        'aggregation': 'mean',
+        'max_depth': max_depth,
+        'input_dtype': 'float32',  # sklearn trees compare float32 inputs to float64 thresholds
+        'n_features': int(model.n_features_in_),
+        'source_class': type(model).__name__
+    }
+    if is_classifier:
+        meta['classes'] = np.asarray(model.classes_).tolist()
+    return PackedTreeEnsemble(arrays, meta)
+
+
+def _pack_lightgbm(model: Any) -> Optional[PackedTreeEnsemble]:
+    booster = getattr(model, 'booster_', None)
+    if booster is None or hasattr(model, 'classes_'):
+        return None  # Only LightGBM regressors are packed
+
+    dump = booster.dump_model()
+    objective = str(dump.get('objective', '')).split(' ')[0]
+    if objective not in LIGHTGBM_IDENTITY_OBJECTIVES or dump.get('num_class', 1) != 1:
+        return None
+
+    buffer = _NodeBuffer(1)
+    for tree_info in dump['tree_info']:
+        root_info = tree_info['tree_structure']
+        buffer.roots.append(len(buffer))
+        stack: List[Tuple[Dict, Optional[Tuple[int, str]], int]] = [(root_info, None, 1)]
+        while stack:
+            node_info, parent, depth = stack.pop()
+            if 'leaf_value' in node_info:
+                if 'leaf_coeff' in node_info:
+                    return None  # Linear trees
+                node = buffer.add(value=[node_info['leaf_value']])
+            else:
+                if node_info.get('decision_type', '<=') != '<=':
+                    return None  # Categorical splits
+                missing_type = node_info.get('missing_type', 'None')
+                node = buffer.add(
+                    feature=node_info['split_feature'],
+                    threshold=node_info['threshold'],
+                    default_left=node_info.get('default_left', True),
+                    nan_as_zero=missing_type != 'NaN',
+                    zero_missing=missing_type == 'Zero'
+                )
+                stack.append((node_info['right_child'], (node, 'right'), depth + 1))
+                stack.append((node_info['left_child'], (node, 'left'), depth + 1))
+                buffer.max_depth = max(buffer.max_depth, depth)
+            if parent is not None:
+                getattr(buffer, parent[1])[parent[0]] = node
+
+    meta = {
+        'kind': 'regressor',
+        'aggregation': 'mean' if dump.get('average_output') else 'sum',
+        'max_depth': buffer.max_depth,
+        'input_dtype': 'float64',
+        'n_features': int(dump.get('max_feature_idx', model.n_features_in_ - 1)) + 1,
+        'source_class': type(model).__name__
+    }
+    return PackedTreeEnsemble(buffer.arrays(), meta)
+
+
+def pack_model(model: Any) -> Optional[PackedTreeEnsemble]:
+    """Packed form of a supported tree ensemble, or None if the model type is not supported"""
+    if hasattr(model, 'booster_'):
+        return _pack_lightgbm(model)
+    return _pack_sklearn(model)
+
+
+def parity_sample(model: Any, rows: int = PARITY_ROWS, seed: int = 0) -> np.ndarray:
+    """
+    Synthetic inputs that exercise a tree model's splits
+
+    Values are drawn around the thresholds the model actually uses, with some
+    rows set exactly on a threshold to test the <= boundary.
+    """
+    rng = np.random.default_rng(seed)
+    n_features = int(model.n_features_in_)
+    X = rng.normal(size=(rows, n_features))
+
+    packed = model if isinstance(model, PackedTreeEnsemble) else pack_model(model)
+    if packed is None:
+        return X
+
+    internal = packed.left != np.arange(len(packed.left))
+    features, thresholds = packed.feature[internal], packed.threshold[internal]
+    for f in np.unique(features):
+        used = thresholds[features == f]
+        low, high = used.min(), used.max()
+        spread = max(high - low, 1.0)
+        X[:, f] = rng.uniform(low - 0.1 * spread, high + 0.1 * spread, size=rows)
+        on_threshold = rng.random(rows) < 0.1
+        X[on_threshold, f] = rng.choice(used, size=int(on_threshold.sum()))
+    return X
+
+
+def check_parity(reference: Any, candidate: Any, X: np.ndarray,
+                 rtol: float = PARITY_RTOL, atol: float = PARITY_ATOL) -> Tuple[bool, float]:
+    """
+    Compare a candidate model's outputs with the reference model's on X
+
+    Returns:
+        (outputs match within tolerance, max absolute difference)
+    """
+    if hasattr(reference, 'predict_proba') and hasattr(candidate, 'predict_proba'):
+        expected, actual = reference.predict_proba(X), candidate.predict_proba(X)
+        if not np.array_equal(reference.predict(X), candidate.predict(X)):
+            return False, float(np.max(np.abs(expected - actual))) if expected.shape == actual.shape else float('inf')
+    else:
+        expected, actual = reference.predict(X), candidate.predict(X)
+
+    expected, actual = np.asarray(expected, dtype=np.float64), np.asarray(actual, dtype=np.float64)
+    if expected.shape != actual.shape:
+        return False, float('inf')
+    max_diff = float(np.max(np.abs(expected - actual))) if expected.size else 0.0
+    return bool(np.allclose(expected, actual, rtol=rtol, atol=atol)), max_diff
+
+
+def backend_for(model_name: str, default: str = 'packed',
+                overrides: Optional[Dict[str, str]] = None) -> str:
+    """
+    Backend for one model: an override keyed by pool name (model_Tirosint_call_success)
+    or model key (Tirosint_call_success), else the default
+    """
+    overrides = overrides or {}
+    model_key = model_name[len('model_'):] if model_name.startswith('model_') else model_name
+    backend = overrides.get(model_name, overrides.get(model_key, default))
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}' for {model_name} (expected one of {BACKENDS})")
+    return backend
+
+
+def parse_backend_overrides(spec: str) -> Dict[str, str]:
+    """'Tirosint_call_success=original,Flector_ngd_category=packed' -> {model key: backend}"""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        model_key, _, backend = item.partition('=')
+        overrides[model_key.strip()] = backend.strip()
+    return overrides
+
+
+def load_original(model_file: Path) -> Any:
+    """Unpickle a source .pkl (the reference every backend is checked against)"""
+    with open(model_file, 'rb') as f:
+        return pickle.load(f)
+
+
+def source_fingerprint(model_file: Path) -> str:
+    """Identity of a source .pkl (size + mtime) used to version its export"""
+    stat = Path(model_file).stat()
+    return f"{stat.st_size:x}{stat.st_mtime_ns:x}"[-16:]
+
+
+class ModelPool:
+    """
+    Export-once, mmap-everywhere store for the trained models
+    """
+
+    def __init__(self, pool_dir: Union[str, Path]):
+        self.pool_dir = Path(pool_dir)
+        self.pool_dir.mkdir(parents=True, exist_ok=True)
+        self.backends: Dict[str, str] = {}  # model name -> 'compiled' | 'packed' | 'joblib' | 'original'
+        self._warned_no_compiler = False
+
+    def entry_dir(self, model_name: str, model_file: Path) -> Path:
+        return self.pool_dir / f"{model_name}-v{POOL_FORMAT_VERSION}-{source_fingerprint(model_file)}"
+
+    def export(self, model_name: str, model_file: Path, model: Any = None) -> Path:
+        """
+        Export a .pkl model into the pool (no-op if this version is already exported)
+
+        Args:
+            model_name: Pool entry name (e.g. model_Tirosint_call_success)
+            model_file: Source pickle
+            model: Already-unpickled model, to avoid loading it again
+        """
+        target = self.entry_dir(model_name, model_file)
+        if (target / 'entry.json').exists():
+            return target
+
+        if model is None:
+            model = load_original(model_file)
+
+        tmp_dir = self.pool_dir / f".{target.name}.{uuid.uuid4().hex}.tmp"
+        tmp_dir.mkdir(parents=True)
+        try:
+            packed = pack_model(model)
+            if packed is not None:
+                matches, max_diff = check_parity(model, packed, parity_sample(packed))
+                if not matches:
+                    logger.warning(f"{model_name}: packed trees differ from the original "
+                                   f"(max diff {max_diff:.3g}) - exporting with joblib instead")
+                    packed = None
+
+            if packed is not None:
+                packed.save(tmp_dir)
+                entry_format = 'packed'
+            else:
+                joblib.dump(model, tmp_dir / 'model.joblib')
+                entry_format = 'joblib'
+
+            with open(tmp_dir / 'entry.json', 'w', encoding='utf-8') as f:
+                json.dump({
+                    'model_name': model_name,
+                    'format': entry_format,
+                    'source': str(model_file),
+                    'source_fingerprint': source_fingerprint(model_file),
+                    'pool_format_version': POOL_FORMAT_VERSION
+                }, f, indent=2)
+
+            self._publish(tmp_dir, target, 'entry.json')
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        logger.info(f"Exported {model_name} to the model pool ({entry_format})")
+        self._prune(model_name, keep=target)
+        return target
+
+    def _prune(self, model_name: str, keep: Path):
+        """Remove older exports of a model (open mmaps of them stay valid on POSIX)"""
+        for old in self.pool_dir.glob(f"{model_name}-v*"):
+            if old != keep and old.is_dir():
+                shutil.rmtree(old, ignore_errors=True)
+
+    def _publish(self, tmp_dir: Path, target: Path, marker: str):
+        """Atomically move a finished tmp directory into place (first publisher wins)"""
+        try:
+            os.replace(tmp_dir, target)
+        except OSError:
+            if not (target / marker).exists():
+                raise
+            # Another worker published the same directory first
+
+    def compile(self, model_name: str, model_file: Path, model: Any = None) -> Path:
+        """
+        Build and parity-check the compiled backend for a model (no-op if already done)
+
+        The outcome is recorded in compiled/parity.json either way, so a model
+        that cannot be compiled or does not match is not retried until its
+        source .pkl changes.
+        """
+        target = self.export(model_name, model_file, model)
+        compiled_dir = target / 'compiled'
+        if (compiled_dir / 'parity.json').exists():
+            return compiled_dir
+
+        if model is None:
+            model = load_original(model_file)
+
+        tmp_dir = target / f".compiled.{uuid.uuid4().hex}.tmp"
+        tmp_dir.mkdir(parents=True)
+        try:
+            record = {'ok': False, 'max_diff': None, 'error': None}
+            try:
+                compiled = compile_model(model, tmp_dir)
+                if compiled is None:
+                    record['error'] = 'model type not supported'
+                else:
+                    X = parity_sample(model)
+                    record['ok'], record['max_diff'] = check_parity(model, compiled, X)
+                    record['rows'] = len(X)
+                    del compiled  # Unload the library before the directory is moved (Windows locks it)
+            except Exception as e:
+                record['error'] = f"{type(e).__name__}: {e}"
+
+            if not record['ok']:
+                # Keep only the record - a library that does not match is never loaded
+                for path in tmp_dir.iterdir():
+                    if path.is_dir():
+                        shutil.rmtree(path, ignore_errors=True)
+                    else:
+                        path.unlink()
+            with open(tmp_dir / 'parity.json', 'w', encoding='utf-8') as f:
+                json.dump(record, f, indent=2)
+
+            self._publish(tmp_dir, compiled_dir, 'parity.json')
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        if record['ok']:
+            logger.info(f"Compiled {model_name} (parity max diff {record['max_diff']:.3g})")
+        elif record['max_diff'] is not None:
+            logger.warning(f"{model_name}: compiled model differs from the original "
+                           f"(max diff {record['max_diff']:.3g}) - not using it")
+        else:
+            logger.warning(f"{model_name}: could not compile ({record['error']})")
+        return compiled_dir
+
+    def _load_compiled(self, model_name: str, model_file: Path) -> Optional[CompiledTreeModel]:
+        if not HAS_TREELITE:
+            if not self._warned_no_compiler:
+                logger.warning("treelite/tl2cgen not installed - compiled models use the packed backend")
+                self._warned_no_compiler = True
+            return None
+
+        compiled_dir = self.compile(model_name, model_file)
+        with open(compiled_dir / 'parity.json', 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        if not record['ok']:
+            return None
+        return CompiledTreeModel.load(compiled_dir)
+
+    def load(self, model_name: str, model_file: Path, backend: str = 'packed') -> Any:
+        """
+        Model for a .pkl using the requested backend, exporting/compiling it first if needed
+
+        'compiled' falls back to 'packed' when it is unavailable for this model;
+        self.backends[model_name] records what was actually loaded.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown model backend '{backend}' (expected one of {BACKENDS})")
+
+        if backend == 'original':
+            self.backends[model_name] = 'original'
+            return load_original(model_file)
+
+        if backend == 'compiled':
+            model = self._load_compiled(model_name, model_file)
+            if model is not None:
+                self.backends[model_name] = 'compiled'
+                return model
+
+        target = self.export(model_name, model_file)
+        with open(target / 'entry.json', 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+
+        self.backends[model_name] = entry['format']
+        if entry['format'] == 'packed':
+            return PackedTreeEnsemble.load(target)
+        return joblib.load(target / 'model.joblib', mmap_mode='r')
+
+    def validate(self, model_name: str, model_file: Path, model: Any, X: np.ndarray) -> Tuple[bool, float]:
+        """
+        Check a loaded model against the original .pkl on real input rows
+
+        Export and compile are checked on synthetic rows; this is the
+        end-to-end check on the feature matrices a model is actually scored on.
+        """
+        if self.backends.get(model_name) == 'original':
+            return True, 0.0
+        matches, max_diff = check_parity(load_original(model_file), model, X)
+        if not matches:
+            logger.warning(f"{model_name}: {self.backends.get(model_name)} backend differs from the "
+                           f"original on {len(X):,} rows (max diff {max_diff:.3g})")
+        return matches, max_diff
+
+    def load_all(self, model_files: Dict[str, Path], backend: str = 'packed',
+                 overrides: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Load several models (per-model backend overrides); failures are logged and skipped"""
+        models = {}
+        for model_name, model_file in model_files.items():
+            try:
+                models[model_name] = self.load(model_name, model_file,
+                                               backend_for(model_name, backend, overrides))
+            except Exception as e:
+                logger.error(f"Failed to load {model_name} from the model pool: {e}")
+        return models
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    build_compiled = '--compile' in argv
+    paths = [arg for arg in argv if not arg.startswith('--')]
+    models_dir = Path(paths[0]) if paths else Path("ibsa-poc-eda/outputs/models/trained_models")
+    pool = ModelPool(models_dir / 'pool')
+
+    model_files = sorted(models_dir.glob('model_*.pkl'))
+    if not model_files:
+        print(f"✗ No model_*.pkl files in {models_dir}")
+        return 1
+    if build_compiled and not HAS_TREELITE:
+        print("⚠️ treelite/tl2cgen not installed - skipping the compiled backend")
+        build_compiled = False
+
+    for model_file in model_files:
+        model = load_original(model_file)
+        entry = pool.export(model_file.stem, model_file, model)
+        size_mb = sum(p.stat().st_size for p in entry.iterdir() if p.is_file()) / 1e6
+        with open(entry / 'entry.json', 'r', encoding='utf-8') as f:
+            entry_format = json.load(f)['format']
+        print(f"✓ {model_file.stem}: {entry_format} ({size_mb:.1f} MB) -> {entry.name}")
+
+        if build_compiled:
+            compiled_dir = pool.compile(model_file.stem, model_file, model)
+            with open(compiled_dir / 'parity.json', 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            if record['ok']:
+                print(f"  ✓ compiled (parity max diff {record['max_diff']:.3g})")
+            else:
+                print(f"  ✗ not compiled: {record['error'] or 'parity check failed'}")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
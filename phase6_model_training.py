@@ -51,6 +51,9 @@ import json
 import pickle
 from typing import Dict, List, Tuple, Any
 
+from feature_manifest import FeatureManifest, manifest_path
+from training_data import TrainingData
+
 # ML Libraries
 from sklearn.model_selection import train_test_split, StratifiedKFold, cross_val_score
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
@@ -151,9 +154,8 @@ class EnterpriseModelTraining:
         self.shap_dir = SHAP_DIR
         self.eda_dir = EDA_DIR
         
-        # Data containers
-        self.features_df = None
-        self.targets_df = None
+        # Data containers (float32 feature matrix + key-aligned targets, see training_data.py)
+        self.data = None
         self.selected_features = None
         
         # Model containers
@@ -296,13 +298,28 @@ class EnterpriseModelTraining:
                 f"Run phase4b_temporal_lag_features.py and phase4c_feature_selection_validation.py first!"
             )
         
-        self.features_df = pd.read_csv(latest_features, low_memory=False, index_col=0,
-                                      encoding='utf-8', encoding_errors='ignore')
-        self.features_df.index.name = 'PrescriberId'
-        if 'PrescriberId' not in self.features_df.columns:
-            self.features_df['PrescriberId'] = self.features_df.index.astype(int)
+        # Phase 5 targets are read together with the features (aligned by PrescriberId)
+        target_files = sorted(TARGETS_DIR.glob('IBSA_Targets_Enterprise_*.csv'))
+        if not target_files:
+            raise FileNotFoundError(
+                f"No Phase 5 target files found in {TARGETS_DIR}. "
+                f"Run phase5_target_engineering_ENTERPRISE.py first!"
+            )
+        latest_targets = target_files[-1]
         
-        print(f"   ✓ Loaded: {len(self.features_df):,} rows, {len(self.features_df.columns)} columns")
+        # Verify Phase 5 created all 12 targets (3 products × 4 outcomes)
+        expected_targets = [
+            f'{product}_{outcome}' 
+            for product in self.products 
+            for outcome in self.outcomes
+        ]
+        
+        # Load features once into a float32 matrix (TRx columns are target-only, not training features)
+        exclude_columns = ['PrescriberId', 'tirosint_trx', 'flector_trx', 'licart_trx', 'total_trx']
+        self.data = TrainingData.load(latest_features, latest_targets, expected_targets, exclude_columns)
+        
+        print(f"   ✓ Loaded: {len(self.data):,} rows, {len(self.data.columns)} columns "
+              f"({len(self.data.feature_names)} numeric features as float32, {self.data.nbytes / 1024**2:.0f} MB)")
         
         # Verify Phase 4C cleaned features OR Phase 4B features contain required columns
         # Note: Phase 4C removes individual product TRx columns (tirosint_trx, etc.) due to infinite VIF
@@ -320,7 +337,7 @@ class EnterpriseModelTraining:
         else:
             # Phase 4B - verify required product columns exist
             required_cols = ['tirosint_trx', 'flector_trx', 'licart_trx', 'competitor_trx', 'ibsa_share']
-            missing_cols = [col for col in required_cols if col not in self.features_df.columns]
+            missing_cols = [col for col in required_cols if col not in self.data.columns]
             if missing_cols:
                 raise ValueError(
                     f"Phase 4B validation failed! Missing required product columns: {missing_cols}\n"
@@ -329,33 +346,16 @@ class EnterpriseModelTraining:
             print(f"   ✓ Product-specific columns validated: {', '.join(required_cols)}")
         
         # Check if Phase 4B used EDA recommendations
-        phase4b_feature_count = len(self.features_df.columns)
+        phase4b_feature_count = len(self.data.columns)
         self.phase4b_features_used = phase4b_feature_count
         self.audit_log['upstream_integration']['phase4b_features_loaded'] = phase4b_feature_count
         
-        # 3. Load and validate Phase 5 targets
-        target_files = sorted(TARGETS_DIR.glob('IBSA_Targets_Enterprise_*.csv'))
-        if not target_files:
-            raise FileNotFoundError(
-                f"No Phase 5 target files found in {TARGETS_DIR}. "
-                f"Run phase5_target_engineering_ENTERPRISE.py first!"
-            )
-        
-        latest_targets = target_files[-1]
+        # 3. Validate Phase 5 targets
         print(f"\n✅ Phase 5: Loading enterprise targets")
         print(f"   File: {latest_targets.name}")
+        print(f"   ✓ Loaded: {len(self.data.targets.columns)} target columns")
         
-        self.targets_df = pd.read_csv(latest_targets, low_memory=False,
-                                     encoding='utf-8', encoding_errors='ignore')
-        print(f"   ✓ Loaded: {len(self.targets_df):,} rows, {len(self.targets_df.columns)} columns")
-        
-        # Verify Phase 5 created all 12 targets (3 products × 4 outcomes)
-        expected_targets = [
-            f'{product}_{outcome}' 
-            for product in self.products 
-            for outcome in self.outcomes
-        ]
-        missing_targets = [t for t in expected_targets if t not in self.targets_df.columns]
+        missing_targets = [t for t in expected_targets if t not in self.data.targets.columns]
         if missing_targets:
             raise ValueError(
                 f"Phase 5 validation failed! Missing expected targets: {missing_targets}\n"
@@ -367,32 +367,26 @@ class EnterpriseModelTraining:
         self.phase5_targets_used = len(expected_targets)
         self.audit_log['upstream_integration']['phase5_targets_loaded'] = len(expected_targets)
         
-        # 4. Validate data alignment between Phase 4B and Phase 5
+        # 4. Validate data alignment between Phase 4B and Phase 5 (targets joined by PrescriberId)
         print(f"\n🔍 Validating Phase 4B ↔ Phase 5 alignment...")
-        if len(self.features_df) != len(self.targets_df):
-            print(f"   ⚠️  Row count mismatch:")
-            print(f"      Phase 4B Features: {len(self.features_df):,} rows")
-            print(f"      Phase 5 Targets: {len(self.targets_df):,} rows")
-            
-            # Take intersection
-            min_rows = min(len(self.features_df), len(self.targets_df))
-            self.features_df = self.features_df.iloc[:min_rows]
-            self.targets_df = self.targets_df.iloc[:min_rows]
-            print(f"   ✓ Aligned to {min_rows:,} rows")
+        rows_with_targets = int(self.data.targets.notna().any(axis=1).sum())
+        if rows_with_targets != len(self.data):
+            print(f"   ⚠️  {len(self.data) - rows_with_targets:,} feature rows have no targets (excluded per model)")
         else:
-            print(f"   ✓ Perfect alignment: {len(self.features_df):,} rows")
+            print(f"   ✓ Perfect alignment: {len(self.data):,} rows")
+        
+        # Median imputation once, shared by every model
+        self.data.impute()
         
         # 5. Select features based on Phase 3 EDA (if available) or use all numeric
         print(f"\n🎯 Feature selection for model training...")
         
         # Exclude TRx columns (high VIF, used for targets only, not training features)
-        exclude_columns = ['PrescriberId', 'tirosint_trx', 'flector_trx', 'licart_trx', 'total_trx']
-        numeric_cols = self.features_df.select_dtypes(include=[np.number]).columns.tolist()
-        available_features = [col for col in numeric_cols if col not in exclude_columns]
+        available_features = list(self.data.feature_names)
         
         # Log excluded TRx columns
         trx_cols_excluded = [col for col in ['tirosint_trx', 'flector_trx', 'licart_trx', 'total_trx'] 
-                            if col in self.features_df.columns]
+                            if col in self.data.columns]
         if trx_cols_excluded:
             print(f"   ⚠️  Excluded {len(trx_cols_excluded)} TRx columns (high VIF, target-only):")
             for col in trx_cols_excluded:
@@ -437,8 +431,8 @@ class EnterpriseModelTraining:
         self.audit_log['training_history'].append({
             'step': 'data_loading',
             'timestamp': datetime.now().isoformat(),
-            'features_loaded': len(self.features_df),
-            'targets_loaded': len(self.targets_df),
+            'features_loaded': len(self.data),
+            'targets_loaded': int(rows_with_targets),
             'selected_features': len(self.selected_features),
             'eda_applied': self.eda_applied
         })
@@ -447,31 +441,38 @@ class EnterpriseModelTraining:
         
         return self
     
-    def prepare_training_data(self, product: str, outcome: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    def prepare_training_data(self, product: str, outcome: str) -> Tuple[np.ndarray, pd.Series, List[str], List[float]]:
         """
-        Prepare X, y for specific product-outcome combination
+        Prepare the rows and y for specific product-outcome combination
+        
+        The features are not copied: rows index the shared, already imputed
+        float32 matrix (self.data.X) and are gathered once per train/test split.
         
         Returns:
-            X: Feature matrix
-            y: Target vector
+            rows: Row indices into self.data.X that have this target
+            y: Target vector (aligned with rows)
             feature_names: List of feature names
+            fill_values: Imputation value per feature (median, 0 if all missing)
         """
         # Get target column
         target_col = f'{product}_{outcome}'
         
-        if target_col not in self.targets_df.columns:
+        if target_col not in self.data.targets.columns:
             raise ValueError(f"Target column not found: {target_col}")
         
+        # Rows with a target (missing targets are excluded)
+        rows = self.data.rows_with_target(target_col)
+        
         # MEMORY OPTIMIZATION: STRATIFIED sampling to preserve class distributions
         # CRITICAL: Use stratified sampling to avoid losing minority classes!
         # Random sampling can drop rare classes (e.g., 0.01% positive rate)
         # SET TO None FOR FULL DATASET TRAINING (better performance, longer time)
         max_samples = None  # None = use all 350K rows, 200000 = faster training
-        if max_samples is not None and len(self.features_df) > max_samples:
-            print(f"   📉 Sampling {max_samples:,} rows (from {len(self.features_df):,}) for memory optimization")
+        if max_samples is not None and len(rows) > max_samples:
+            print(f"   📉 Sampling {max_samples:,} rows (from {len(rows):,}) for memory optimization")
             
             # Get target for stratification
-            target_for_stratify = self.targets_df[target_col].copy()
+            target_for_stratify = self.data.target(target_col, rows)
             
             # Check if target has any variance
             unique_in_full = target_for_stratify.nunique()
@@ -480,50 +481,29 @@ class EnterpriseModelTraining:
             if unique_in_full >= 2:
                 # Use STRATIFIED sampling to preserve class distributions
                 try:
-                    from sklearn.model_selection import train_test_split
                     # Use train_test_split with stratify to get a representative sample
-                    sample_idx, _ = train_test_split(
-                        np.arange(len(self.features_df)),
+                    rows, _ = train_test_split(
+                        rows,
                         train_size=max_samples,
                         stratify=target_for_stratify,
                         random_state=RANDOM_SEED
                     )
-                    sample_idx.sort()  # Maintain order
-                    features_sample = self.features_df.iloc[sample_idx].reset_index(drop=True)
-                    targets_sample = self.targets_df.iloc[sample_idx].reset_index(drop=True)
                     print(f"   ✓ Stratified sampling applied (preserves class distribution)")
                 except ValueError as e:
                     # If stratification fails (e.g., too few samples in a class), use random
                     print(f"   ⚠️  Stratification failed: {e}")
                     print(f"   → Using random sampling")
-                    sample_idx = np.random.choice(len(self.features_df), size=max_samples, replace=False)
-                    sample_idx.sort()
-                    features_sample = self.features_df.iloc[sample_idx].reset_index(drop=True)
-                    targets_sample = self.targets_df.iloc[sample_idx].reset_index(drop=True)
+                    rows = np.random.choice(rows, size=max_samples, replace=False)
             else:
                 # Only 1 class - random sampling is fine (but model can't be trained anyway)
-                sample_idx = np.random.choice(len(self.features_df), size=max_samples, replace=False)
-                sample_idx.sort()
-                features_sample = self.features_df.iloc[sample_idx].reset_index(drop=True)
-                targets_sample = self.targets_df.iloc[sample_idx].reset_index(drop=True)
-        else:
-            features_sample = self.features_df.reset_index(drop=True)
-            targets_sample = self.targets_df.reset_index(drop=True)
-        
-        # Get features
-        X = features_sample[self.selected_features].copy()
+                rows = np.random.choice(rows, size=max_samples, replace=False)
+            rows = np.sort(rows)  # Maintain order
         
-        # Handle missing values in features (simple imputation)
-        X = X.fillna(X.median(numeric_only=True))
-        X = X.fillna(0)  # Remaining NaNs
+        # Features were imputed once for all models (column medians, 0 if all missing)
+        fill_values = self.data.impute().astype(float).tolist()
         
         # Get target
-        y = targets_sample[target_col].copy()
-        
-        # Remove rows with missing targets
-        valid_mask = ~pd.isna(y)
-        X = X[valid_mask].reset_index(drop=True)
-        y = y[valid_mask].reset_index(drop=True)
+        y = self.data.target(target_col, rows)
         
         # Check for single-class targets (no variance - can't train a model)
         unique_values = y.nunique()
@@ -539,7 +519,7 @@ class EnterpriseModelTraining:
             le = LabelEncoder()
             y = pd.Series(le.fit_transform(y))
         
-        return X.values, y, list(X.columns)
+        return rows, y, list(self.data.feature_names), fill_values
     
     def optimize_hyperparameters(self, X_train: np.ndarray, y_train: np.ndarray, 
                                  model_type: str, n_trials: int = 15) -> Dict[str, Any]:
@@ -655,21 +635,23 @@ class EnterpriseModelTraining:
         
         # 1. Prepare data
         print(f"\n📊 Preparing training data...")
-        X, y, feature_names = self.prepare_training_data(product, outcome)
-        print(f"   ✓ Samples: {len(X):,}")
+        rows, y, feature_names, fill_values = self.prepare_training_data(product, outcome)
+        print(f"   ✓ Samples: {len(rows):,}")
         print(f"   ✓ Features: {len(feature_names)}")
         print(f"   ✓ Target distribution: {np.unique(y, return_counts=True)}")
         
         # 2. Train-test split
         test_size = 0.2
         if self.model_configs[outcome]['type'] in ['binary_classification', 'multiclass_classification']:
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=RANDOM_SEED, stratify=y
+            train_rows, test_rows, y_train, y_test = train_test_split(
+                rows, y, test_size=test_size, random_state=RANDOM_SEED, stratify=y
             )
         else:
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=RANDOM_SEED
+            train_rows, test_rows, y_train, y_test = train_test_split(
+                rows, y, test_size=test_size, random_state=RANDOM_SEED
             )
+        # The only copies of the features: one float32 gather per split
+        X_train, X_test = self.data.X[train_rows], self.data.X[test_rows]
         
         print(f"\n📊 Train-Test Split:")
         print(f"   • Train: {len(X_train):,} ({(1-test_size)*100:.0f}%)")
@@ -934,6 +916,7 @@ class EnterpriseModelTraining:
             'feature_importance': feature_importance,
             'shap_values': shap_values,
             'feature_names': feature_names,
+            'fill_values': fill_values,
             'best_params': best_params,
             'training_time': duration,
             'train_size': len(X_train),
@@ -975,7 +958,16 @@ class EnterpriseModelTraining:
                     with open(model_file, 'wb') as f:
                         pickle.dump(result['model'], f)
                     
-                    print(f"\n💾 Model saved: {model_file.name}")
+                    # Save feature manifest next to the model (serving/scoring alignment contract)
+                    manifest = FeatureManifest(
+                        model_key=model_key,
+                        feature_names=result['feature_names'],
+                        dtypes=[self.data.source_dtypes[c] for c in result['feature_names']],
+                        fill_values=result['fill_values']
+                    )
+                    manifest.save(manifest_path(model_file))
+                    
+                    print(f"\n💾 Model saved: {model_file.name} (+ {manifest_path(model_file).name})")
                     
                     # Log training
                     self.audit_log['training_history'].append({
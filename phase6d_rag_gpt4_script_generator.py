@@ -60,14 +60,20 @@ COST & PERFORMANCE:
 
 import pandas as pd
 import numpy as np
+import asyncio
+import hashlib
 import os
 import json
 import pickle
+import shutil
+import threading
+import uuid
+from collections import ChainMap, OrderedDict
 import warnings
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple, Any, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import re
 from enum import Enum
 
@@ -88,12 +94,18 @@ except ImportError:
 
 # OpenAI GPT-4
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     HAS_OPENAI = True
 except ImportError:
     HAS_OPENAI = False
     print("WARNING: openai not installed - GPT-4 enhancement will not work")
 
+from model_inference import PRODUCTS, PredictionCache
+from compliance_matcher import PhraseMatcher, PhraseRole
+from content_index import ApprovedContentIndex
+from pipeline_metrics import record_llm_failure, record_llm_usage, time_stage
+from script_templates import CompiledText, compile_template, compile_text
+
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
@@ -114,6 +126,22 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 VECTOR_DB_DIR = BASE_DIR / 'ibsa-poc-eda' / 'outputs' / 'vector_db'
 VECTOR_DB_DIR.mkdir(parents=True, exist_ok=True)
 
+# RAG retrieval depth per script
+RAG_TOP_K = 5
+
+# Query embedding cache size (distinct scenario x specialty queries number in the hundreds)
+QUERY_CACHE_SIZE = 4096
+
+# HCP record field holding the specialty (Phase 4 feature column; also what warm-up reads)
+SPECIALTY_FIELD = 'Specialty'
+
+# Persisted vector index format (bump when the on-disk layout changes)
+VECTOR_INDEX_VERSION = 1
+
+# GPT-4 call limits (per process)
+GPT_TIMEOUT_SECONDS = 20.0
+GPT_MAX_CONCURRENCY = 16
+
 
 class ScenarioType(Enum):
     """Call script scenarios based on HCP characteristics"""
@@ -133,6 +161,7 @@ class ComplianceResult:
     missing_disclaimers: List[str]
     off_label_detected: bool
     fair_balance_issues: List[str]
+    violation_locations: List[Optional[List[int]]] = field(default_factory=list)  # [start, end] per violation
 
 
 @dataclass
@@ -176,6 +205,85 @@ class GeneratedScript:
         result['scenario'] = self.scenario.value
         result['compliance_result'] = asdict(self.compliance_result)
         return result
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GeneratedScript':
+        """Rebuild a script from to_dict() output (e.g. a cached script)"""
+        data = dict(data)
+        data['scenario'] = ScenarioType(data['scenario'])
+        data['compliance_result'] = ComplianceResult(**data['compliance_result'])
+        return cls(**data)
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU of RAG query embeddings for one embedding model
+    
+    Keys are normalised query text (lower-cased, whitespace collapsed).
+    The cache can be saved to / loaded from an .npz next to the vector index
+    so warm-up survives restarts.
+    """
+    
+    def __init__(self, embedding_model_name: str, max_size: int = QUERY_CACHE_SIZE,
+                 cache_path: Optional[Path] = None):
+        self.embedding_model_name = embedding_model_name
+        self.max_size = max_size
+        self.cache_path = cache_path
+        self._entries: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        return ' '.join(query.lower().split())
+    
+    def get(self, query: str) -> Optional[np.ndarray]:
+        key = self.normalize(query)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+    
+    def put(self, query: str, embedding: np.ndarray):
+        key = self.normalize(query)
+        with self._lock:
+            self._entries[key] = np.asarray(embedding, dtype='float32')
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def save(self):
+        """Persist the cache to cache_path (atomic replace)"""
+        if self.cache_path is None or not self._entries:
+            return
+        with self._lock:
+            queries = list(self._entries)
+            embeddings = np.vstack([self._entries[q] for q in queries])
+        
+        tmp_path = self.cache_path.with_name(f".{self.cache_path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, model=np.array(self.embedding_model_name), queries=np.array(queries), embeddings=embeddings)
+        os.replace(tmp_path, self.cache_path)
+    
+    def load(self) -> int:
+        """Load a persisted cache for the same model; returns the number of entries loaded"""
+        if self.cache_path is None or not self.cache_path.exists():
+            return 0
+        with np.load(self.cache_path) as data:
+            if str(data['model']) != self.embedding_model_name:
+                return 0
+            for query, embedding in zip(data['queries'].tolist(), data['embeddings']):
+                self.put(query, embedding)
+        return len(self._entries)
 
 
 class ComplianceAwareVectorDB:
@@ -186,12 +294,28 @@ class ComplianceAwareVectorDB:
     We use semantic search over pre-approved content for guaranteed compliance.
     """
     
-    def __init__(self, embedding_model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, embedding_model_name: str = 'all-MiniLM-L6-v2', include_expired_content: bool = False):
         self.embedding_model_name = embedding_model_name
         self.model = None
         self.index = None
         self.content_library = []
+        
+        # Keyed (product, category) / content_id lookups over the source library file
+        self.include_expired_content = include_expired_content
+        self.content_index: Optional[ApprovedContentIndex] = None
         self.embeddings = None
+        self.index_version: Optional[str] = None
+        
+        # Per-item metadata and lazily built (product, category) sub-indexes
+        self.item_products = np.array([], dtype=object)
+        self.item_categories = np.array([], dtype=object)
+        self._partitions: Dict[Tuple[Optional[str], Optional[str]], Tuple[np.ndarray, Any]] = {}
+        
+        # Query embeddings are reused across requests (see encode_queries)
+        model_slug = re.sub(r'[^A-Za-z0-9_.-]', '_', embedding_model_name)
+        self.query_cache = QueryEmbeddingCache(
+            embedding_model_name, cache_path=VECTOR_DB_DIR / f'query_cache_{model_slug}.npz'
+        )
         
         # Initialize embedding model
         if HAS_SENTENCE_TRANSFORMERS:
@@ -201,10 +325,24 @@ class ComplianceAwareVectorDB:
         else:
             print("   ✗ sentence-transformers not available")
     
+    def library_checksum(self, compliance_library_path: Path) -> str:
+        """Checksum of the content library + embedding model + index format"""
+        digest = hashlib.sha256(Path(compliance_library_path).read_bytes())
+        digest.update(f"|{self.embedding_model_name}|v{VECTOR_INDEX_VERSION}".encode())
+        return digest.hexdigest()
+    
+    @staticmethod
+    def index_dir(checksum: str) -> Path:
+        """Versioned directory holding the index built for one library checksum"""
+        return VECTOR_DB_DIR / f'index_{checksum[:16]}'
+    
     def build_index(self, compliance_library_path: Path):
         """
         Build FAISS index from compliance-approved content
         
+        The index, embedding matrix and content library are published into a
+        directory versioned by the library checksum (see load_or_build_index).
+        
         Args:
             compliance_library_path: Path to compliance_approved_content.json from Phase 6B
         """
@@ -218,6 +356,7 @@ class ComplianceAwareVectorDB:
         
         # Extract content array from nested structure if needed
         self.content_library = library_data.get('content', []) if isinstance(library_data, dict) and 'content' in library_data else library_data
+        self._attach_content_index(compliance_library_path)
         
         print(f"\n📥 Loaded {len(self.content_library)} MLR-approved content pieces")
         
@@ -232,90 +371,296 @@ class ComplianceAwareVectorDB:
             for item in self.content_library
         ]
         
-        self.embeddings = self.model.encode(texts, show_progress_bar=True)
+        self.embeddings = self.model.encode(texts, show_progress_bar=True).astype('float32')
         print(f"   ✓ Generated {len(self.embeddings)} embeddings")
         
         # Build FAISS index
         print(f"\n🏗️  Building FAISS index...")
         dimension = self.embeddings.shape[1]
         self.index = faiss.IndexFlatL2(dimension)  # L2 distance
-        self.index.add(self.embeddings.astype('float32'))
+        self.index.add(self.embeddings)
         print(f"   ✓ Index built ({self.index.ntotal} vectors, dim={dimension})")
+        self._index_metadata()
         
-        # Save index
-        index_path = VECTOR_DB_DIR / 'compliance_content_index.faiss'
-        faiss.write_index(self.index, str(index_path))
-        print(f"   ✓ Index saved: {index_path.name}")
-        
-        # Save content library
-        library_path = VECTOR_DB_DIR / 'content_library.json'
-        with open(library_path, 'w', encoding='utf-8') as f:
-            json.dump(self.content_library, f, indent=2)
-        print(f"   ✓ Content library saved: {library_path.name}")
+        # Save index, embeddings and content library under the library checksum
+        checksum = self.library_checksum(compliance_library_path)
+        index_dir = self._publish_index(checksum)
+        print(f"   ✓ Index saved: {index_dir.name}")
         
         print(f"\n✅ Vector DB ready: {len(self.content_library)} approved content pieces indexed")
     
-    def load_index(self):
-        """Load pre-built FAISS index"""
-        index_path = VECTOR_DB_DIR / 'compliance_content_index.faiss'
-        library_path = VECTOR_DB_DIR / 'content_library.json'
+    def _publish_index(self, checksum: str) -> Path:
+        """
+        Write the current index to its versioned directory
+        
+        Files are written to a temporary sibling and renamed into place, so
+        workers booting concurrently never read (or write) a half-built index.
+        """
+        index_dir = self.index_dir(checksum)
+        tmp_dir = VECTOR_DB_DIR / f".{index_dir.name}.{uuid.uuid4().hex}.tmp"
+        tmp_dir.mkdir(parents=True)
+        try:
+            faiss.write_index(self.index, str(tmp_dir / 'index.faiss'))
+            np.save(tmp_dir / 'embeddings.npy', self.embeddings)
+            with open(tmp_dir / 'content_library.json', 'w', encoding='utf-8') as f:
+                json.dump(self.content_library, f, indent=2)
+            
+            manifest = {
+                'version': VECTOR_INDEX_VERSION,
+                'checksum': checksum,
+                'embedding_model': self.embedding_model_name,
+                'dimension': int(self.embeddings.shape[1]),
+                'count': int(self.index.ntotal),
+                'created_at': datetime.now().isoformat()
+            }
+            with open(tmp_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            
+            try:
+                os.replace(tmp_dir, index_dir)
+            except OSError:
+                # Another worker published the same version first - keep theirs
+                pass
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        
+        return index_dir
+    
+    def load_index(self, compliance_library_path: Optional[Path] = None):
+        """
+        Load a pre-built FAISS index
         
-        if not index_path.exists() or not library_path.exists():
+        Args:
+            compliance_library_path: Load the index built for this library version
+                (default: the most recently built index)
+        """
+        if compliance_library_path is not None:
+            index_dir = self.index_dir(self.library_checksum(compliance_library_path))
+        else:
+            candidates = sorted(VECTOR_DB_DIR.glob('index_*/manifest.json'), key=lambda p: p.stat().st_mtime)
+            index_dir = candidates[-1].parent if candidates else None
+        
+        if index_dir is None or not (index_dir / 'manifest.json').exists():
             raise FileNotFoundError("Vector index not found. Run build_index() first.")
         
+        with open(index_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('embedding_model') != self.embedding_model_name:
+            raise FileNotFoundError(f"Vector index {index_dir.name} was built with {manifest.get('embedding_model')}")
+        
         if HAS_FAISS:
-            self.index = faiss.read_index(str(index_path))
+            self.index = faiss.read_index(str(index_dir / 'index.faiss'))
+        self.embeddings = np.load(index_dir / 'embeddings.npy')
         
-        with open(library_path, 'r', encoding='utf-8') as f:
+        with open(index_dir / 'content_library.json', 'r', encoding='utf-8') as f:
             self.content_library = json.load(f)
         
-        print(f"✓ Loaded vector index: {len(self.content_library)} content pieces")
+        self.index_version = manifest['checksum'][:16]
+        if HAS_FAISS:
+            self._index_metadata()
+        if compliance_library_path is not None:
+            self._attach_content_index(compliance_library_path)
+        print(f"✓ Loaded vector index {index_dir.name}: {len(self.content_library)} content pieces")
+    
+    def _attach_content_index(self, compliance_library_path: Path):
+        """Index the source library for keyed lookups (reloads itself when the file changes)"""
+        compliance_library_path = Path(compliance_library_path)
+        if self.content_index is None or self.content_index.library_path != compliance_library_path:
+            self.content_index = ApprovedContentIndex(
+                compliance_library_path, include_expired=self.include_expired_content
+            )
+        else:
+            self.content_index.refresh(force=True)
+    
+    def load_or_build_index(self, compliance_library_path: Path):
+        """Load the index matching the library's checksum, building it only if missing"""
+        try:
+            self.load_index(compliance_library_path)
+        except FileNotFoundError:
+            self.build_index(compliance_library_path)
+            if HAS_SENTENCE_TRANSFORMERS and HAS_FAISS:
+                self.index_version = self.library_checksum(compliance_library_path)[:16]
+    
+    def _index_metadata(self):
+        """
+        Compact per-item metadata used to partition the index
+        
+        Called whenever the index or library changes; partition sub-indexes
+        are rebuilt lazily on first use.
+        """
+        self.item_products = np.array([item.get('product', '') for item in self.content_library], dtype=object)
+        self.item_categories = np.array([item.get('category', '') for item in self.content_library], dtype=object)
+        self._partitions = {}
+        
+        if self.embeddings is None and self.index is not None and self.index.ntotal:
+            self.embeddings = self.index.reconstruct_n(0, self.index.ntotal)
+    
+    def _partition(self, product: Optional[str], category: Optional[str]) -> Tuple[np.ndarray, Any]:
+        """
+        Item positions and FAISS sub-index for one (product, category) filter
+        
+        None matches any value. The unfiltered partition is the main index.
+        """
+        key = (product, category)
+        if key not in self._partitions:
+            mask = np.ones(len(self.content_library), dtype=bool)
+            if product:
+                mask &= self.item_products == product
+            if category:
+                mask &= self.item_categories == category
+            positions = np.flatnonzero(mask)
+            
+            if product is None and category is None:
+                sub_index = self.index
+            else:
+                sub_index = faiss.IndexFlatL2(self.embeddings.shape[1])
+                if len(positions):
+                    sub_index.add(np.ascontiguousarray(self.embeddings[positions], dtype='float32'))
+            self._partitions[key] = (positions, sub_index)
+        
+        return self._partitions[key]
+    
+    def _servable(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Mask of library positions that may be served (same expiry policy as
+        the keyed content lookups; everything if no content index is attached)
+        """
+        if self.content_index is None:
+            return np.ones(len(positions), dtype=bool)
+        return np.fromiter((self.content_index.is_current(self.content_library[p]) for p in positions),
+                           dtype=bool, count=len(positions))
+    
+    def _search_partition(self, query_embeddings: np.ndarray, product: Optional[str],
+                          category: Optional[str], top_k: int) -> List[List[Dict]]:
+        """Exact top-k search of one partition for a matrix of query embeddings (expired items skipped)"""
+        positions, sub_index = self._partition(product, category)
+        servable = self._servable(positions)
+        # Search deep enough that top_k servable items survive the expiry filter
+        k = min(top_k + int((~servable).sum()), len(positions))
+        if k == 0 or not servable.any():
+            return [[] for _ in range(len(query_embeddings))]
+        
+        with time_stage('faiss_search'):
+            distances, indices = sub_index.search(np.ascontiguousarray(query_embeddings, dtype='float32'), k)
+        
+        results = []
+        for row_indices, row_distances in zip(indices, distances):
+            results.append([
+                {**self.content_library[positions[idx]],
+                 'relevance_score': float(1.0 / (1.0 + distance))}  # Convert distance to similarity
+                for idx, distance in zip(row_indices, row_distances) if idx >= 0 and servable[idx]
+            ][:top_k])
+        return results
+    
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed queries, serving repeats from the query cache
+        
+        Cache misses are encoded together in one batch.
+        """
+        embeddings = [self.query_cache.get(query) for query in queries]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        
+        if missing:
+            with time_stage('embedding'):
+                encoded = self.model.encode([queries[i] for i in missing], batch_size=64).astype('float32')
+            for i, embedding in zip(missing, encoded):
+                self.query_cache.put(queries[i], embedding)
+                embeddings[i] = embedding
+        
+        return np.vstack(embeddings)
+    
+    def warm_query_cache(self, queries: List[str]) -> int:
+        """Load the persisted query cache and embed any of `queries` still missing"""
+        loaded = self.query_cache.load()
+        if self.model is not None and queries:
+            self.encode_queries(list(dict.fromkeys(queries)))
+            self.query_cache.save()
+        return len(self.query_cache) - loaded
     
     def retrieve(self, query: str, product: Optional[str] = None, 
                  category: Optional[str] = None, top_k: int = 5) -> List[Dict]:
         """
         Retrieve relevant MLR-approved content via semantic search
         
+        Only the items matching product/category are searched, so the result
+        is the exact top_k of that partition (fewer only if the partition
+        itself has fewer items). Items whose MLR approval has expired are
+        never returned unless include_expired_content is set.
+        
         Args:
             query: Search query (e.g., "declining prescriptions objection handling")
             product: Filter by product (Tirosint, Flector, Licart, Portfolio)
-            category: Filter by category (PRODUCT_MESSAGING, CLINICAL_CLAIMS, etc.)
+            category: Filter by category (PRODUCT_MESSAGE, CLINICAL_CLAIM, etc.)
             top_k: Number of results to return
         
         Returns:
             List of relevant content pieces with metadata
         """
         if not HAS_SENTENCE_TRANSFORMERS or not HAS_FAISS or self.index is None:
-            # Fallback: return first 5 items
-            return self.content_library[:top_k]
+            # Fallback: first top_k servable items matching the filters
+            return [
+                item for item in self.content_library
+                if (not product or item.get('product') == product)
+                and (not category or item.get('category') == category)
+                and (self.content_index is None or self.content_index.is_current(item))
+            ][:top_k]
+        
+        # Query embedding (cached per normalised query text)
+        query_embedding = self.encode_queries([query])
+        
+        return self._search_partition(query_embedding, product, category, top_k)[0]
+    
+    def retrieve_many(self, queries: List[str],
+                      products: Optional[List[Optional[str]]] = None,
+                      categories: Optional[List[Optional[str]]] = None,
+                      top_k: int = 5) -> List[List[Dict]]:
+        """
+        Batch retrieve() for bulk script generation
         
-        # Generate query embedding
-        query_embedding = self.model.encode([query])[0].astype('float32')
+        Identical (query, product, category) requests are answered once. All
+        distinct query strings are embedded in a single encode() call, and each
+        (product, category) partition is searched once with every query that
+        targets it.
         
-        # Search FAISS index
-        distances, indices = self.index.search(
-            query_embedding.reshape(1, -1),
-            min(top_k * 3, len(self.content_library))  # Over-retrieve for filtering
-        )
+        Args:
+            queries: Search queries
+            products: Product filter per query (None = no filter)
+            categories: Category filter per query (None = no filter)
+            top_k: Number of results per query
         
-        # Get results
-        results = []
-        for idx, distance in zip(indices[0], distances[0]):
-            content = self.content_library[idx].copy()
-            content['relevance_score'] = float(1.0 / (1.0 + distance))  # Convert distance to similarity
-            
-            # Apply filters
-            if product and content['product'] != product:
-                continue
-            if category and content['category'] != category:
-                continue
-            
-            results.append(content)
-            
-            if len(results) >= top_k:
-                break
+        Returns:
+            One result list per query, in input order
+        """
+        if not queries:
+            return []
+        products = products or [None] * len(queries)
+        categories = categories or [None] * len(queries)
+        requests = list(zip(queries, products, categories))
+        unique_requests = list(dict.fromkeys(requests))
         
-        return results
+        if not HAS_SENTENCE_TRANSFORMERS or not HAS_FAISS or self.index is None:
+            answers = {req: self.retrieve(*req, top_k=top_k) for req in unique_requests}
+            return [answers[req] for req in requests]
+        
+        # One embedding pass over the distinct query strings
+        unique_queries = list(dict.fromkeys(query for query, _, _ in unique_requests))
+        query_row = {query: i for i, query in enumerate(unique_queries)}
+        query_embeddings = self.encode_queries(unique_queries)
+        
+        # One multi-query search per (product, category) partition
+        by_partition: Dict[Tuple[Optional[str], Optional[str]], List[Tuple[str, Optional[str], Optional[str]]]] = {}
+        for req in unique_requests:
+            by_partition.setdefault((req[1], req[2]), []).append(req)
+        
+        answers = {}
+        for (product, category), partition_requests in by_partition.items():
+            rows = [query_row[query] for query, _, _ in partition_requests]
+            partition_results = self._search_partition(query_embeddings[rows], product, category, top_k)
+            answers.update(zip(partition_requests, partition_results))
+        
+        return [answers[req] for req in requests]
 
 
 class ComplianceChecker:
@@ -323,8 +668,22 @@ class ComplianceChecker:
     Final safety gate - validates generated scripts for compliance
     
     CRITICAL: This is the last line of defense against non-compliant content
+    
+    All phrase checks run off one PhraseMatcher (Aho-Corasick) built at load
+    time, so a script is scanned once regardless of how many terms exist.
     """
     
+    SAFETY_SECTION_MARKER = 'important safety information:'
+    CRITICAL_DISCLAIMERS = ['prescribing_info', 'individual_results', 'adverse_events']
+    OFF_LABEL_INDICATORS = {
+        'tirosint': ['weight loss', 'obesity', 'cosmetic'],
+        'flector': ['chronic pain', 'long-term use', 'oral'],
+        'licart': ['children', 'pediatric', 'under 18']
+    }
+    # Fair balance keywords match as stems ('risk' also matches 'risks')
+    BENEFIT_KEYWORDS = ['effective', 'efficacy', 'benefit', 'improvement', 'success']
+    RISK_KEYWORDS = ['risk', 'adverse', 'side effect', 'safety', 'contraindication', 'not for treatment']
+    
     def __init__(self, compliance_dir: Path):
         self.compliance_dir = compliance_dir
         
@@ -339,9 +698,27 @@ class ComplianceChecker:
             # Disclaimers are stored as a dict, not a list
             self.required_disclaimers = data['disclaimers']
         
+        self.matcher = self._build_matcher()
+        
         print(f"✓ ComplianceChecker loaded: {len(self.prohibited_terms)} prohibited terms, "
               f"{len(self.required_disclaimers)} required disclaimers")
     
+    def _build_matcher(self) -> PhraseMatcher:
+        matcher = PhraseMatcher()
+        matcher.add(self.SAFETY_SECTION_MARKER, PhraseRole('safety_marker', self.SAFETY_SECTION_MARKER, whole_word=False))
+        for term in self.prohibited_terms:
+            matcher.add(term, PhraseRole('prohibited', term))
+        for product, indicators in self.OFF_LABEL_INDICATORS.items():
+            matcher.add(product, PhraseRole('product', product))
+            for indicator in indicators:
+                matcher.add(indicator, PhraseRole('off_label', indicator))
+        for keyword in self.BENEFIT_KEYWORDS:
+            matcher.add(keyword, PhraseRole('benefit', keyword, whole_word=False))
+        for keyword in self.RISK_KEYWORDS:
+            matcher.add(keyword, PhraseRole('risk', keyword, whole_word=False))
+        matcher.build()
+        return matcher
+    
     def check_script(self, script_text: str, disclaimers_included: List[str]) -> ComplianceResult:
         """
         Comprehensive compliance validation
@@ -349,65 +726,62 @@ class ComplianceChecker:
         CONTEXT-AWARE: Allows prohibited terms in required safety disclaimers
         
         Returns:
-            ComplianceResult with detailed violations and severity
+            ComplianceResult with detailed violations, severity and the
+            [start, end] character offsets of each phrase violation
         """
         violations = []
+        locations = []
         prohibited_found = []
         missing_disclaimers = []
         fair_balance_issues = []
         off_label_detected = False
         
-        script_lower = script_text.lower()
+        # Single pass: first occurrence of every phrase role in the script
+        first_seen: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        for match in self.matcher.scan(script_text):
+            first_seen.setdefault((match.role.kind, match.role.label), (match.start, match.end))
         
-        # Extract safety disclaimer section (if present) to exclude from checks
-        safety_section = ""
-        if "important safety information:" in script_lower:
-            safety_start = script_lower.find("important safety information:")
-            safety_section = script_lower[safety_start:]
+        # Everything from the safety disclaimer section onwards is not promotional content
+        marker = first_seen.get(('safety_marker', self.SAFETY_SECTION_MARKER))
+        safety_start = marker[0] if marker else len(script_text)
         
-        # Create promotional content only (exclude safety disclaimers)
-        if safety_section:
-            promotional_content = script_lower.replace(safety_section, "")
-        else:
-            promotional_content = script_lower
+        def in_promotional(kind: str, label: str) -> Optional[Tuple[int, int]]:
+            span = first_seen.get((kind, label))
+            return span if span is not None and span[0] < safety_start else None
         
         # 1. Prohibited terms check (only in promotional content, NOT in safety disclaimers)
         for term in self.prohibited_terms:
-            if term.lower() in promotional_content:
+            span = in_promotional('prohibited', term)
+            if span:
                 prohibited_found.append(term)
                 violations.append(f"Prohibited term found in promotional content: '{term}'")
+                locations.append(list(span))
         
         # 2. Required disclaimers check
-        critical_disclaimers = ['prescribing_info', 'individual_results', 'adverse_events']
-        for disc_id in critical_disclaimers:
+        for disc_id in self.CRITICAL_DISCLAIMERS:
             if disc_id not in disclaimers_included:
                 missing_disclaimers.append(disc_id)
                 violations.append(f"Missing required disclaimer: {disc_id}")
+                locations.append(None)
         
         # 3. Off-label detection (product-specific, only in promotional content)
-        off_label_indicators = {
-            'tirosint': ['weight loss', 'obesity', 'cosmetic'],
-            'flector': ['chronic pain', 'long-term use', 'oral'],
-            'licart': ['children', 'pediatric', 'under 18']
-        }
-        
-        for product, indicators in off_label_indicators.items():
-            if product in promotional_content:
+        for product, indicators in self.OFF_LABEL_INDICATORS.items():
+            if in_promotional('product', product):
                 for indicator in indicators:
-                    if indicator in promotional_content:
+                    span = in_promotional('off_label', indicator)
+                    if span:
                         off_label_detected = True
                         violations.append(f"Potential off-label indication: '{indicator}' for {product}")
+                        locations.append(list(span))
         
         # 4. Fair balance check (benefits must be accompanied by risks)
-        benefit_keywords = ['effective', 'efficacy', 'benefit', 'improvement', 'success']
-        risk_keywords = ['risk', 'adverse', 'side effect', 'safety', 'contraindication', 'not for treatment']
-        
-        has_benefits = any(kw in promotional_content for kw in benefit_keywords)
-        has_risks = any(kw in script_lower for kw in risk_keywords)  # Check entire script including disclaimers
+        has_benefits = any(in_promotional('benefit', kw) for kw in self.BENEFIT_KEYWORDS)
+        has_risks = any(('risk', kw) in first_seen for kw in self.RISK_KEYWORDS)  # Check entire script including disclaimers
         
         if has_benefits and not has_risks:
             fair_balance_issues.append("Benefits mentioned without corresponding safety information")
             violations.append("Fair balance violation: benefits without risks")
+            locations.append(None)
         
         # Determine severity
         if prohibited_found or off_label_detected:
@@ -428,7 +802,8 @@ class ComplianceChecker:
             prohibited_terms_found=prohibited_found,
             missing_disclaimers=missing_disclaimers,
             off_label_detected=off_label_detected,
-            fair_balance_issues=fair_balance_issues
+            fair_balance_issues=fair_balance_issues,
+            violation_locations=locations
         )
 
 
@@ -519,6 +894,36 @@ class ScenarioClassifier:
         return scenario, priority, reasoning
 
 
+# NGD class codes used by the Phase 6 ngd_category models
+NGD_LABELS = {0: 'DECLINER', 1: 'GROWER', 2: 'NEW'}
+
+
+def summarize_model_predictions(model_outputs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add the per-product keys ScenarioClassifier reads to raw model outputs
+
+    Model outputs are keyed '{Product}_{outcome}_pred' / '_prob' (see
+    model_inference.score_model); the classifier reads e.g.
+    'tirosint_call_success_prob', 'tirosint_prescription_lift', 'tirosint_ngd'.
+    """
+    predictions = dict(model_outputs)
+    for product in PRODUCTS:
+        prefix = product.lower()
+        call_success = model_outputs.get(f'{product}_call_success_prob')
+        if call_success is not None:
+            predictions[f'{prefix}_call_success_prob'] = call_success
+        lift = model_outputs.get(f'{product}_prescription_lift_pred')
+        if lift is not None:
+            predictions[f'{prefix}_prescription_lift'] = lift
+        wallet = model_outputs.get(f'{product}_wallet_share_growth_pred')
+        if wallet is not None:
+            predictions[f'{prefix}_wallet_share_growth'] = wallet
+        ngd = model_outputs.get(f'{product}_ngd_category_pred')
+        if ngd is not None:
+            predictions[f'{prefix}_ngd'] = NGD_LABELS.get(int(ngd), 'STABLE')
+    return predictions
+
+
 class GPT4ScriptEnhancer:
     """
     GPT-4o-mini enhancement with compliance constraints
@@ -527,19 +932,27 @@ class GPT4ScriptEnhancer:
     We use GPT-4o-mini + RAG + strict compliance constraints.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None,
+                 timeout: float = GPT_TIMEOUT_SECONDS,
+                 max_concurrency: int = GPT_MAX_CONCURRENCY):
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         self.client = None
+        self.async_client = None
         self.model = "gpt-4o-mini"  # Cost-effective, high-quality
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
         
         if HAS_OPENAI and self.api_key:
-            self.client = OpenAI(api_key=self.api_key)
-            print(f"✓ GPT-4 enhancer initialized (model={self.model})")
+            self.client = OpenAI(api_key=self.api_key, timeout=timeout)
+            self.async_client = AsyncOpenAI(api_key=self.api_key, timeout=timeout)
+            print(f"✓ GPT-4 enhancer initialized (model={self.model}, timeout={timeout:.0f}s, "
+                  f"max_concurrency={max_concurrency})")
         else:
             print("✗ OpenAI not available - will use template-only generation")
     
     def enhance_script(self, template_script: str, hcp_profile: Dict, 
-                      rag_content: List[Dict], scenario: ScenarioType) -> Tuple[str, float]:
+                      rag_content: List[Dict], scenario: ScenarioType) -> Tuple[str, float, bool]:
         """
         Enhance template script with GPT-4o-mini personalization
         
@@ -547,49 +960,94 @@ class GPT4ScriptEnhancer:
         It cannot add new claims or go off-label.
         
         Returns:
-            (enhanced_script, estimated_cost)
+            (enhanced_script, estimated_cost, enhanced) - enhanced is False when
+            the template was returned as a fallback
         """
         if not self.client:
-            return template_script, 0.0  # Fallback to template
+            return template_script, 0.0, False  # Fallback to template
         
         # Build prompt with strict constraints
         prompt = self._build_compliance_prompt(template_script, hcp_profile, rag_content, scenario)
         
         try:
             start_time = datetime.now()
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a pharmaceutical compliance expert. You MUST use ONLY the provided MLR-approved content. Do NOT add new medical claims or go off-label. Maintain professional tone suitable for HCP interactions."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,  # Balanced creativity/consistency
-                max_tokens=800,  # Keep scripts concise
-                top_p=0.9
-            )
-            
-            enhanced_script = response.choices[0].message.content
-            
-            # Estimate cost (GPT-4o-mini pricing: ~$0.15 per 1M input tokens, ~$0.60 per 1M output tokens)
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
-            estimated_cost = (input_tokens * 0.15 / 1_000_000) + (output_tokens * 0.60 / 1_000_000)
-            
-            duration = (datetime.now() - start_time).total_seconds()
-            print(f"   ✓ GPT-4 enhancement: {duration:.2f}s, ${estimated_cost:.4f}, {output_tokens} tokens")
-            
-            return enhanced_script, estimated_cost
+            with time_stage('llm_call'):
+                response = self.client.chat.completions.create(**self._chat_request(prompt))
+            return self._parse_response(response, start_time)
+        
+        except Exception as e:
+            print(f"   ✗ GPT-4 enhancement failed: {e}")
+            record_llm_failure(self.model, 'error')
+            return template_script, 0.0, False  # Fallback to template
+    
+    async def enhance_script_async(self, template_script: str, hcp_profile: Dict,
+                                   rag_content: List[Dict], scenario: ScenarioType) -> Tuple[str, float, bool]:
+        """
+        Non-blocking enhance_script for the API event loop
         
+        At most `max_concurrency` calls are in flight per process; each is
+        bounded by `timeout` and falls back to the template on any failure.
+        """
+        if not self.async_client:
+            return template_script, 0.0, False  # Fallback to template
+        
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        prompt = self._build_compliance_prompt(template_script, hcp_profile, rag_content, scenario)
+        
+        try:
+            async with self._semaphore:
+                start_time = datetime.now()
+                with time_stage('llm_call'):
+                    response = await asyncio.wait_for(
+                        self.async_client.chat.completions.create(**self._chat_request(prompt)),
+                        timeout=self.timeout
+                    )
+            return self._parse_response(response, start_time)
+        
+        except asyncio.TimeoutError:
+            print(f"   ✗ GPT-4 enhancement timed out after {self.timeout:.0f}s")
+            record_llm_failure(self.model, 'timeout')
+            return template_script, 0.0, False  # Fallback to template
         except Exception as e:
             print(f"   ✗ GPT-4 enhancement failed: {e}")
-            return template_script, 0.0  # Fallback to template
+            record_llm_failure(self.model, 'error')
+            return template_script, 0.0, False  # Fallback to template
+    
+    def _chat_request(self, prompt: str) -> Dict:
+        """Chat completion arguments shared by the sync and async clients"""
+        return dict(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a pharmaceutical compliance expert. You MUST use ONLY the provided MLR-approved content. Do NOT add new medical claims or go off-label. Maintain professional tone suitable for HCP interactions."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.7,  # Balanced creativity/consistency
+            max_tokens=800,  # Keep scripts concise
+            top_p=0.9
+        )
+    
+    def _parse_response(self, response: Any, start_time: datetime) -> Tuple[str, float, bool]:
+        """Extract the enhanced script, estimate its cost and record token usage"""
+        enhanced_script = response.choices[0].message.content
+        
+        # Estimate cost (GPT-4o-mini pricing: ~$0.15 per 1M input tokens, ~$0.60 per 1M output tokens)
+        input_tokens = response.usage.prompt_tokens
+        output_tokens = response.usage.completion_tokens
+        estimated_cost = (input_tokens * 0.15 / 1_000_000) + (output_tokens * 0.60 / 1_000_000)
+        record_llm_usage(self.model, input_tokens, output_tokens, estimated_cost)
+        
+        duration = (datetime.now() - start_time).total_seconds()
+        print(f"   ✓ GPT-4 enhancement: {duration:.2f}s, ${estimated_cost:.4f}, {output_tokens} tokens")
+        
+        return enhanced_script, estimated_cost, True
     
     def _build_compliance_prompt(self, template: str, hcp_profile: Dict, 
                                  rag_content: List[Dict], scenario: ScenarioType) -> str:
@@ -608,7 +1066,7 @@ class GPT4ScriptEnhancer:
         hcp_context = f"""
 HCP Profile:
 - Name: {hcp_profile.get('hcp_name', 'Dr. [Name]')}
-- Specialty: {hcp_profile.get('specialty', '[Specialty]')}
+- Specialty: {hcp_profile.get(SPECIALTY_FIELD) or '[Specialty]'}
 - Current TRx: {hcp_profile.get('current_trx', 0):.0f}/month
 - IBSA Share: {hcp_profile.get('ibsa_share', 0)*100:.1f}%
 - Scenario: {scenario.value.upper()}
@@ -657,22 +1115,40 @@ class HybridScriptGenerator:
     8. Assemble complete script with metadata
     """
     
-    def __init__(self):
+    def __init__(self, feature_store: Optional[Any] = None,
+                 inference_engine: Optional[Any] = None,
+                 prediction_cache: Optional[PredictionCache] = None,
+                 gpt4_enhancer: Optional[GPT4ScriptEnhancer] = None,
+                 compliance_dir: Optional[Path] = None,
+                 templates_path: Optional[Path] = None):
+        """
+        Args:
+            feature_store: HCPFeatureStore for HCP lookups (see hcp_feature_store.py)
+            inference_engine: MicroBatchInferenceEngine wrapping the Phase 6 models
+            prediction_cache: Cache shared with the API, keyed by (HCP, model version)
+            gpt4_enhancer: Preconfigured enhancer (default timeout/concurrency otherwise)
+            compliance_dir: Prohibited terms / disclaimers directory (default: COMPLIANCE_DIR)
+            templates_path: call_script_templates.json (default: TEMPLATES_DIR)
+        """
         self.vector_db = ComplianceAwareVectorDB()
-        self.compliance_checker = ComplianceChecker(COMPLIANCE_DIR)
-        self.gpt4_enhancer = GPT4ScriptEnhancer()
+        self.compliance_checker = ComplianceChecker(compliance_dir or COMPLIANCE_DIR)
+        self.gpt4_enhancer = gpt4_enhancer or GPT4ScriptEnhancer()
         
         # Load templates
+        self.templates_path = templates_path or TEMPLATES_DIR / 'call_script_templates.json'
+        self._layouts: Dict[str, CompiledText] = {}
         self.templates = self._load_templates()
         
-        # Load models (placeholder - actual models from Phase 6)
-        self.models = {}  # Will load .pkl files from MODELS_DIR
+        # Feature lookups and model inference (attached by the API or __main__)
+        self.feature_store = feature_store
+        self.inference_engine = inference_engine
+        self.prediction_cache = prediction_cache or PredictionCache()
         
         print("\n✅ HybridScriptGenerator initialized")
     
     def _load_templates(self) -> Dict:
         """Load call script templates from Phase 6C"""
-        template_path = TEMPLATES_DIR / 'call_script_templates.json'
+        template_path = self.templates_path
         
         if template_path.exists():
             with open(template_path, 'r', encoding='utf-8') as f:
@@ -681,13 +1157,23 @@ class HybridScriptGenerator:
             # Templates are already stored as a dict keyed by scenario
             templates = data.get('templates', {}) if isinstance(data, dict) else data
             print(f"✓ Loaded {len(templates)} call script templates")
+            
+            # Compile every template string and the per-scenario script layout once
+            self._layouts = {}
+            for scenario, template in templates.items():
+                _, unknown = compile_template(template)
+                self._layouts[scenario] = compile_text(self._script_layout(template))
+                if unknown:
+                    print(f"   ⚠️  Template '{scenario}': no provider for {', '.join(sorted(unknown))}")
             return templates
         else:
             print("✗ Templates not found - run Phase 6C first")
             return {}
     
     def generate_script(self, hcp_id: str, use_gpt4: bool = True, 
-                       use_rag: bool = True) -> GeneratedScript:
+                       use_rag: bool = True,
+                       hcp_features: Optional[Dict] = None,
+                       predictions: Optional[Dict] = None) -> GeneratedScript:
         """
         Generate complete call script for HCP
         
@@ -695,26 +1181,84 @@ class HybridScriptGenerator:
             hcp_id: HCP identifier
             use_gpt4: Enable GPT-4 enhancement (default True)
             use_rag: Enable RAG retrieval (default True)
+            hcp_features: Precomputed HCP feature record (skips the feature lookup)
+            predictions: Precomputed model outputs (skips inference)
         
         Returns:
             GeneratedScript with all components and metadata
         """
+        context = self.prepare_script(hcp_id, use_rag, hcp_features, predictions)
+        
+        # 7. GPT-4 enhancement (optional)
+        enhanced_script, gpt_cost, gpt4_enhanced = context['filled_script'], 0.0, False
+        if use_gpt4 and self.gpt4_enhancer.client:
+            print("\n🤖 Enhancing with GPT-4o-mini...")
+            enhanced_script, gpt_cost, gpt4_enhanced = self.gpt4_enhancer.enhance_script(
+                context['filled_script'], context['hcp_features'], context['rag_content'], context['scenario']
+            )
+        
+        return self.finalize_script(context, enhanced_script, gpt_cost, gpt4_enhanced)
+    
+    async def generate_script_async(self, hcp_id: str, use_gpt4: bool = True,
+                                    use_rag: bool = True,
+                                    hcp_features: Optional[Dict] = None,
+                                    predictions: Optional[Dict] = None,
+                                    executor: Optional[Any] = None) -> GeneratedScript:
+        """
+        generate_script for an asyncio event loop
+        
+        The CPU-bound stages (template fill, embedding + FAISS search, compliance
+        check) run on `executor` (default loop executor if None); the GPT-4 call
+        goes through the async client, so the loop is never blocked.
+        """
+        loop = asyncio.get_running_loop()
+        context = await loop.run_in_executor(
+            executor, self.prepare_script, hcp_id, use_rag, hcp_features, predictions
+        )
+        
+        # 7. GPT-4 enhancement (optional)
+        enhanced_script, gpt_cost, gpt4_enhanced = context['filled_script'], 0.0, False
+        if use_gpt4 and self.gpt4_enhancer.async_client:
+            print("\n🤖 Enhancing with GPT-4o-mini...")
+            enhanced_script, gpt_cost, gpt4_enhanced = await self.gpt4_enhancer.enhance_script_async(
+                context['filled_script'], context['hcp_features'], context['rag_content'], context['scenario']
+            )
+        
+        return await loop.run_in_executor(
+            executor, self.finalize_script, context, enhanced_script, gpt_cost, gpt4_enhanced
+        )
+    
+    def prepare_script(self, hcp_id: str, use_rag: bool = True,
+                       hcp_features: Optional[Dict] = None,
+                       predictions: Optional[Dict] = None) -> Dict:
+        """
+        Steps 1-6: features, predictions, scenario, template fill and RAG retrieval
+        
+        Returns:
+            Generation context consumed by the GPT-4 step and finalize_script()
+        """
         start_time = datetime.now()
         
         print(f"\n{'='*100}")
         print(f"🎬 GENERATING CALL SCRIPT: HCP {hcp_id}")
         print(f"{'='*100}")
         
-        # 1. Load HCP features (placeholder - load from Phase 4 output)
-        hcp_features = self._load_hcp_features(hcp_id)
+        # 1. Load HCP features (unless the caller already has them)
+        if hcp_features is None:
+            with time_stage('feature_lookup'):
+                hcp_features = self._load_hcp_features(hcp_id)
         print(f"\n✓ HCP features loaded: {len(hcp_features)} attributes")
         
-        # 2. Run ML predictions (placeholder - use Phase 6 models)
-        predictions = self._run_predictions(hcp_features)
+        # 2. Run ML predictions (unless the caller already has them)
+        if predictions is None:
+            with time_stage('inference'):
+                predictions = self._run_predictions(hcp_id)
+        predictions = summarize_model_predictions(predictions)
         print(f"✓ ML predictions: {len(predictions)} targets")
         
         # 3. Classify scenario
-        scenario, priority, reasoning = ScenarioClassifier.classify(hcp_features, predictions)
+        with time_stage('scenario_classification'):
+            scenario, priority, reasoning = ScenarioClassifier.classify(hcp_features, predictions)
         print(f"✓ Scenario classified: {scenario.value.upper()} (Priority: {priority})")
         
         # 4. Select template
@@ -725,41 +1269,114 @@ class HybridScriptGenerator:
         print(f"✓ Template selected: {template['scenario']}")
         
         # 5. Fill template with HCP data
-        filled_script = self._fill_template(template, hcp_features, predictions, reasoning)
-        generation_method = "template_only"
-        rag_content_used = []
-        estimated_cost = 0.0
+        with time_stage('template_fill'):
+            filled_script = self._fill_template(template, hcp_features, predictions, reasoning)
+        
+        context = {
+            'hcp_id': hcp_id,
+            'start_time': start_time,
+            'hcp_features': hcp_features,
+            'predictions': predictions,
+            'scenario': scenario,
+            'priority': priority,
+            'template': template,
+            'filled_script': filled_script,
+            'rag_content': [],
+            'rag_content_used': [],
+            'generation_method': "template_only"
+        }
         
         # 6. RAG retrieval (optional)
-        if use_rag and HAS_FAISS and self.vector_db.index is not None:
+        if use_rag and self.rag_ready:
             print(f"\n🔍 Retrieving MLR-approved content via RAG...")
-            query = f"{scenario.value} scenario for {hcp_features.get('specialty', 'HCP')}"
-            rag_content = self.vector_db.retrieve(
-                query=query,
-                product="Tirosint",  # TODO: Make product-specific
-                top_k=5
-            )
-            print(f"   ✓ Retrieved {len(rag_content)} relevant content pieces")
-            rag_content_used = [c['content_id'] for c in rag_content]
-            generation_method = "template_rag"
-        else:
-            rag_content = []
+            query, product = self._rag_query(context)
+            self._attach_rag(context, self.vector_db.retrieve(query=query, product=product, top_k=RAG_TOP_K))
         
-        # 7. GPT-4 enhancement (optional)
-        enhanced_script = filled_script
-        if use_gpt4 and self.gpt4_enhancer.client:
-            print(f"\n🤖 Enhancing with GPT-4o-mini...")
-            enhanced_script, gpt_cost = self.gpt4_enhancer.enhance_script(
-                filled_script, hcp_features, rag_content, scenario
-            )
-            estimated_cost += gpt_cost
-            generation_method = "template_rag_gpt4"
+        return context
+    
+    @property
+    def rag_ready(self) -> bool:
+        return HAS_FAISS and self.vector_db.index is not None
+    
+    @staticmethod
+    def _rag_query(context: Dict) -> Tuple[str, str]:
+        """RAG (query, product filter) for a prepared script"""
+        specialty = context['hcp_features'].get(SPECIALTY_FIELD) or 'HCP'
+        query = HybridScriptGenerator._rag_query_text(context['scenario'], specialty)
+        return query, "Tirosint"  # TODO: Make product-specific
+    
+    @staticmethod
+    def _rag_query_text(scenario: ScenarioType, specialty: str) -> str:
+        return f"{scenario.value} scenario for {specialty}"
+    
+    def warm_rag_queries(self, specialties: List[str]) -> int:
+        """
+        Pre-embed the scenario x specialty query grid
+        
+        specialties are values of the SPECIALTY_FIELD column, the same field
+        _rag_query reads from each HCP record.
+        
+        Returns:
+            Number of queries newly embedded (the rest came from the persisted cache)
+        """
+        if not self.rag_ready or self.vector_db.model is None:
+            return 0
+        queries = [
+            self._rag_query_text(scenario, specialty)
+            for scenario in ScenarioType
+            for specialty in ['HCP'] + [s for s in specialties if s]
+        ]
+        return self.vector_db.warm_query_cache(queries)
+    
+    @staticmethod
+    def _attach_rag(context: Dict, rag_content: List[Dict]):
+        print(f"   ✓ Retrieved {len(rag_content)} relevant content pieces")
+        context['rag_content'] = rag_content
+        context['rag_content_used'] = [c['content_id'] for c in rag_content]
+        context['generation_method'] = "template_rag"
+    
+    def generate_scripts(self, hcp_ids: List[str], use_gpt4: bool = True,
+                         use_rag: bool = True) -> List[GeneratedScript]:
+        """
+        Generate scripts for many HCPs (e.g. overnight pre-generation for a territory)
+        
+        Same output as calling generate_script() per HCP, but RAG retrieval
+        for the whole batch goes through one retrieve_many() call.
+        """
+        contexts = [self.prepare_script(hcp_id, use_rag=False) for hcp_id in hcp_ids]
+        
+        if use_rag and self.rag_ready and contexts:
+            print(f"\n🔍 Retrieving MLR-approved content via RAG for {len(contexts)} HCPs...")
+            queries, products = zip(*[self._rag_query(context) for context in contexts])
+            rag_results = self.vector_db.retrieve_many(list(queries), products=list(products), top_k=RAG_TOP_K)
+            for context, rag_content in zip(contexts, rag_results):
+                self._attach_rag(context, rag_content)
+        
+        scripts = []
+        for context in contexts:
+            enhanced_script, gpt_cost, gpt4_enhanced = context['filled_script'], 0.0, False
+            if use_gpt4 and self.gpt4_enhancer.client:
+                enhanced_script, gpt_cost, gpt4_enhanced = self.gpt4_enhancer.enhance_script(
+                    context['filled_script'], context['hcp_features'], context['rag_content'], context['scenario']
+                )
+            scripts.append(self.finalize_script(context, enhanced_script, gpt_cost, gpt4_enhanced))
+        
+        return scripts
+    
+    def finalize_script(self, context: Dict, enhanced_script: str,
+                        estimated_cost: float, gpt4_enhanced: bool) -> GeneratedScript:
+        """Steps 8-10: compliance check, approval sources and script assembly"""
+        template = context['template']
+        scenario = context['scenario']
+        rag_content = context['rag_content']
+        generation_method = "template_rag_gpt4" if gpt4_enhanced else context['generation_method']
         
         # 8. Compliance check (CRITICAL - final safety gate)
         print(f"\n🛡️  Running compliance check...")
         # Templates store disclaimers as a list of strings (IDs)
         disclaimers_included = template.get('script_structure', {}).get('required_disclaimers', [])
-        compliance_result = self.compliance_checker.check_script(enhanced_script, disclaimers_included)
+        with time_stage('compliance_check'):
+            compliance_result = self.compliance_checker.check_script(enhanced_script, disclaimers_included)
         
         if compliance_result.is_compliant:
             print(f"   ✓ COMPLIANT: Script passed all checks")
@@ -774,13 +1391,13 @@ class HybridScriptGenerator:
             approval_sources = [c['approval']['approval_id'] for c in rag_content]
         
         # 10. Assemble final script
-        generation_time = (datetime.now() - start_time).total_seconds()
+        generation_time = (datetime.now() - context['start_time']).total_seconds()
         
         script = GeneratedScript(
-            hcp_id=hcp_id,
+            hcp_id=context['hcp_id'],
             scenario=scenario,
-            priority=priority,
-            predictions=predictions,
+            priority=context['priority'],
+            predictions=context['predictions'],
             opening=template.get('script_structure', {}).get('opening', ''),
             talking_points=template.get('script_structure', {}).get('key_talking_points', []),
             objection_handlers=template.get('script_structure', {}).get('objection_handlers', {}),
@@ -792,13 +1409,13 @@ class HybridScriptGenerator:
             approval_sources=approval_sources,
             compliance_result=compliance_result,
             template_used=scenario.value,
-            rag_content_used=rag_content_used,
-            gpt4_enhanced=use_gpt4 and self.gpt4_enhancer.client is not None,
+            rag_content_used=context['rag_content_used'],
+            gpt4_enhanced=gpt4_enhanced,
             generation_method=generation_method,
             generation_time=generation_time,
             estimated_cost=estimated_cost,
             generated_at=datetime.now().isoformat(),
-            model_versions={'phase6_models': '20251027', 'gpt4': self.gpt4_enhancer.model}
+            model_versions={'phase6_models': self.model_version, 'gpt4': self.gpt4_enhancer.model}
         )
         
         print(f"\n✅ Script generated in {generation_time:.2f}s (${estimated_cost:.4f})")
@@ -807,30 +1424,65 @@ class HybridScriptGenerator:
         
         return script
     
+    @property
+    def model_version(self) -> str:
+        """Version of the attached Phase 6 models ('' without an engine)"""
+        return self.inference_engine.model_version if self.inference_engine is not None else ''
+    
     def _load_hcp_features(self, hcp_id: str) -> Dict:
-        """Load HCP features (placeholder - implement actual loading)"""
-        # TODO: Load from Phase 4 feature CSV
-        return {
-            'hcp_id': hcp_id,
-            'hcp_name': 'Dr. John Smith',
-            'specialty': 'Endocrinology',
-            'current_trx_tirosint': 15.0,
-            'trx_trend_6m': -8.5,
-            'ibsa_share_of_wallet': 0.32,
-            'sample_roi': 0.12,
-            'is_new_hcp': False
-        }
+        """Load the HCP's Phase 4 feature record from the feature store"""
+        if self.feature_store is None:
+            # Standalone demo without a feature store - use a fixed sample profile
+            print("   ⚠️  No feature store attached - using demo HCP profile")
+            return {
+                'hcp_id': hcp_id,
+                'hcp_name': 'Dr. John Smith',
+                SPECIALTY_FIELD: 'Endocrinology',
+                'current_trx_tirosint': 15.0,
+                'trx_trend_6m': -8.5,
+                'ibsa_share_of_wallet': 0.32,
+                'sample_roi': 0.12,
+                'is_new_hcp': False
+            }
+        
+        hcp_features = self.feature_store.get(hcp_id)
+        if hcp_features is None:
+            raise ValueError(f"HCP {hcp_id} not found in feature store")
+        return hcp_features
     
-    def _run_predictions(self, hcp_features: Dict) -> Dict:
-        """Run 12 ML models (placeholder - implement actual predictions)"""
-        # TODO: Load models from Phase 6 and run predictions
-        return {
-            'tirosint_call_success_prob': 0.78,
-            'tirosint_prescription_lift': -5.2,
-            'tirosint_ngd': 'DECLINER',
-            'flector_call_success_prob': 0.45,
-            'licart_call_success_prob': 0.62
-        }
+    def _run_predictions(self, hcp_id: str) -> Dict:
+        """Run the Phase 6 models for an HCP (served from the prediction cache when warm)"""
+        if self.inference_engine is None or self.feature_store is None:
+            print("   ⚠️  No models attached - skipping ML predictions")
+            return {}
+        
+        predictions = self.prediction_cache.get(hcp_id, self.model_version)
+        if predictions is not None:
+            return predictions
+        
+        feature_row = self.feature_store.numeric_row(hcp_id)
+        if feature_row is None:
+            raise ValueError(f"HCP {hcp_id} not found in feature store")
+        
+        predictions = self.inference_engine.predict_batch(feature_row[np.newaxis, :])[0]
+        self.prediction_cache.put(hcp_id, self.model_version, predictions)
+        return predictions
+    
+    @staticmethod
+    def _script_layout(template: Dict) -> str:
+        """Plain-text script layout (opening, talking points, CTA, next steps) for a template"""
+        script_structure = template.get('script_structure', {})
+        return f"""
+OPENING: {script_structure.get('opening', '')}
+
+KEY TALKING POINTS:
+{chr(10).join([f"• {point}" for point in script_structure.get('key_talking_points', [])])}
+
+CALL TO ACTION: {script_structure.get('call_to_action', {}).get('primary', '')}
+
+NEXT STEPS:
+{chr(10).join([f"{i+1}. {step}" for i, step in enumerate(script_structure.get('next_steps', []))])}
+"""
     
     def _fill_template(self, template: Dict, hcp_features: Dict, 
                       predictions: Dict, reasoning: Dict) -> str:
@@ -842,8 +1494,6 @@ class HybridScriptGenerator:
         2. Adding required safety disclaimers
         3. Ensuring fair balance (risks with benefits)
         """
-        script_structure = template.get('script_structure', {})
-        
         # Get actual MLR-approved content for this product
         product_focus = predictions.get('product_focus', 'Tirosint')
         
@@ -853,31 +1503,13 @@ class HybridScriptGenerator:
         approved_safety = self._get_approved_content(product_focus, 'SAFETY_INFO')
         approved_objection = self._get_approved_content(product_focus, 'OBJECTION_HANDLER')
         
-        # Simple slot filling (basic implementation)
-        filled = f"""
-OPENING: {script_structure.get('opening', '')}
-
-KEY TALKING POINTS:
-{chr(10).join([f"• {point}" for point in script_structure.get('key_talking_points', [])])}
-
-CALL TO ACTION: {script_structure.get('call_to_action', {}).get('primary', '')}
-
-NEXT STEPS:
-{chr(10).join([f"{i+1}. {step}" for i, step in enumerate(script_structure.get('next_steps', []))])}
-"""
-        
-        # Replace HCP feature placeholders
-        for key, value in hcp_features.items():
-            placeholder = '{' + key + '}'
-            filled = filled.replace(placeholder, str(value))
-        
-        # Replace approval content reference placeholders
-        filled = filled.replace('[INSERT PRODUCT-SPECIFIC APPROVED MESSAGING FROM LIBRARY]', 
-                               approved_messaging or '[Contact medical affairs for approved messaging]')
-        filled = filled.replace('[INSERT CLINICAL CLAIMS FROM LIBRARY]', 
-                               approved_clinical or '[Contact medical affairs for approved clinical claims]')
-        filled = filled.replace('[USE APPROVED OBJECTION HANDLER: TIR-OBJ-001 or GEN-OBJ-001]', 
-                               approved_objection or '[Contact medical affairs for approved objection handlers]')
+        # Slot filling from the precompiled layout: approved content first, then HCP features
+        layout = self._layouts.get(template.get('scenario')) or compile_text(self._script_layout(template))
+        filled = layout.render(ChainMap({
+            'approved_messaging': approved_messaging or '[Contact medical affairs for approved messaging]',
+            'approved_clinical': approved_clinical or '[Contact medical affairs for approved clinical claims]',
+            'approved_objection': approved_objection or '[Contact medical affairs for approved objection handlers]'
+        }, hcp_features))
         
         # Add required safety disclaimers for fair balance (FDA requirement)
         if approved_safety:
@@ -894,18 +1526,11 @@ NEXT STEPS:
             category: Content category (PRODUCT_MESSAGE, CLINICAL_CLAIM, etc.)
         
         Returns:
-            Approved content text or empty string if not found
+            Approved content text or empty string if not found (or its approval expired)
         """
-        if not self.vector_db.content_library:
+        if self.vector_db.content_index is None:
             return ""
-        
-        # Find matching content
-        for content_item in self.vector_db.content_library:
-            if (content_item.get('product', '').lower() == product.lower() and 
-                content_item.get('category', '') == category):
-                return content_item.get('content', '')
-        
-        return ""
+        return self.vector_db.content_index.get_content(product, category)
     
     def save_script(self, script: GeneratedScript):
         """Save generated script to JSON"""
@@ -930,7 +1555,7 @@ def initialize_system():
     compliance_library_path = COMPLIANCE_DIR / 'compliance_approved_content.json'
     
     if compliance_library_path.exists():
-        vector_db.build_index(compliance_library_path)
+        vector_db.load_or_build_index(compliance_library_path)
     else:
         print(f"\n✗ Compliance library not found: {compliance_library_path}")
         print("   Run Phase 6B first to create compliance-approved content")
@@ -964,8 +1589,8 @@ if __name__ == '__main__':
         # Test script generation
         generator = HybridScriptGenerator()
         
-        # Load vector index
-        generator.vector_db.load_index()
+        # Load vector index (built by initialize_system above)
+        generator.vector_db.load_index(COMPLIANCE_DIR / 'compliance_approved_content.json')
         
         # Generate test script
         script = generator.generate_script(
@@ -6,6 +6,8 @@ REST API with 4 endpoints:
 2. GET /health - System health check
 3. POST /validate-script - Validate rep-edited scripts for compliance
 4. GET /models/status - ML model performance metrics
+5. POST /admin/reload - Hot-reload compliance rules, templates and models
+6. GET /metrics - Prometheus per-stage latency, cache and LLM cost metrics
 
 Features:
 - API key authentication
@@ -18,16 +20,20 @@ Features:
 
 from fastapi import FastAPI, HTTPException, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, List, Any
 import os
 import time
 import json
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-import pandas as pd
 import joblib
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -36,8 +42,21 @@ from slowapi.errors import RateLimitExceeded
 # Import our components
 from phase6d_rag_gpt4_script_generator import (
     HybridScriptGenerator,
-    ComplianceChecker
+    ComplianceChecker,
+    GPT4ScriptEnhancer,
+    SPECIALTY_FIELD,
+    summarize_model_predictions
 )
+from hcp_feature_store import HCPFeatureStore
+from model_inference import MicroBatchInferenceEngine, PredictionCache, model_version
+from hcp_rules import derive_fields
+from model_pool import ModelPool, backend_for, parse_backend_overrides
+from feature_manifest import FeaturePlan, resolve_manifest
+from script_cache import ScriptCache, script_cache_key
+from validate_scripts_bulk import create_pool, validate_stream
+from script_templates import compile_text, render_value
+from artifact_registry import ArtifactRegistry, ArtifactVersion
+from pipeline_metrics import REGISTRY as METRICS, time_stage
 
 # Configure logging
 logging.basicConfig(
@@ -75,6 +94,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request throughput and end-to-end latency per endpoint
+REQUESTS_TOTAL = METRICS.counter('api_requests_total', 'API requests by endpoint and status', ['endpoint', 'method', 'status'])
+REQUEST_SECONDS = METRICS.histogram('api_request_seconds', 'API request latency by endpoint', ['endpoint'])
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count and time every request, labelled by route template (not raw path)"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        endpoint = getattr(route, 'path', 'unmatched')
+        REQUESTS_TOTAL.inc(endpoint=endpoint, method=request.method, status=str(status))
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+
 # ============================================================================
 # GLOBAL STATE & CONFIGURATION
 # ============================================================================
@@ -84,24 +122,64 @@ class APIConfig:
     API_KEY = os.getenv("API_KEY", "ibsa-ai-script-generator-2025")
     MAX_REQUESTS_PER_MINUTE = 30
     MODEL_DIR = Path("ibsa-poc-eda/outputs/models/trained_models")
+    MODEL_POOL_DIR = Path("ibsa-poc-eda/outputs/models/trained_models/pool")  # mmap exports shared by all workers
+    MODEL_BACKEND = os.getenv("MODEL_BACKEND", "compiled")  # compiled | packed | original (compiled falls back to packed)
+    MODEL_BACKEND_OVERRIDES = parse_backend_overrides(os.getenv("MODEL_BACKEND_OVERRIDES", ""))  # e.g. "Tirosint_call_success=original"
     DATA_DIR = Path("ibsa-poc-eda/outputs")
     FEATURES_FILE = Path("ibsa-poc-eda/outputs/features/IBSA_FeatureEngineered_WithLags_20251022_1117.csv")
+    FEATURE_STORE_DIR = Path("ibsa-poc-eda/outputs/features/feature_store")
     COMPLIANCE_DIR = Path("ibsa-poc-eda/outputs/compliance")
-    FAISS_INDEX_PATH = "compliance_content_index.faiss"
     CONTENT_LIBRARY_PATH = "content_library.json"
+    INFERENCE_MAX_BATCH_SIZE = 64  # Max /predict-hcp requests coalesced per model call
+    INFERENCE_MAX_WAIT_MS = 5.0  # How long the first request waits for others to join
+    PREDICTION_CACHE_SIZE = 50000  # Per-HCP predictions kept per model version
+    SCRIPT_WORKER_THREADS = 4  # Template fill, embedding/FAISS and compliance stages
+    GPT_TIMEOUT_SECONDS = 20.0  # Per GPT-4 call; falls back to the template on timeout
+    GPT_MAX_CONCURRENCY = 32  # GPT-4 calls in flight per worker
+    SCRIPT_CACHE_DIR = Path("ibsa-poc-eda/outputs/generated_scripts/cache")
+    SCRIPT_CACHE_MEMORY_ENTRIES = 2000
+    SCRIPT_CACHE_TTL_SECONDS = 24 * 3600
+    SCRIPT_CACHE_DISK_ENTRIES = 50000  # Disk tier cap (LRU files beyond it are pruned)
+    SCRIPT_CACHE_DISK_BYTES = 512 * 1024 * 1024
+    TEMPLATES_FILE = Path("ibsa-poc-eda/outputs/call_scripts/call_script_templates.json")
+    VALIDATION_WORKERS = 4  # Processes for /validate-scripts
+    MAX_BULK_VALIDATION_SCRIPTS = 50000
+    ALLOW_EXPIRED_CONTENT = False  # Serve library content whose MLR approval has expired
+    ARTIFACT_WATCH_INTERVAL_SECONDS = 10.0  # Source-file poll for hot reload (0 = admin endpoint only)
+    RELOAD_DRAIN_SECONDS = 120.0  # Max wait for in-flight requests before closing an old version
     
 config = APIConfig()
 
+@dataclass
+class ServingArtifacts:
+    """
+    Everything built from compliance rules, templates and trained models
+    
+    Loaded and swapped as one version by the artifact registry; a request
+    uses the version that was current when it started.
+    """
+    script_generator: HybridScriptGenerator
+    compliance_checker: ComplianceChecker
+    ml_models: Dict[str, Any]
+    model_files: Dict[str, Path]
+    model_backends: Dict[str, str]  # model name -> backend actually loaded (compiled/packed/joblib/original)
+    inference_engine: MicroBatchInferenceEngine
+    validation_pool: Any  # multiprocessing.Pool for bulk validation
+
 # Global components (loaded on startup)
-script_generator: Optional[HybridScriptGenerator] = None
-compliance_checker: Optional[ComplianceChecker] = None
-ml_models: Dict[str, Any] = {}
-feature_data: Optional[pd.DataFrame] = None
+registry: Optional[ArtifactRegistry] = None  # Current ServingArtifacts, hot-reloadable
+feature_store: Optional[HCPFeatureStore] = None
+prediction_cache = PredictionCache(max_size=config.PREDICTION_CACHE_SIZE)
+script_executor: Optional[ThreadPoolExecutor] = None
+script_cache: Optional[ScriptCache] = None
 
 # Product and outcome definitions
 PRODUCTS = ['Tirosint', 'Flector', 'Licart']
 OUTCOMES = ['call_success', 'prescription_lift', 'ngd_category', 'wallet_share_growth']
 
+# Non-feature columns (legacy positional alignment for models without a feature manifest)
+METADATA_COLS = ['PrescriberId', 'Specialty', 'State', 'Name', 'City', 'Territory', 'Tier']
+
 # ============================================================================
 # REQUEST/RESPONSE MODELS
 # ============================================================================
@@ -149,14 +227,26 @@ class ScriptResponse(BaseModel):
 class ValidateScriptRequest(BaseModel):
     """Request model for script validation"""
     script_text: str = Field(..., description="Full script text to validate")
+    disclaimers_included: List[str] = Field(default_factory=list, description="Disclaimer IDs included with the script (e.g. prescribing_info)")
     
     class Config:
         json_schema_extra = {
             "example": {
-                "script_text": "Good morning Dr. Smith, I wanted to discuss Tirosint for your hypothyroid patients..."
+                "script_text": "Good morning Dr. Smith, I wanted to discuss Tirosint for your hypothyroid patients...",
+                "disclaimers_included": ["prescribing_info", "individual_results", "adverse_events"]
             }
         }
 
+class BulkValidationItem(BaseModel):
+    """One script in a bulk validation request"""
+    id: str = Field(..., description="Caller's identifier, echoed back in the result")
+    script_text: str
+    disclaimers_included: List[str] = Field(default_factory=list)
+
+class BulkValidateRequest(BaseModel):
+    """Request model for bulk script validation"""
+    scripts: List[BulkValidationItem]
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
@@ -199,67 +289,205 @@ async def verify_api_key(x_api_key: str = Header(...)):
 # STARTUP/SHUTDOWN EVENTS
 # ============================================================================
 
+def watched_sources() -> Dict[str, Path]:
+    """Files a serving artifact version is built from (any change triggers a reload)"""
+    sources = {
+        'prohibited_terms': config.COMPLIANCE_DIR / 'prohibited_terms.json',
+        'required_disclaimers': config.COMPLIANCE_DIR / 'required_disclaimers.json',
+        'content_library': config.COMPLIANCE_DIR / 'compliance_approved_content.json',
+        'templates': config.TEMPLATES_FILE
+    }
+    for product in PRODUCTS:
+        for outcome in OUTCOMES:
+            model_name = f"model_{product}_{outcome}"
+            sources[model_name] = config.MODEL_DIR / f"{model_name}.pkl"
+    return sources
+
+def build_artifacts() -> ServingArtifacts:
+    """Load a complete artifact version (blocking - runs off the event loop)"""
+    # 1. Load script generator (also owns the compliance checker)
+    logger.info("Loading HybridScriptGenerator...")
+    script_generator = HybridScriptGenerator(
+        feature_store=feature_store,
+        prediction_cache=prediction_cache,
+        gpt4_enhancer=GPT4ScriptEnhancer(
+            timeout=config.GPT_TIMEOUT_SECONDS,
+            max_concurrency=config.GPT_MAX_CONCURRENCY
+        ),
+        compliance_dir=config.COMPLIANCE_DIR,
+        templates_path=config.TEMPLATES_FILE
+    )
+    
+    # 1.5. Load compliance content index (rebuilt only when the library changes)
+    compliance_library_path = config.COMPLIANCE_DIR / 'compliance_approved_content.json'
+    if compliance_library_path.exists():
+        logger.info(f"Loading compliance content index for: {compliance_library_path}")
+        script_generator.vector_db.include_expired_content = config.ALLOW_EXPIRED_CONTENT
+        script_generator.vector_db.load_or_build_index(compliance_library_path)
+        logger.info(f"[OK] Script generator loaded ({len(script_generator.vector_db.content_library)} content pieces)")
+        content_index = script_generator.vector_db.content_index
+        if content_index is not None and content_index.usable_count() == 0:
+            logger.error(f"[ERROR] No approved content is currently servable ({len(content_index)} items, "
+                         f"all expired or without approval) - scripts will use fallback text")
+    else:
+        logger.warning(f"[WARN] Compliance library not found: {compliance_library_path}")
+        logger.info(f"[OK] Script generator loaded (0 content pieces)")
+    
+    # 2. Compliance checker
+    compliance_checker = script_generator.compliance_checker
+    logger.info(f"[OK] Compliance checker loaded ({len(compliance_checker.prohibited_terms)} prohibited terms)")
+    
+    # 3. Load ML models (12 trained models) - memory-mapped from the model pool, so
+    #    workers share one copy; the first worker after a retrain exports the new .pkl.
+    #    Each model uses its configured backend (compiled native code by default)
+    logger.info("Loading ML models...")
+    model_pool = ModelPool(config.MODEL_POOL_DIR)
+    ml_models: Dict[str, Any] = {}
+    model_files: Dict[str, Path] = {}
+    for product in PRODUCTS:
+        for outcome in OUTCOMES:
+            model_name = f"model_{product}_{outcome}"
+            model_file = config.MODEL_DIR / f"{model_name}.pkl"
+            if model_file.exists():
+                try:
+                    backend = backend_for(model_name, config.MODEL_BACKEND, config.MODEL_BACKEND_OVERRIDES)
+                    ml_models[model_name] = model_pool.load(model_name, model_file, backend)
+                    model_files[model_name] = model_file
+                    logger.info(f"  [OK] Loaded: {model_name} ({model_pool.backends[model_name]})")
+                except Exception as e:
+                    logger.error(f"  [FAIL] Failed to load {model_name}: {e}")
+            else:
+                logger.warning(f"  [MISS] Not found: {model_name}")
+    
+    logger.info(f"[OK] Loaded {len(ml_models)}/12 ML models")
+    
+    # 4. Compile feature plan and create the micro-batched inference engine
+    engine_models = {}
+    manifests = {}
+    source_columns = feature_store.numeric_columns if feature_store is not None else []
+    legacy_columns = [c for c in source_columns if c not in METADATA_COLS]
+    for product in PRODUCTS:
+        for outcome in OUTCOMES:
+            model_name = f"model_{product}_{outcome}"
+            if model_name in ml_models:
+                model_key = f"{product}_{outcome}"
+                engine_models[model_key] = ml_models[model_name]
+                manifests[model_key] = resolve_manifest(
+                    model_key, ml_models[model_name], model_files[model_name], legacy_columns
+                )
+    
+    feature_plan = FeaturePlan(manifests, source_columns)
+    logger.info(f"[OK] Feature plan compiled: {len(feature_plan.input_columns)} input columns for {len(manifests)} models")
+    
+    inference_engine = MicroBatchInferenceEngine(
+        engine_models,
+        plan=feature_plan,
+        max_batch_size=config.INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms=config.INFERENCE_MAX_WAIT_MS,
+        model_version=model_version(model_files)
+    )
+    logger.info(f"[OK] Model version: {inference_engine.model_version}")
+    
+    # 5. Share inference with the script generator
+    script_generator.inference_engine = inference_engine
+    
+    # 6. Pre-warm RAG query embeddings for the scenario x specialty grid
+    specialties = []
+    if feature_store is not None and SPECIALTY_FIELD in feature_store.text:
+        specialties = sorted(set(feature_store.text[SPECIALTY_FIELD].tolist()))
+    warmed = script_generator.warm_rag_queries(specialties)
+    logger.info(f"[OK] RAG query cache warm: {len(script_generator.vector_db.query_cache)} queries ({warmed} newly embedded)")
+    
+    # 7. Process pool for bulk validation (each worker loads its own checker);
+    #    started last so a failed load leaves no processes behind
+    validation_pool = create_pool(config.COMPLIANCE_DIR, config.VALIDATION_WORKERS)
+    logger.info(f"[OK] Validation pool started ({config.VALIDATION_WORKERS} workers)")
+    
+    return ServingArtifacts(
+        script_generator=script_generator,
+        compliance_checker=compliance_checker,
+        ml_models=ml_models,
+        model_files=model_files,
+        model_backends=dict(model_pool.backends),
+        inference_engine=inference_engine,
+        validation_pool=validation_pool
+    )
+
+async def load_artifacts() -> ServingArtifacts:
+    """Build an artifact version in the background and start its inference engine"""
+    artifacts = await asyncio.get_running_loop().run_in_executor(None, build_artifacts)
+    await artifacts.inference_engine.start()
+    return artifacts
+
+async def close_artifacts(artifacts: ServingArtifacts):
+    """Release a retired artifact version (called once its requests have finished)"""
+    await artifacts.inference_engine.stop()
+    artifacts.script_generator.vector_db.query_cache.save()
+    artifacts.validation_pool.terminate()
+
+def acquire_artifacts() -> ArtifactVersion:
+    """Lease the current artifact version for one request (release with registry.release)"""
+    if registry is None or registry.current is None:
+        raise HTTPException(status_code=503, detail="Service artifacts not loaded")
+    return registry.acquire()
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize components on startup"""
-    global script_generator, compliance_checker, ml_models, feature_data
+    global registry, feature_store, script_executor, script_cache
     
     logger.info("="*80)
     logger.info("STARTING IBSA AI CALL SCRIPT GENERATOR API")
     logger.info("="*80)
     
     try:
-        # 1. Load script generator
-        logger.info("Loading HybridScriptGenerator...")
-        script_generator = HybridScriptGenerator()
+        script_executor = ThreadPoolExecutor(
+            max_workers=config.SCRIPT_WORKER_THREADS,
+            thread_name_prefix='script'
+        )
         
-        # 1.5. Build compliance content index (critical for MLR-approved content)
-        compliance_library_path = config.COMPLIANCE_DIR / 'compliance_approved_content.json'
-        if compliance_library_path.exists():
-            logger.info(f"Building compliance content index from: {compliance_library_path}")
-            script_generator.vector_db.build_index(compliance_library_path)
-            logger.info(f"[OK] Script generator loaded ({len(script_generator.vector_db.content_library)} content pieces)")
+        # 1. Open HCP feature store (memory-mapped, O(1) lookups for all HCPs)
+        logger.info("Opening HCP feature store...")
+        if config.FEATURES_FILE.exists():
+            feature_store = HCPFeatureStore.open_or_build(config.FEATURES_FILE, config.FEATURE_STORE_DIR)
+            logger.info(f"[OK] Feature store ready: {len(feature_store)} HCPs, {len(feature_store.columns)} features")
+        elif HCPFeatureStore.exists(config.FEATURE_STORE_DIR):
+            feature_store = HCPFeatureStore(config.FEATURE_STORE_DIR)
+            logger.info(f"[OK] Feature store ready (source CSV not present): {len(feature_store)} HCPs")
         else:
-            logger.warning(f"[WARN] Compliance library not found: {compliance_library_path}")
-            logger.info(f"[OK] Script generator loaded (0 content pieces)")
-        
-        # 2. Load compliance checker
-        logger.info("Loading ComplianceChecker...")
-        compliance_checker = ComplianceChecker(config.COMPLIANCE_DIR)
-        logger.info(f"[OK] Compliance checker loaded ({len(compliance_checker.prohibited_terms)} prohibited terms)")
+            logger.warning(f"[WARN] Feature data not found: {config.FEATURES_FILE}")
         
-        # 3. Load ML models (9 trained models)
-        logger.info("Loading ML models...")
-        loaded_count = 0
-        for product in PRODUCTS:
-            for outcome in OUTCOMES:
-                model_name = f"model_{product}_{outcome}"
-                model_file = config.MODEL_DIR / f"{model_name}.pkl"
-                if model_file.exists():
-                    try:
-                        import pickle
-                        with open(model_file, 'rb') as f:
-                            ml_models[model_name] = pickle.load(f)
-                        loaded_count += 1
-                        logger.info(f"  [OK] Loaded: {model_name}")
-                    except Exception as e:
-                        logger.error(f"  [FAIL] Failed to load {model_name}: {e}")
-                else:
-                    logger.warning(f"  [MISS] Not found: {model_name}")
+        # 2. Load script generator, compliance rules and models as one versioned artifact set
+        registry = ArtifactRegistry(
+            load_artifacts,
+            close_artifacts,
+            watched_sources,
+            drain_timeout=config.RELOAD_DRAIN_SECONDS
+        )
+        await registry.reload(force=True, reason='startup')
         
-        logger.info(f"[OK] Loaded {loaded_count}/12 ML models")
+        # 3. Script cache (invalidated when the content library, templates or compliance rules change)
+        sources = watched_sources()
+        script_cache = ScriptCache(
+            config.SCRIPT_CACHE_DIR,
+            watched_files={
+                name: sources[name]
+                for name in ('content_library', 'templates', 'prohibited_terms', 'required_disclaimers')
+            },
+            max_memory_entries=config.SCRIPT_CACHE_MEMORY_ENTRIES,
+            ttl_seconds=config.SCRIPT_CACHE_TTL_SECONDS,
+            max_disk_entries=config.SCRIPT_CACHE_DISK_ENTRIES,
+            max_disk_bytes=config.SCRIPT_CACHE_DISK_BYTES
+        )
+        logger.info(f"[OK] Script cache ready ({config.SCRIPT_CACHE_DIR})")
         
-        # 4. Load feature data cache (for quick lookups)
-        logger.info("Loading feature data cache...")
-        if config.FEATURES_FILE.exists():
-            # Load first 1000 HCPs for quick predictions
-            feature_data = pd.read_csv(config.FEATURES_FILE, nrows=1000, low_memory=False)
-            logger.info(f"[OK] Loaded feature cache: {len(feature_data)} HCPs, {len(feature_data.columns)} features")
-        else:
-            logger.warning(f"[WARN] Feature data not found: {config.FEATURES_FILE}")
+        # 4. Hot reload: new rules/templates/models are loaded in the background and swapped in
+        if config.ARTIFACT_WATCH_INTERVAL_SECONDS > 0:
+            registry.start_watching(config.ARTIFACT_WATCH_INTERVAL_SECONDS)
+            logger.info(f"[OK] Watching artifact sources every {config.ARTIFACT_WATCH_INTERVAL_SECONDS:.0f}s")
         
         logger.info("="*80)
-        logger.info("API READY - All components loaded successfully")
+        logger.info(f"API READY - All components loaded successfully (artifacts {registry.version})")
         logger.info("="*80)
         
     except Exception as e:
@@ -270,76 +498,131 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down IBSA AI Call Script Generator API")
+    if registry is not None:
+        await registry.close()
+    if script_executor is not None:
+        script_executor.shutdown(wait=False)
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
 def load_hcp_features(hcp_id: str) -> Dict[str, Any]:
-    """Load HCP features from dataset"""
-    if feature_data is None:
+    """Load HCP features from the feature store (O(1) lookup by PrescriberId)"""
+    if feature_store is None:
         raise HTTPException(status_code=500, detail="Feature data not loaded")
     
-    # Try to find HCP - feature data uses 'PrescriberId' column
-    hcp_data = feature_data[feature_data['PrescriberId'] == int(hcp_id)]
+    with time_stage('feature_lookup'):
+        hcp_data = feature_store.get(hcp_id)
     
-    if hcp_data.empty:
+    if hcp_data is None:
         raise HTTPException(
             status_code=404,
             detail=f"HCP {hcp_id} not found in dataset"
         )
     
-    return hcp_data.iloc[0].to_dict()
-
-def run_ml_predictions(hcp_features: Dict[str, Any]) -> Dict[str, Any]:
-    """Run ML predictions for HCP"""
-    predictions = {}
-    
-    # For demo, return mock predictions
-    # In production, this would run actual ML models
-    predictions = {
-        'tirosint_call_success': 0.72,
-        'tirosint_prescription_lift': 8.5,
-        'tirosint_ngd_category': 'Moderate Growth',
-        'tirosint_wallet_share_growth': 4.5,
-        'flector_call_success': 0.45,
-        'flector_wallet_share_growth': 3.2,
-        'licart_call_success': 0.38,
-        'licart_wallet_share_growth': 5.1
-    }
+    return hcp_data
+
+async def get_hcp_predictions(hcp_id: str, artifacts: ServingArtifacts) -> Dict[str, Any]:
+    """
+    Model outputs for an HCP, shared through the prediction cache
+    
+    One inference pass per (HCP, model version): /predict-hcp and
+    /generate-call-script reuse each other's results.
+    """
+    inference_engine = artifacts.inference_engine
+    if feature_store is None:
+        raise HTTPException(status_code=503, detail="Feature data not loaded")
+    if inference_engine is None:
+        logger.error(f"No inference engine in the current artifacts - cannot score HCP {hcp_id}")
+        raise HTTPException(status_code=503, detail="ML models not loaded")
+    
+    predictions = prediction_cache.get(hcp_id, inference_engine.model_version)
+    if predictions is not None:
+        return predictions
+    
+    hcp_features = feature_store.numeric_row(hcp_id)
+    if hcp_features is None:
+        raise HTTPException(status_code=404, detail=f"HCP {hcp_id} not found in feature data")
     
+    # Coalesced with concurrent requests by the micro-batching engine
+    with time_stage('inference'):
+        predictions = await inference_engine.predict(hcp_features)
+    prediction_cache.put(hcp_id, inference_engine.model_version, predictions)
     return predictions
 
-def get_approved_content(product: str, category: str) -> str:
+def get_approved_content(product: str, category: str, artifacts: ServingArtifacts) -> str:
     """
     Retrieve MLR-approved content from the compliance library
     
     Args:
         product: Product name (Tirosint, Flector, Licart)
         category: Content category (PRODUCT_MESSAGE, CLINICAL_CLAIM, SAFETY_INFO, OBJECTION_HANDLER)
+        artifacts: Artifact version serving the request
     
     Returns:
         Approved content text or fallback message if not found
     """
-    if not script_generator or not script_generator.vector_db.content_library:
+    content_index = artifacts.script_generator.vector_db.content_index
+    if content_index is None:
         return "[Contact medical affairs for approved content]"
     
-    # Find matching content
-    for content_item in script_generator.vector_db.content_library:
-        if (content_item.get('product', '').lower() == product.lower() and 
-            content_item.get('category', '') == category):
-            return content_item.get('content', '')
+    # Keyed lookup; expired approvals are skipped unless ALLOW_EXPIRED_CONTENT
+    # (semantic retrieval applies the same policy)
+    return content_index.get_content(product, category) or "[Contact medical affairs for approved content]"
+
+
+def time_of_day() -> str:
+    """Greeting bucket for the current hour (part of the script cache key)"""
+    current_hour = datetime.now().hour
+    if current_hour < 12:
+        return "morning"
+    elif current_hour < 17:
+        return "afternoon"
+    return "evening"
+
+def placeholder_context(product: str, artifacts: ServingArtifacts, hcp_features: Dict = None) -> Dict[str, Any]:
+    """
+    Slot values for rendering template placeholders (see script_templates.py)
+    
+    Built once per script; every template string is then rendered in a single pass.
+    """
+    # Approved content and generic fallbacks
+    context = {
+        'approved_messaging': get_approved_content(product, 'PRODUCT_MESSAGE', artifacts),
+        'approved_clinical': get_approved_content(product, 'CLINICAL_CLAIM', artifacts),
+        'approved_objection': get_approved_content(product, 'OBJECTION_HANDLER', artifacts),
+        'product': product,
+        'unique_differentiators': 'unique formulation and delivery characteristics',
+        'specific_characteristics': 'specific clinical needs',
+        'specific_needs': 'particular therapeutic requirements'
+    }
     
-    return "[Contact medical affairs for approved content]"
+    # HCP-specific placeholders with actual data
+    if hcp_features:
+        context.update({
+            'time_of_day': time_of_day(),
+            'product_focus': product,
+            # HCP name (use actual name if available)
+            'hcp_name': hcp_features.get('ProfessionalName', hcp_features.get('hcp_name', 'Doctor')),
+            'specialty': hcp_features.get('ProfessionalDesignation', hcp_features.get('specialty', 'your specialty')),
+            # Competitive threat (simplified - use top competitor)
+            'competitive_threat': 'generic levothyroxine',
+            # TRx decline percentage (calculate if data available)
+            'trx_decline_pct': f"{abs(hcp_features.get('trx_trend_6m', 0)):.0f}"
+        })
+    
+    return context
 
 
-def replace_placeholders_in_text(text: str, product: str, hcp_features: Dict = None) -> str:
+def replace_placeholders_in_text(text: str, product: str, artifacts: ServingArtifacts, hcp_features: Dict = None) -> str:
     """
     Replace placeholder text with actual MLR-approved content AND HCP data
     
     Args:
         text: Text containing placeholders like [INSERT...] and {hcp_name}
         product: Product name for content retrieval
+        artifacts: Artifact version serving the request
         hcp_features: HCP data dictionary for personalization
     
     Returns:
@@ -347,128 +630,35 @@ def replace_placeholders_in_text(text: str, product: str, hcp_features: Dict = N
     """
     if not isinstance(text, str):
         return str(text)
-    
-    # Replace product-specific messaging placeholder
-    text = text.replace(
-        '[INSERT PRODUCT-SPECIFIC APPROVED MESSAGING FROM LIBRARY]',
-        get_approved_content(product, 'PRODUCT_MESSAGE')
-    )
-    
-    # Replace clinical claims placeholder
-    text = text.replace(
-        '[INSERT CLINICAL CLAIMS FROM LIBRARY]',
-        get_approved_content(product, 'CLINICAL_CLAIM')
-    )
-    
-    # Replace objection handler placeholders (multiple variations)
-    objection_content = get_approved_content(product, 'OBJECTION_HANDLER')
-    text = text.replace('[USE APPROVED OBJECTION HANDLER: TIR-OBJ-001 or GEN-OBJ-001]', objection_content)
-    text = text.replace('[USE APPROVED OBJECTION HANDLER: TIR-OBJ-001]', objection_content)
-    text = text.replace('[USE APPROVED OBJECTION HANDLER: GEN-OBJ-001]', objection_content)
-    
-    # Replace generic placeholders (as fallback)
-    text = text.replace('[PRODUCT]', product)
-    text = text.replace('[UNIQUE DIFFERENTIATORS]', 'unique formulation and delivery characteristics')
-    text = text.replace('[SPECIFIC CHARACTERISTICS]', 'specific clinical needs')
-    text = text.replace('[SPECIFIC NEEDS]', 'particular therapeutic requirements')
-    
-    # Replace HCP-specific placeholders with actual data
-    if hcp_features:
-        import datetime
-        
-        # Time of day based on current time
-        current_hour = datetime.datetime.now().hour
-        if current_hour < 12:
-            time_of_day = "morning"
-        elif current_hour < 17:
-            time_of_day = "afternoon"
-        else:
-            time_of_day = "evening"
-        
-        text = text.replace('{time_of_day}', time_of_day)
-        text = text.replace('{product_focus}', product)
-        
-        # HCP name (use actual name if available)
-        hcp_name = hcp_features.get('ProfessionalName', hcp_features.get('hcp_name', 'Doctor'))
-        text = text.replace('{hcp_name}', hcp_name)
-        
-        # Specialty
-        specialty = hcp_features.get('ProfessionalDesignation', hcp_features.get('specialty', 'your specialty'))
-        text = text.replace('{specialty}', specialty)
-        
-        # Competitive threat (simplified - use top competitor)
-        text = text.replace('{competitive_threat}', 'generic levothyroxine')
-        
-        # TRx decline percentage (calculate if data available)
-        trx_decline = abs(hcp_features.get('trx_trend_6m', 0))
-        text = text.replace('{trx_decline_pct}', f"{trx_decline:.0f}")
-    
-    return text
+    return compile_text(text).render(placeholder_context(product, artifacts, hcp_features))
 
 
-def replace_placeholders_in_script(script: Any, product: str, hcp_features: Dict = None) -> Any:
+def replace_placeholders_in_script(script: Any, product: str, artifacts: ServingArtifacts, hcp_features: Dict = None) -> Any:
     """
     Replace ALL placeholders in script object with approved content AND HCP data
     
+    Sections are rendered into new objects, so the shared template dicts the
+    script was built from are never modified.
+    
     Args:
         script: GeneratedScript object
         product: Product name for content retrieval
+        artifacts: Artifact version serving the request
         hcp_features: HCP data dictionary for personalization
     
     Returns:
         Script with all placeholders replaced
     """
-    # Replace in talking points
-    if script.talking_points:
-        for i, point in enumerate(script.talking_points):
-            if isinstance(point, dict):
-                if 'message' in point:
-                    point['message'] = replace_placeholders_in_text(point['message'], product, hcp_features)
-                if 'topic' in point:
-                    point['topic'] = replace_placeholders_in_text(point['topic'], product, hcp_features)
-            elif isinstance(point, str):
-                script.talking_points[i] = replace_placeholders_in_text(point, product, hcp_features)
-    
-    # Replace in objection handlers
-    if script.objection_handlers:
-        for key, handler in script.objection_handlers.items():
-            if isinstance(handler, dict):
-                if 'response' in handler:
-                    handler['response'] = replace_placeholders_in_text(handler['response'], product, hcp_features)
-                if 'objection' in handler:
-                    handler['objection'] = replace_placeholders_in_text(handler['objection'], product, hcp_features)
-            elif isinstance(handler, str):
-                script.objection_handlers[key] = replace_placeholders_in_text(handler, product, hcp_features)
-    
-    # Replace in opening
-    if script.opening:
-        if isinstance(script.opening, dict):
-            if 'greeting' in script.opening:
-                script.opening['greeting'] = replace_placeholders_in_text(script.opening['greeting'], product, hcp_features)
-            if 'purpose' in script.opening:
-                script.opening['purpose'] = replace_placeholders_in_text(script.opening['purpose'], product, hcp_features)
-        elif isinstance(script.opening, str):
-            script.opening = replace_placeholders_in_text(script.opening, product, hcp_features)
-    
-    # Replace in call to action
-    if script.call_to_action:
-        if isinstance(script.call_to_action, dict):
-            for key in ['primary_ask', 'secondary_ask', 'tertiary_ask']:
-                if key in script.call_to_action:
-                    script.call_to_action[key] = replace_placeholders_in_text(script.call_to_action[key], product, hcp_features)
-        elif isinstance(script.call_to_action, str):
-            script.call_to_action = replace_placeholders_in_text(script.call_to_action, product, hcp_features)
+    context = placeholder_context(product, artifacts, hcp_features)
     
-    # Replace in next steps
-    if script.next_steps:
-        for i, step in enumerate(script.next_steps):
-            if isinstance(step, str):
-                script.next_steps[i] = replace_placeholders_in_text(step, product, hcp_features)
-            elif isinstance(step, dict) and 'step' in step:
-                step['step'] = replace_placeholders_in_text(step['step'], product, hcp_features)
+    script.talking_points = render_value(script.talking_points, context)
+    script.objection_handlers = render_value(script.objection_handlers, context)
+    script.opening = render_value(script.opening, context)
+    script.call_to_action = render_value(script.call_to_action, context)
+    script.next_steps = render_value(script.next_steps, context)
     
     # Add safety information for fair balance (FDA requirement)
-    safety_info = get_approved_content(product, 'SAFETY_INFO')
+    safety_info = get_approved_content(product, 'SAFETY_INFO', artifacts)
     if safety_info and safety_info != "[Contact medical affairs for approved content]":
         # Add to required disclaimers
         if not script.required_disclaimers:
@@ -477,7 +667,7 @@ def replace_placeholders_in_script(script: Any, product: str, hcp_features: Dict
         # Add IMPORTANT SAFETY INFORMATION if not already there
         safety_disclaimer = f"IMPORTANT SAFETY INFORMATION: {safety_info}"
         if safety_disclaimer not in script.required_disclaimers:
-            script.required_disclaimers.insert(0, safety_disclaimer)
+            script.required_disclaimers = [safety_disclaimer] + list(script.required_disclaimers)
     
     # Expand disclaimer codes to full MLR-compliant text
     if script.required_disclaimers:
@@ -610,7 +800,7 @@ def format_script_output(script: Any) -> str:
 def classify_scenario(predictions: Dict[str, Any]) -> tuple:
     """Classify call scenario based on predictions"""
     # Simple logic for demo
-    call_success = predictions.get('tirosint_call_success', 0)
+    call_success = predictions.get('tirosint_call_success_prob', 0)
     prescription_lift = predictions.get('tirosint_prescription_lift', 0)
     
     if call_success > 0.7 and prescription_lift > 5:
@@ -627,14 +817,15 @@ def format_compliance_report(compliance_result: Any) -> ComplianceReport:
     # Handle both ComplianceResult object and dict
     if hasattr(compliance_result, 'violations'):
         # It's a ComplianceResult object
+        locations = getattr(compliance_result, 'violation_locations', None) or []
         violations = [
             ValidationViolation(
                 type="COMPLIANCE",
                 severity=compliance_result.severity,
                 details=v,
-                location=None
+                location=f"chars {locations[i][0]}-{locations[i][1]}" if i < len(locations) and locations[i] else None
             )
-            for v in compliance_result.violations
+            for i, v in enumerate(compliance_result.violations)
         ]
         
         # Count by severity
@@ -688,7 +879,9 @@ async def root():
             "health": "/health",
             "generate": "/generate-call-script",
             "validate": "/validate-script",
-            "models": "/models/status"
+            "models": "/models/status",
+            "reload": "/admin/reload",
+            "metrics": "/metrics"
         }
     }
 
@@ -706,12 +899,32 @@ async def health_check():
     """
     start_time = time.time()
     
+    artifacts = registry.current if registry is not None else None
+    script_generator = artifacts.script_generator if artifacts else None
+    compliance_checker = artifacts.compliance_checker if artifacts else None
+    ml_models = artifacts.ml_models if artifacts else {}
+    inference_engine = artifacts.inference_engine if artifacts else None
+    content_index = script_generator.vector_db.content_index if script_generator else None
+    usable_content = content_index.usable_count() if content_index is not None else 0
+    
     components = {
+        "artifacts": {
+            **(registry.status() if registry is not None else {}),
+            "ready": artifacts is not None
+        },
         "script_generator": {
             "status": "operational" if script_generator else "not_loaded",
             "content_pieces": len(script_generator.vector_db.content_library) if script_generator else 0,
+            "content_index_version": content_index.version if content_index is not None else None,
             "ready": script_generator is not None
         },
+        "approved_content": {
+            "status": "operational" if usable_content else ("no_usable_content" if content_index is not None else "not_loaded"),
+            "items": len(content_index) if content_index is not None else 0,
+            "usable_items": usable_content,
+            "allow_expired": config.ALLOW_EXPIRED_CONTENT,
+            "ready": usable_content > 0
+        },
         "compliance_checker": {
             "status": "operational" if compliance_checker else "not_loaded",
             "prohibited_terms": len(compliance_checker.prohibited_terms) if compliance_checker else 0,
@@ -721,16 +934,36 @@ async def health_check():
         "ml_models": {
             "status": "operational" if ml_models else "not_loaded",
             "loaded_count": len(ml_models),
+            "inference_batches": inference_engine.batches_run if inference_engine else 0,
+            "inference_requests": inference_engine.requests_served if inference_engine else 0,
+            "model_version": inference_engine.model_version if inference_engine else None,
+            "backends": artifacts.model_backends if artifacts else {},
+            "prediction_cache_size": len(prediction_cache),
+            "prediction_cache_hits": prediction_cache.hits,
+            "prediction_cache_misses": prediction_cache.misses,
             "ready": len(ml_models) > 0
         },
         "feature_data": {
-            "status": "operational" if feature_data is not None else "not_loaded",
-            "hcp_count": len(feature_data) if feature_data is not None else 0,
-            "ready": feature_data is not None
+            "status": "operational" if feature_store is not None else "not_loaded",
+            "hcp_count": len(feature_store) if feature_store is not None else 0,
+            "ready": feature_store is not None
+        },
+        "script_cache": {
+            "status": "operational" if script_cache is not None else "not_loaded",
+            "memory_entries": len(script_cache) if script_cache is not None else 0,
+            "memory_hits": script_cache.memory_hits if script_cache is not None else 0,
+            "disk_hits": script_cache.disk_hits if script_cache is not None else 0,
+            "disk_evictions": script_cache.disk_evictions if script_cache is not None else 0,
+            "misses": script_cache.misses if script_cache is not None else 0,
+            "source_versions": script_cache.source_versions if script_cache is not None else {},
+            "ready": script_cache is not None
         },
         "faiss_index": {
-            "status": "operational" if Path(config.FAISS_INDEX_PATH).exists() else "not_found",
-            "ready": Path(config.FAISS_INDEX_PATH).exists()
+            "status": "operational" if script_generator and script_generator.vector_db.index is not None else "not_found",
+            "index_version": script_generator.vector_db.index_version if script_generator else None,
+            "query_cache_size": len(script_generator.vector_db.query_cache) if script_generator else 0,
+            "query_cache_hits": script_generator.vector_db.query_cache.hits if script_generator else 0,
+            "ready": script_generator is not None and script_generator.vector_db.index is not None
         }
     }
     
@@ -747,6 +980,63 @@ async def health_check():
         version="1.0.0"
     )
 
+def collect_component_metrics():
+    """Scrape-time cache, inference and reload counters from the live components"""
+    artifacts = registry.current if registry is not None else None
+    
+    cache_samples = [
+        ({'cache': 'prediction', 'result': 'hit'}, prediction_cache.hits),
+        ({'cache': 'prediction', 'result': 'miss'}, prediction_cache.misses)
+    ]
+    if script_cache is not None:
+        cache_samples += [
+            ({'cache': 'script', 'result': 'memory_hit'}, script_cache.memory_hits),
+            ({'cache': 'script', 'result': 'disk_hit'}, script_cache.disk_hits),
+            ({'cache': 'script', 'result': 'miss'}, script_cache.misses)
+        ]
+    if artifacts is not None:
+        query_cache = artifacts.script_generator.vector_db.query_cache
+        cache_samples += [
+            ({'cache': 'query_embedding', 'result': 'hit'}, query_cache.hits),
+            ({'cache': 'query_embedding', 'result': 'miss'}, query_cache.misses)
+        ]
+    yield ('cache_requests_total', 'counter', 'Cache lookups by cache and result', cache_samples)
+    
+    yield ('cache_entries', 'gauge', 'Entries currently held per cache', [
+        ({'cache': 'prediction'}, len(prediction_cache)),
+        ({'cache': 'script'}, len(script_cache) if script_cache is not None else 0),
+        ({'cache': 'query_embedding'}, len(artifacts.script_generator.vector_db.query_cache) if artifacts else 0)
+    ])
+    
+    if artifacts is not None:
+        engine = artifacts.inference_engine
+        yield ('inference_batches_total', 'counter', 'Micro-batches run by the inference engine (current version)',
+               [({}, engine.batches_run)])
+        yield ('inference_requests_total', 'counter', 'HCPs scored by the inference engine (current version)',
+               [({}, engine.requests_served)])
+    
+    if registry is not None:
+        yield ('artifact_reloads_total', 'counter', 'Artifact hot reloads by outcome', [
+            ({'outcome': 'ok'}, registry.reloads),
+            ({'outcome': 'failed'}, registry.failed_reloads)
+        ])
+        yield ('artifact_generation', 'gauge', 'Generation of the artifact version being served',
+               [({}, registry.generation)])
+
+METRICS.register_collector(collect_component_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["System"])
+async def metrics():
+    """
+    Prometheus metrics (text exposition format)
+    
+    - script_stage_seconds{stage} - per-stage latency histograms
+    - api_request_seconds / api_requests_total - per-endpoint latency and throughput
+    - cache_requests_total{cache,result} - prediction, script and query-embedding caches
+    - llm_* - GPT-4 calls, tokens and estimated cost
+    """
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/generate-call-script", response_model=ScriptResponse, tags=["Script Generation"])
 @limiter.limit("30/minute")
 async def generate_call_script(
@@ -772,76 +1062,106 @@ async def generate_call_script(
     
     logger.info(f"Script generation request: HCP={body.hcp_id}, GPT4={body.include_gpt4}")
     
+    # The whole request runs on one artifact version, even if a reload swaps in another
+    lease = acquire_artifacts()
+    artifacts = lease.value
+    script_generator = artifacts.script_generator
+    
     try:
         # 1. Load HCP features
         hcp_features = load_hcp_features(body.hcp_id)
         logger.info(f"[OK] Loaded HCP features: {len(hcp_features)} attributes")
         
-        # 2. Run ML predictions
-        predictions = run_ml_predictions(hcp_features)
-        logger.info(f"[OK] ML predictions: {predictions}")
+        # 2. Run ML predictions (cached per HCP and model version)
+        predictions = summarize_model_predictions(await get_hcp_predictions(body.hcp_id, artifacts))
+        logger.info(f"[OK] ML predictions: {len(predictions)} outputs")
         
         # 3. Classify scenario
         if body.force_scenario:
             scenario = body.force_scenario.upper()
             priority = 'HIGH'
         else:
-            scenario, priority = classify_scenario(predictions)
+            with time_stage('scenario_classification'):
+                scenario, priority = classify_scenario(predictions)
         
         logger.info(f"[OK] Scenario: {scenario} (Priority: {priority})")
         
-        # 4. Generate script (HybridScriptGenerator handles features/predictions internally)
-        script_result = script_generator.generate_script(
-            hcp_id=body.hcp_id,
-            use_gpt4=body.include_gpt4,
-            use_rag=True
+        # 4. Reuse a cached script if nothing that shapes it has changed. Sources are keyed by
+        #    content hash (not the artifact version, which every hot reload bumps) and the
+        #    greeting by its time-of-day bucket; cache file I/O runs off the event loop.
+        loop = asyncio.get_running_loop()
+        use_gpt4 = body.include_gpt4 and script_generator.gpt4_enhancer.client is not None
+        cache_key = script_cache_key(
+            hcp_features, predictions, scenario,
+            source_versions=script_cache.source_versions,
+            gpt_model=script_generator.gpt4_enhancer.model if use_gpt4 else '',
+            options={'use_rag': True, 'model_version': script_generator.model_version,
+                     'time_of_day': time_of_day()}
         )
+        script_result = await loop.run_in_executor(None, script_cache.get, cache_key)
+        cache_hit = script_result is not None
         
-        # 4.5. Replace ALL placeholders with actual MLR-approved content AND HCP data (FDA/MRC/MLR compliance)
-        product_focus = script_result.predictions.get('product_focus', 'Tirosint')
-        script_result = replace_placeholders_in_script(script_result, product_focus, hcp_features)
+        if not cache_hit:
+            # 4.1. Generate script (reuses the features and predictions loaded above;
+            #      CPU stages run on the script pool, GPT-4 via the async client)
+            script_result = await script_generator.generate_script_async(
+                hcp_id=body.hcp_id,
+                use_gpt4=body.include_gpt4,
+                use_rag=True,
+                hcp_features=hcp_features,
+                predictions=predictions,
+                executor=script_executor
+            )
+            
+            # 4.5. Replace ALL placeholders with actual MLR-approved content AND HCP data (FDA/MRC/MLR compliance)
+            product_focus = script_result.predictions.get('product_focus', 'Tirosint')
+            with time_stage('template_fill'):
+                script_result = replace_placeholders_in_script(script_result, product_focus, artifacts, hcp_features)
+            await loop.run_in_executor(None, script_cache.put, cache_key, script_result)
+        else:
+            logger.info(f"[OK] Script cache hit: HCP={body.hcp_id}")
         
         # Extract scenario and priority from the generated script object
         scenario = script_result.scenario.value if hasattr(script_result.scenario, 'value') else str(script_result.scenario)
         priority = script_result.priority
         predictions = script_result.predictions
         
-        # 5. Format compliance report
-        compliance_report = format_compliance_report(script_result.compliance_result)
+        # 5. Format compliance report and build structured script output
+        with time_stage('formatting'):
+            compliance_report = format_compliance_report(script_result.compliance_result)
+            
+            script_dict = {
+                'hcp_id': script_result.hcp_id,
+                'scenario': scenario,
+                'priority': priority,
+                'opening': script_result.opening,
+                'talking_points': script_result.talking_points,
+                'objection_handlers': script_result.objection_handlers,
+                'call_to_action': script_result.call_to_action,
+                'next_steps': script_result.next_steps,
+                'required_disclaimers': script_result.required_disclaimers,
+                'formatted_text': format_script_output(script_result),
+                'metadata': {
+                    'template_used': script_result.template_used,
+                    'gpt4_enhanced': script_result.gpt4_enhanced,
+                    'generation_method': script_result.generation_method,
+                    'rag_content_used': len(script_result.rag_content_used),
+                    'generated_at': script_result.generated_at,
+                    'model_versions': script_result.model_versions
+                }
+            }
         
         # 6. Calculate metrics
         generation_time = time.time() - start_time
         
-        # 7. Build structured script output
-        script_dict = {
-            'hcp_id': script_result.hcp_id,
-            'scenario': scenario,
-            'priority': priority,
-            'opening': script_result.opening,
-            'talking_points': script_result.talking_points,
-            'objection_handlers': script_result.objection_handlers,
-            'call_to_action': script_result.call_to_action,
-            'next_steps': script_result.next_steps,
-            'required_disclaimers': script_result.required_disclaimers,
-            'formatted_text': format_script_output(script_result),
-            'metadata': {
-                'template_used': script_result.template_used,
-                'gpt4_enhanced': script_result.gpt4_enhanced,
-                'generation_method': script_result.generation_method,
-                'rag_content_used': len(script_result.rag_content_used),
-                'generated_at': script_result.generated_at,
-                'model_versions': script_result.model_versions
-            }
-        }
-        
-        # 8. Audit log
+        # 7. Audit log
         logger.info(
             f"Script generated: HCP={body.hcp_id}, Scenario={scenario}, "
             f"Compliant={compliance_report.is_compliant}, Time={generation_time:.2f}s, "
-            f"Cost=${script_result.estimated_cost:.4f}"
+            f"Cost=${0.0 if cache_hit else script_result.estimated_cost:.4f}, Cached={cache_hit}"
         )
         
-        # 9. Build response
+        # 8. Build response
         response = ScriptResponse(
             hcp_id=body.hcp_id,
             scenario=scenario,
@@ -852,10 +1172,11 @@ async def generate_call_script(
                 'predictions': predictions,
                 'method': script_result.generation_method,
                 'approval_sources': script_result.approval_sources,
-                'content_pieces_used': len(script_result.rag_content_used)
+                'content_pieces_used': len(script_result.rag_content_used),
+                'cache_hit': cache_hit
             },
             generation_time_seconds=round(generation_time, 2),
-            cost_usd=script_result.estimated_cost
+            cost_usd=0.0 if cache_hit else script_result.estimated_cost
         )
         
         return response
@@ -868,6 +1189,8 @@ async def generate_call_script(
             status_code=500,
             detail=f"Script generation failed: {str(e)}"
         )
+    finally:
+        registry.release(lease)
 
 @app.post("/validate-script", response_model=ComplianceReport, tags=["Compliance"])
 @limiter.limit("60/minute")
@@ -890,9 +1213,11 @@ async def validate_script(
     """
     logger.info(f"Validation request: {len(body.script_text)} chars")
     
+    lease = acquire_artifacts()
     try:
         # Run compliance check
-        compliance_result = compliance_checker.check_compliance(body.script_text)
+        with time_stage('compliance_check'):
+            compliance_result = lease.value.compliance_checker.check_script(body.script_text, body.disclaimers_included)
         
         # Format report
         report = format_compliance_report(compliance_result)
@@ -910,6 +1235,63 @@ async def validate_script(
             status_code=500,
             detail=f"Validation failed: {str(e)}"
         )
+    finally:
+        registry.release(lease)
+
+@app.post("/validate-scripts", tags=["Compliance"])
+@limiter.limit("10/minute")
+async def validate_scripts(
+    request: Request,
+    body: BulkValidateRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Validate many scripts for MLR compliance in one request
+    
+    Scripts are checked in parallel on the validation process pool and
+    streamed back as NDJSON (one JSON object per line, in request order)
+    as soon as each is ready:
+    {"id", "is_compliant", "severity", "violations", "violation_locations", ...}
+    
+    For a full re-audit of stored scripts, use validate_scripts_bulk.py.
+    
+    Rate limit: 10 requests/minute
+    """
+    if len(body.scripts) > config.MAX_BULK_VALIDATION_SCRIPTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {config.MAX_BULK_VALIDATION_SCRIPTS} scripts per request"
+        )
+    
+    logger.info(f"Bulk validation request: {len(body.scripts)} scripts")
+    records = [item.model_dump() for item in body.scripts]
+    
+    # Held until the stream finishes, so a reload never closes the pool mid-response
+    lease = acquire_artifacts()
+    release_lock = threading.Lock()
+    released = False
+    
+    def release_lease():
+        # Called by both the background task and the generator - release exactly once
+        nonlocal released
+        with release_lock:
+            if released:
+                return
+            released = True
+        registry.release(lease)
+    
+    # Sync generator - Starlette iterates it in a worker thread, off the event loop.
+    # Its finally covers errors mid-stream; the background task covers client disconnects,
+    # where the abandoned generator is never closed.
+    def ndjson_lines():
+        try:
+            for result in validate_stream(records, lease.value.validation_pool):
+                yield json.dumps(result) + "\n"
+        finally:
+            release_lease()
+    
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson",
+                             background=BackgroundTask(release_lease))
 
 @app.get("/models/status", response_model=ModelsStatusResponse, tags=["Models"])
 async def get_models_status(api_key: str = Depends(verify_api_key)):
@@ -963,7 +1345,7 @@ async def get_models_status(api_key: str = Depends(verify_api_key)):
         
         response = ModelsStatusResponse(
             total_models=len(expected_models),
-            loaded_models=len(ml_models),
+            loaded_models=len(registry.current.ml_models) if registry is not None and registry.current else 0,
             models=models_info
         )
         
@@ -976,6 +1358,43 @@ async def get_models_status(api_key: str = Depends(verify_api_key)):
             detail=f"Failed to retrieve models status: {str(e)}"
         )
 
+@app.post("/admin/reload", tags=["System"])
+@limiter.limit("6/minute")
+async def reload_artifacts(
+    request: Request,
+    force: bool = False,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Hot-reload compliance rules, templates, content index and models
+    
+    The new version is loaded in the background while the current one keeps
+    serving; requests already running finish on the version they started on.
+    Without `force`, nothing is reloaded unless a source file changed.
+    
+    Rate limit: 6 requests/minute
+    """
+    if registry is None:
+        raise HTTPException(status_code=503, detail="Artifact registry not initialized")
+    
+    previous_version = registry.version
+    failed_before = registry.failed_reloads
+    logger.info(f"Reload requested (force={force}), serving {previous_version}")
+    
+    swapped = await registry.reload(force=force, reason='admin request')
+    if registry.failed_reloads > failed_before:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Reload failed, still serving {previous_version}: {registry.last_error}"
+        )
+    
+    return {
+        "reloaded": swapped,
+        "previous_version": previous_version,
+        "version": registry.version,
+        "status": registry.status()
+    }
+
 # ============================================================================
 # PREDICTION ENDPOINTS
 # ============================================================================
@@ -988,7 +1407,7 @@ class HCPPrediction(BaseModel):
     """HCP prediction response"""
     npi: str
     predictions: Dict[str, Any]
-    aggregate_metrics: Dict[str, float]
+    aggregate_metrics: Dict[str, Any]  # Scores plus NGD class, churn level and sample allocation
     segment: str
     next_best_action: str
     generation_time_seconds: float
@@ -1010,135 +1429,28 @@ async def predict_hcp(
     
     Rate limit: 60 requests/minute
     """
-    import numpy as np
-    
     start_time = time.time()
     logger.info(f"Prediction request for HCP: {body.hcp_id}")
     
+    lease = acquire_artifacts()
     try:
-        # Load HCP features from feature-engineered data
-        hcp_npi = int(body.hcp_id)
-        
-        # Check cache first
-        if feature_data is not None and 'PrescriberId' in feature_data.columns:
-            hcp_row = feature_data[feature_data['PrescriberId'] == hcp_npi]
-            if len(hcp_row) > 0:
-                logger.info(f"Found HCP in cache")
-                hcp_features = hcp_row.iloc[0]
-            else:
-                # Load from full file
-                logger.info(f"HCP not in cache, loading from file...")
-                chunk_found = False
-                for chunk in pd.read_csv(config.FEATURES_FILE, chunksize=100000, low_memory=False):
-                    hcp_row = chunk[chunk['PrescriberId'] == hcp_npi]
-                    if len(hcp_row) > 0:
-                        hcp_features = hcp_row.iloc[0]
-                        chunk_found = True
-                        break
-                
-                if not chunk_found:
-                    raise HTTPException(status_code=404, detail=f"HCP {body.hcp_id} not found in feature data")
-        else:
-            raise HTTPException(status_code=503, detail="Feature data not loaded")
-        
-        # Get numeric features
-        exclude_cols = ['PrescriberId', 'Specialty', 'State', 'Name', 'City', 'Territory', 'Tier']
-        feature_cols = [c for c in hcp_features.index if c not in exclude_cols and 
-                       pd.api.types.is_numeric_dtype(hcp_features[c])]
-        
-        X = pd.DataFrame([hcp_features[feature_cols]]).fillna(0)
-        logger.info(f"Prepared {len(X.columns)} features for prediction")
+        # Run predictions with each model (cached, coalesced with concurrent requests)
+        predictions = dict(await get_hcp_predictions(body.hcp_id, lease.value))
         
-        # Run predictions with each model
-        predictions = {}
-        for product in PRODUCTS:
-            for outcome in OUTCOMES:
-                model_name = f"model_{product}_{outcome}"
-                if model_name in ml_models:
-                    model = ml_models[model_name]
-                    expected_features = model.n_features_in_
-                    
-                    # Prepare feature matrix
-                    if len(X.columns) != expected_features:
-                        if len(X.columns) < expected_features:
-                            X_model = X.copy()
-                            for i in range(expected_features - len(X.columns)):
-                                X_model[f'pad_{i}'] = 0
-                        else:
-                            X_model = X.iloc[:, :expected_features]
-                    else:
-                        X_model = X
-                    
-                    # Predict
-                    if outcome in ['call_success', 'ngd_category']:
-                        pred = model.predict(X_model)[0]
-                        if hasattr(model, 'predict_proba'):
-                            prob = model.predict_proba(X_model)[0, 1]
-                        else:
-                            prob = float(pred)
-                        predictions[f"{product}_{outcome}_pred"] = int(pred)
-                        predictions[f"{product}_{outcome}_prob"] = float(prob)
-                    else:
-                        pred = model.predict(X_model)[0]
-                        predictions[f"{product}_{outcome}_pred"] = float(pred)
-        
-        # Calculate aggregate metrics
-        call_success_cols = [k for k in predictions.keys() if 'call_success_prob' in k]
-        call_success_prob = np.mean([predictions[k] for k in call_success_cols]) if call_success_cols else 0.5
-        
-        lift_cols = [k for k in predictions.keys() if 'prescription_lift_pred' in k]
-        forecasted_lift = np.sum([predictions[k] for k in lift_cols]) if lift_cols else 0
-        
-        sample_effectiveness = call_success_prob * 0.3
-        churn_risk = 1 - call_success_prob
-        expected_roi = forecasted_lift * 15
-        
-        # Determine segment
-        if call_success_prob > 0.7 and forecasted_lift > 10:
-            segment = 'Champions'
-        elif forecasted_lift > 5:
-            segment = 'Growth Opportunities'
-        elif churn_risk > 0.6:
-            segment = 'At-Risk'
-        elif call_success_prob > 0.5:
-            segment = 'Maintain'
-        else:
-            segment = 'Deprioritize'
-        
-        # Determine next best action
-        if churn_risk > 0.7:
-            next_best_action = 'Maintain Engagement'
-        elif forecasted_lift > 10:
-            next_best_action = 'Increase Calls'
-        elif sample_effectiveness < 0.05:
-            next_best_action = 'Sample Drop Only'
-        else:
-            next_best_action = 'Detail Only'
-        
-        # NGD classification
-        ngd_cols = [k for k in predictions.keys() if 'ngd_category_pred' in k]
-        if ngd_cols:
-            ngd_val = predictions[ngd_cols[0]]
-            if ngd_val < 0.25:
-                ngd_classification = 'Decliner'
-            elif ngd_val < 0.5:
-                ngd_classification = 'Stable'
-            elif ngd_val < 0.75:
-                ngd_classification = 'Grower'
-            else:
-                ngd_classification = 'New'
-        else:
-            ngd_classification = 'Stable'
+        # Aggregate metrics, segment and next best action - same rules as Phase 7 batch scoring
+        derived = {name: values[0] for name, values in derive_fields(predictions).items()}
+        segment = str(derived['hcp_segment_name'])
+        next_best_action = str(derived['next_best_action'])
         
         aggregate_metrics = {
-            'call_success_prob': float(call_success_prob),
-            'forecasted_lift': float(forecasted_lift),
-            'sample_effectiveness': float(sample_effectiveness),
-            'churn_risk': float(churn_risk),
-            'expected_roi': float(expected_roi),
-            'ngd_classification': ngd_classification,
-            'churn_risk_level': 'High' if churn_risk > 0.7 else ('Medium' if churn_risk > 0.4 else 'Low'),
-            'sample_allocation': int(sample_effectiveness * 100)
+            'call_success_prob': float(derived['call_success_prob']),
+            'forecasted_lift': float(derived['forecasted_lift']),
+            'sample_effectiveness': float(derived['sample_effectiveness']),
+            'churn_risk': float(derived['churn_risk']),
+            'expected_roi': float(derived['expected_roi']),
+            'ngd_classification': str(derived['ngd_classification']),
+            'churn_risk_level': str(derived['churn_risk_level']),
+            'sample_allocation': int(derived['sample_allocation'])
         }
         
         generation_time = time.time() - start_time
@@ -1161,6 +1473,8 @@ async def predict_hcp(
             status_code=500,
             detail=f"Prediction failed: {str(e)}"
         )
+    finally:
+        registry.release(lease)
 
 # ============================================================================
 # MAIN
@@ -2,13 +2,55 @@
 Phase 7: Score ALL HCPs with Real Trained Models
 Uses actual feature-engineered data and trained models - NO MOCK DATA
 Processes in chunks to handle large dataset efficiently
+
+Pipeline (overlapping stages, flat memory regardless of HCP count):
+  reader  - main process reads CSV chunks, resolves each row's PrescriberId
+            from its key column, and submits them (bounded read-ahead)
+  workers - SCORING_WORKERS processes, each holding the 12 models, score a chunk
+            and derive the UI fields
+  writer  - main process takes results back in chunk order, attaches profiles
+            (PrescriberId hash index, prescriber_index.py) and call history
+            counts, and streams them to the output dataset
+
+Call history is not embedded in the predictions: it lives in its own
+NPI-indexed table (CALL_HISTORY_TABLE_DIR, see call_history_table.py) and
+rows only carry call_count / last_call_date. The legacy CSV still gets the
+call_history_json column the UI detail page parses (EMBED_CALL_HISTORY_JSON).
+
+Output: a State-partitioned Parquet dataset (OUTPUT_DATASET_DIR, see
+prediction_dataset.py) plus, while downstream scripts and the UI still read
+it, the legacy predictions CSV - both written in the same single pass.
+
+Incremental: every HCP's feature vector is fingerprinted together with the
+model versions (prediction_fingerprints.py). Only HCPs that are new or whose
+fingerprint changed since the last run are sent to the workers; the rest
+reuse the previous run's scored columns, and both are merged into the new
+dataset. Run with --full (or INCREMENTAL_SCORING = False) to rescore all.
+
+Feature rows whose key is missing cannot be joined or deduplicated and are
+skipped (counted separately). Run with --row-id-keys (or
+FEATURE_KEYS_ARE_ROW_IDS = True) for legacy feature files whose key column
+holds row ids instead of PrescriberIds.
 """
 
 import pandas as pd
-import pickle
 import numpy as np
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import logging
+import os
+import sys
+
+from call_history_table import CallHistoryTable
+from feature_manifest import FeaturePlan, resolve_manifest
+from hcp_rules import DERIVED_FIELDS, derive_fields
+from model_inference import score_model
+from model_pool import ModelPool, backend_for, source_fingerprint
+from prescriber_index import PrescriberIndex, normalize_ids
+from prediction_dataset import HAS_PYARROW, PredictionDatasetWriter
+from prediction_fingerprints import (FINGERPRINT_FILE, PreviousPredictions, row_fingerprints,
+                                     save_fingerprints, scoring_seed)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,422 +59,606 @@ logger = logging.getLogger(__name__)
 # Paths
 BASE_DIR = Path(__file__).parent
 MODELS_DIR = BASE_DIR / "ibsa-poc-eda" / "outputs" / "models" / "trained_models"
+MODEL_POOL_DIR = MODELS_DIR / "pool"  # Memory-mapped model exports (shared with the API)
+MODEL_BACKEND = 'compiled'  # compiled (native code, falls back to packed) | packed | original
+MODEL_BACKEND_OVERRIDES = {}  # Per-model backend, e.g. {'Tirosint_call_success': 'original'}
 FEATURES_FILE = BASE_DIR / "ibsa-poc-eda" / "outputs" / "features" / "IBSA_Features_CLEANED_20251030_035304.csv"
+PROFILE_FILE = BASE_DIR / "ibsa-poc-eda" / "data" / "Reporting_BI_PrescriberOverview.csv"
+CALL_HISTORY_FILE = BASE_DIR / "ibsa-poc-eda" / "data" / "call_history.csv"
+CALL_HISTORY_TABLE_DIR = BASE_DIR / "ibsa-poc-eda" / "data" / "call_history"  # NPI-indexed side table
 UI_DATA_DIR = BASE_DIR / "ibsa_precall_ui" / "public" / "data"
 PHASE7_OUTPUT_DIR = BASE_DIR / "ibsa-poc-eda" / "outputs" / "phase7"
 PHASE7_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-OUTPUT_FILE = PHASE7_OUTPUT_DIR / "IBSA_ModelReady_Enhanced_WithPredictions.csv"
+OUTPUT_DATASET_DIR = PHASE7_OUTPUT_DIR / "IBSA_ModelReady_Enhanced_WithPredictions"  # Partitioned Parquet
+OUTPUT_FILE = PHASE7_OUTPUT_DIR / "IBSA_ModelReady_Enhanced_WithPredictions.csv"  # Legacy CSV
+WRITE_LEGACY_CSV = True  # Also write OUTPUT_FILE for CSV consumers (UI loader, verify_* scripts)
+EMBED_CALL_HISTORY_JSON = True  # Legacy CSV only: per-row call_history_json for the UI detail page
+PARTITION_COLUMN = 'State'
+
+INCREMENTAL_SCORING = True  # Score only HCPs whose features or models changed since the last run
+SCORING_VERSION = 2  # Bump when scoring/derivation logic changes (forces a full rescore)
 
 CHUNK_SIZE = 10000  # Process 10K HCPs at a time
+SCORING_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # Scoring processes (main process reads and writes)
+CHUNKS_IN_FLIGHT_PER_WORKER = 2  # Read-ahead per worker (bounds memory to a few chunks)
 PRODUCTS = ['Tirosint', 'Flector', 'Licart']
 OUTCOMES = ['call_success', 'prescription_lift', 'ngd_category', 'wallet_share_growth']
 
+# Columns to preserve as metadata (not use for modeling)
+METADATA_COLS = ['PrescriberId', 'Specialty', 'State', 'Name', 'City', 'Territory', 'Tier',
+                 'tirosint_trx', 'flector_trx', 'licart_trx', 'total_trx']
+# Essential HCP data carried into the results
+PRESERVE_COLS = ['Specialty', 'State', 'City', 'Territory', 'Tier',
+                 'tirosint_trx', 'flector_trx', 'licart_trx', 'total_trx']
+FEATURE_KEY_COLUMN = 'PrescriberId'  # Key column of the features file (joined to the profiles)
+# Feature files written before PrescriberId was preserved carry row ids into the unique
+# prescriber overview instead. Set this (or pass --row-id-keys) only for such files.
+FEATURE_KEYS_ARE_ROW_IDS = False
+PROFILE_COLS = ['PrescriberId', 'PrescriberName', 'City', 'State', 'Zipcode', 'TerritoryName',
+                'LicartTargetTier', 'FlectorTargetTier', 'TirosintTargetTier']
+BEST_DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+BEST_TIMES = ['9:00 AM', '10:00 AM', '11:00 AM', '2:00 PM', '3:00 PM', '4:00 PM']
+# Scoring outputs besides the *_prob / *_pred columns (reused as-is for unchanged HCPs)
+SCORED_DERIVED_COLS = list(DERIVED_FIELDS) + ['best_day', 'best_time']
+
 # Create UI data directory if it doesn't exist
 UI_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-def load_model(product, outcome):
-    """Load a trained model"""
+def load_model(product, outcome, model_pool=None):
+    """Load a trained model from the model pool with its configured inference backend"""
     model_path = MODELS_DIR / f"model_{product}_{outcome}.pkl"
     if not model_path.exists():
         logger.warning(f"Model not found: {model_path}")
         return None
     try:
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-        return {'model': model}
+        model_pool = model_pool or ModelPool(MODEL_POOL_DIR)
+        backend = backend_for(model_path.stem, MODEL_BACKEND, MODEL_BACKEND_OVERRIDES)
+        model = model_pool.load(model_path.stem, model_path, backend)
+        return {'model': model, 'path': model_path, 'backend': model_pool.backends[model_path.stem]}
     except Exception as e:
         logger.error(f"Error loading {model_path.name}: {e}")
         return None
 
-def score_hcps():
-    """Score ALL HCPs with all 12 trained models - processes in chunks"""
+# ============================================================================
+# WORKER STAGE (runs in the scoring processes)
+# ============================================================================
+
+# Per-process state, set once by _init_worker
+_worker_models = {}
+_worker_plan = None
+
+def _init_worker(model_specs, feature_plan):
+    """Load every model once per worker (pool exports are mmap'd, so pages are shared)"""
+    global _worker_models, _worker_plan
+    model_pool = ModelPool(MODEL_POOL_DIR)
+    _worker_models = {model_key: model_pool.load(model_path.stem, model_path, backend)
+                      for model_key, (model_path, backend) in model_specs.items()}
+    _worker_plan = feature_plan
+
+def hcp_columns(chunk, npis):
+    """Essential HCP data carried into the results (taken fresh from the features every run)"""
+    available_cols = [c for c in PRESERVE_COLS if c in chunk.columns]
+    chunk_results = chunk[available_cols].copy()
+    chunk_results['NPI'] = npis  # Use real PrescriberId as NPI
+    return chunk_results.rename(columns={'tirosint_trx': 'TRx_Current', 'total_trx': 'TRx_Total'})
+
+def best_contact_times(npis):
+    """
+    (best_day, best_time) per HCP, derived from a hash of the NPI so an HCP
+    gets the same slot in every run, incremental or --full
+    """
+    h = pd.util.hash_array(np.asarray(npis, dtype=str).astype(object))
+    days = np.asarray(BEST_DAYS, dtype=object)[h % np.uint64(len(BEST_DAYS))]
+    times = np.asarray(BEST_TIMES, dtype=object)[(h // np.uint64(len(BEST_DAYS))) % np.uint64(len(BEST_TIMES))]
+    return days, times
+
+def score_chunk(chunk_num, chunk, npis):
+    """
+    Score one chunk with every model and derive the UI fields
+
+    Returns:
+        (chunk results DataFrame, number of models scored)
+    """
+    # Initialize results for this chunk - preserve essential HCP data
+    chunk_results = hcp_columns(chunk, npis)
+
+    # Build each model's exact float32 input matrix from the compiled plan
+    model_matrices = _worker_plan.model_matrices(_worker_plan.base_from_frame(chunk))
+
+    # Score with each model
+    chunk_models_scored = 0
+    for product in PRODUCTS:
+        for outcome in OUTCOMES:
+            model_key = f"{product}_{outcome}"
+            if model_key not in _worker_models:
+                continue
+
+            model = _worker_models[model_key]
+            X_model = model_matrices[model_key]
+
+            try:
+                # Assign predictions - pandas will create new columns
+                for col, values in score_model(model_key, model, X_model).items():
+                    chunk_results[col] = values
+
+                chunk_models_scored += 1
+
+            except Exception as e:
+                logger.error(f"    ✗ Chunk {chunk_num}: error scoring {product}_{outcome}: {e}")
+                logger.error(f"    Model features expected: {model.n_features_in_}, provided: {X_model.shape[1]}")
+                # Initialize columns with default values if assignment fails
+                if outcome in ['call_success', 'ngd_category']:
+                    chunk_results[f"{product}_{outcome}_pred"] = 0
+                    chunk_results[f"{product}_{outcome}_prob"] = 0.5
+                else:
+                    chunk_results[f"{product}_{outcome}_pred"] = 0
+                continue
+
+    # Calculate aggregate predictions and business rules for this chunk (vectorized)
+    prediction_cols = {c: chunk_results[c].to_numpy() for c in chunk_results.columns
+                       if c.endswith('_prob') or c.endswith('_pred')}
+    for col, values in derive_fields(prediction_cols).items():
+        chunk_results[col] = values
+
+    # Best day/time (stable per NPI)
+    chunk_results['best_day'], chunk_results['best_time'] = best_contact_times(npis)
+
+    return chunk_results, chunk_models_scored
+
+# ============================================================================
+# WRITER STAGE (main process, chunk order)
+# ============================================================================
+
+def merge_reused(scored, reused, changed):
+    """
+    Rescored rows and reused previous rows of one chunk, back in feature-file order
+
+    Args:
+        scored: score_chunk results for the changed rows (None if none changed)
+        reused: hcp_columns + previous scored columns for the unchanged rows
+        changed: Boolean mask over the chunk's rows
+    """
+    frame = pd.concat([f for f in (scored, reused) if f is not None], ignore_index=True)
+    positions = np.r_[np.flatnonzero(changed), np.flatnonzero(~changed)]
+    return frame.iloc[np.argsort(positions, kind='stable')].reset_index(drop=True)
+
+def load_profiles():
+    """PrescriberId -> profile (names, territories) hash index, or None if unavailable"""
+    if not PROFILE_FILE.exists():
+        logger.warning(f"⚠️ Prescriber profile file not found: {PROFILE_FILE}")
+        logger.warning("Continuing with NPI only...")
+        return None
+    try:
+        profiles = PrescriberIndex.load(PROFILE_FILE, PROFILE_COLS)
+        logger.info(f"✓ Indexed {len(profiles):,} unique prescriber profiles")
+        return profiles
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load prescriber profiles: {e}")
+        logger.warning("Continuing with NPI only...")
+        return None
+
+def load_call_history():
+    """The NPI-indexed call history table (built from the CSV if missing or stale), or None if unavailable"""
+    if not CALL_HISTORY_FILE.exists():
+        logger.warning(f"⚠️ Call history file not found: {CALL_HISTORY_FILE}")
+        logger.warning("Run export_call_history.py first to create call history data")
+        return None
+    try:
+        logger.info(f"Loading call history table: {CALL_HISTORY_TABLE_DIR}")
+        call_history = CallHistoryTable.open_or_build(CALL_HISTORY_FILE, CALL_HISTORY_TABLE_DIR)
+        logger.info(f"✓ Found {call_history.total_calls:,} call records for {len(call_history):,} unique NPIs")
+        return call_history
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load call history: {e}")
+        logger.warning("Continuing without call history...")
+        return None
+
+def attach_profiles(chunk_results, profiles):
+    """Add real names and territories to a scored chunk by PrescriberId lookup (NPI holds the PrescriberId)"""
+    chunk_results = chunk_results.reset_index(drop=True)
+    attributes = profiles.lookup(chunk_results['NPI'])
+
+    for col in attributes.columns:
+        if col in chunk_results.columns:
+            # Profile data wins where available (City, State)
+            chunk_results[col] = attributes[col].fillna(chunk_results[col])
+        else:
+            chunk_results[col] = attributes[col]
+
+    if 'PrescriberName' in chunk_results.columns:
+        chunk_results['PrescriberName'] = chunk_results['PrescriberName'].fillna('HCP-' + chunk_results['NPI'].astype(str))
+    if 'TerritoryName' in chunk_results.columns:
+        # Keep TerritoryName, use it to update Territory if needed
+        if 'Territory' in chunk_results.columns:
+            chunk_results['Territory'] = chunk_results['TerritoryName'].fillna(chunk_results['Territory'])
+        else:
+            chunk_results['Territory'] = chunk_results['TerritoryName']
+    return chunk_results
+
+def attach_call_history(chunk_results, call_history):
+    """Add call_count and last_call_date per NPI (the calls themselves stay in the side table)"""
+    npis = chunk_results['NPI'].fillna('').to_numpy()
+    chunk_results['call_count'] = call_history.call_counts(npis)
+    chunk_results['last_call_date'] = call_history.last_call_dates(npis)
+    return chunk_results
+
+class PredictionWriter:
+    """
+    Streams finished chunks to the outputs in chunk order
+
+    Rows go to the partitioned Parquet dataset and (optionally) the legacy
+    CSV. Both are written to temporary locations and only replace the
+    previous outputs when the run completes, so a failed run never leaves a
+    truncated predictions file. If call_history is given, CSV rows also get
+    the legacy call_history_json column rendered from it.
+
+    Chunks may carry a _fingerprint column; with a seed, those are saved
+    inside the dataset for the next incremental run (and not written as data).
+    """
+
+    def __init__(self, dataset_dir, csv_path=None, call_history=None, seed=None):
+        self.dataset = PredictionDatasetWriter(dataset_dir, PARTITION_COLUMN) if HAS_PYARROW else None
+        self.call_history = call_history
+        self.seed = seed
+        self._fingerprint_npis = []
+        self._fingerprints = []
+        self.csv_path = Path(csv_path) if csv_path is not None else None
+        self.tmp_path = self.csv_path.with_name(self.csv_path.name + '.tmp') if self.csv_path else None
+        self._file = open(self.tmp_path, 'w', newline='', encoding='utf-8') if self.tmp_path else None
+        self.columns = None
+        self.rows = 0
+
+    def write(self, chunk_results):
+        fingerprints = chunk_results.pop('_fingerprint') if '_fingerprint' in chunk_results.columns else None
+        if fingerprints is not None:
+            self._fingerprint_npis.append(chunk_results['NPI'].to_numpy(dtype=str))
+            self._fingerprints.append(fingerprints.to_numpy(dtype=np.uint64))
+
+        header = self.columns is None
+        if header:
+            self.columns = list(chunk_results.columns)
+        else:
+            chunk_results = chunk_results.reindex(columns=self.columns)
+
+        # Rescored rows are float64, reused ones were read back as float32:
+        # store every float as float32 (the dataset dtype) so both outputs agree
+        float_cols = chunk_results.select_dtypes(include='floating').columns
+        chunk_results = chunk_results.astype({col: np.float32 for col in float_cols})
+
+        if self.dataset is not None:
+            self.dataset.write(chunk_results)
+        if self._file is not None:
+            csv_rows = chunk_results
+            if self.call_history is not None:
+                csv_rows = chunk_results.assign(call_history_json=self.call_history.json_column(chunk_results['NPI']))
+            csv_rows.to_csv(self._file, index=False, header=header)
+        self.rows += len(chunk_results)
+        return chunk_results
+
+    def close(self):
+        if self.dataset is not None:
+            if self.seed is not None and self._fingerprints:
+                save_fingerprints(self.dataset.sidecar_path(FINGERPRINT_FILE), np.concatenate(self._fingerprint_npis),
+                                  np.concatenate(self._fingerprints), self.seed)
+            self.dataset.close()
+        if self._file is not None:
+            self._file.close()
+            os.replace(self.tmp_path, self.csv_path)
+
+    def abort(self):
+        if self.dataset is not None:
+            self.dataset.abort()
+        if self._file is not None:
+            self._file.close()
+            self.tmp_path.unlink(missing_ok=True)
+
+class ScoringSummary:
+    """Running totals for the end-of-run report, so scored rows need not be kept in memory"""
+
+    STAT_COLS = ['call_success_prob', 'forecasted_lift', 'expected_roi']
+    COUNT_COLS = ['hcp_segment_name', 'ngd_classification']
+
+    def __init__(self):
+        self.sample = None
+        self.stats = {}  # column -> [count, sum, sum of squares]
+        self.value_counts = {col: pd.Series(dtype='int64') for col in self.COUNT_COLS}
+        self.with_names = 0
+        self.with_territories = 0
+        self.with_calls = 0
+
+    def update(self, chunk_results):
+        if self.sample is None:
+            self.sample = chunk_results.head(10)
+
+        wallet_cols = [c for c in chunk_results.columns if 'wallet_share_growth_pred' in c]
+        for col in self.STAT_COLS + wallet_cols:
+            if col not in chunk_results.columns:
+                continue
+            values = chunk_results[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            stat = self.stats.setdefault(col, [0, 0.0, 0.0])
+            stat[0] += len(values)
+            stat[1] += float(values.sum())
+            stat[2] += float(np.square(values).sum())
+
+        for col in self.COUNT_COLS:
+            if col in chunk_results.columns:
+                self.value_counts[col] = self.value_counts[col].add(chunk_results[col].value_counts(), fill_value=0)
+
+        if 'PrescriberName' in chunk_results.columns:
+            self.with_names += int((~chunk_results['PrescriberName'].astype(str).str.startswith('HCP-')).sum())
+        if 'TerritoryName' in chunk_results.columns:
+            self.with_territories += int(chunk_results['TerritoryName'].notna().sum())
+        if 'call_count' in chunk_results.columns:
+            self.with_calls += int((chunk_results['call_count'] > 0).sum())
+
+    def mean_std(self, col):
+        """Mean and sample standard deviation of a column over all rows written"""
+        n, total, total_sq = self.stats.get(col, [0, 0.0, 0.0])
+        if n == 0:
+            return float('nan'), float('nan')
+        mean = total / n
+        variance = (total_sq - n * mean * mean) / (n - 1) if n > 1 else float('nan')
+        return mean, float(np.sqrt(max(variance, 0.0)))
+
+    def counts(self, col):
+        return self.value_counts[col].astype('int64').sort_values(ascending=False)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def validate_backends(models, model_paths, model_pool, feature_plan):
+    """
+    Check every model's backend against the original .pkl on the first chunk's real rows
+
+    Returns:
+        model key -> backend the workers should load (models that do not match
+        are scored with the original for this run)
+    """
+    first_chunk = pd.read_csv(FEATURES_FILE, nrows=CHUNK_SIZE, low_memory=False)
+    model_matrices = feature_plan.model_matrices(feature_plan.base_from_frame(first_chunk))
+
+    backends = {}
+    for model_key, model in models.items():
+        model_path = model_paths[model_key]
+        backends[model_key] = backend_for(model_path.stem, MODEL_BACKEND, MODEL_BACKEND_OVERRIDES)
+        matches, max_diff = model_pool.validate(model_path.stem, model_path, model, model_matrices[model_key])
+        if not matches:
+            logger.warning(f"  ⚠️ {model_key}: falling back to the original model")
+            backends[model_key] = 'original'
+    logger.info(f"✓ Backends validated against the original models on {len(first_chunk):,} HCPs")
+    return backends
+
+def score_hcps(incremental=INCREMENTAL_SCORING, row_id_keys=FEATURE_KEYS_ARE_ROW_IDS):
+    """
+    Score ALL HCPs with all 12 trained models - chunks are scored in parallel
+    and streamed to OUTPUT_DATASET_DIR (and the legacy OUTPUT_FILE CSV)
+
+    Args:
+        incremental: Reuse the previous run's predictions for HCPs whose
+            fingerprint (features + model versions) is unchanged
+        row_id_keys: The features file's key column holds row ids into the
+            unique prescriber overview (legacy files), not PrescriberIds
+
+    Returns:
+        Path of the predictions dataset (the CSV without pyarrow), or None if
+        no models could be loaded
+    """
     logger.info("="*80)
     logger.info(f"PHASE 7: SCORING ALL HCPs WITH REAL MODELS")
     logger.info("="*80)
-    
-    # Load PrescriberOverview to get real PrescriberId mapping
-    logger.info("\nLoading PrescriberOverview for real IDs...")
-    profile_file = BASE_DIR / "ibsa-poc-eda" / "data" / "Reporting_BI_PrescriberOverview.csv"
-    prescriber_ids = pd.read_csv(profile_file, usecols=['PrescriberId'], dtype={'PrescriberId': str})
-    prescriber_ids['PrescriberId'] = prescriber_ids['PrescriberId'].str.replace('.0', '', regex=False)
-    logger.info(f"✓ Loaded {len(prescriber_ids):,} real PrescriberId values")
-    
+
     # Load feature-engineered data metadata
     logger.info(f"\nLoading feature-engineered data: {FEATURES_FILE}")
-    
-    # First pass: count total rows
-    total_rows = sum(1 for _ in open(FEATURES_FILE)) - 1  # Subtract header
-    logger.info(f"Total HCPs to score: {total_rows:,}")
-    
-    # Load models once
+
+    # Load models once (for validation here; each worker loads its own copy from the pool)
     logger.info("\nLoading trained models...")
     models = {}
+    model_paths = {}
     models_loaded = 0
+    model_pool = ModelPool(MODEL_POOL_DIR)
     for product in PRODUCTS:
         for outcome in OUTCOMES:
-            model_data = load_model(product, outcome)
+            model_data = load_model(product, outcome, model_pool)
             if model_data:
                 models[f"{product}_{outcome}"] = model_data['model']
+                model_paths[f"{product}_{outcome}"] = model_data['path']
                 models_loaded += 1
-                logger.info(f"  ✓ Loaded {product}_{outcome} (features: {model_data['model'].n_features_in_})")
+                logger.info(f"  ✓ Loaded {product}_{outcome} (features: {model_data['model'].n_features_in_}, "
+                            f"backend: {model_data['backend']})")
             else:
                 logger.warning(f"  ✗ Failed to load {product}_{outcome}")
-    
+
     logger.info(f"\n✓ Loaded {models_loaded}/12 models")
-    
+
     if models_loaded == 0:
         logger.error("No models loaded! Cannot proceed.")
         return None
-    
+
     # Get feature columns from first chunk
     logger.info("\nDetermining feature columns...")
     first_chunk = pd.read_csv(FEATURES_FILE, nrows=100, low_memory=False)
-    # Columns to preserve as metadata (not use for modeling)
-    metadata_cols = ['PrescriberId', 'Specialty', 'State', 'Name', 'City', 'Territory', 'Tier',
-                    'tirosint_trx', 'flector_trx', 'licart_trx', 'total_trx']
-    feature_cols = [c for c in first_chunk.columns if c not in metadata_cols and 
+    feature_cols = [c for c in first_chunk.columns if c not in METADATA_COLS and
                    first_chunk[c].dtype in ['float64', 'int64', 'float32', 'int32']]
-    logger.info(f"Using {len(feature_cols)} numeric features for modeling")
-    logger.info(f"Preserving {len([c for c in metadata_cols if c in first_chunk.columns])} metadata columns")
-    
-    # Process in chunks
-    logger.info(f"\nProcessing data in chunks of {CHUNK_SIZE:,} HCPs...")
-    all_results = []
-    chunk_num = 0
-    total_processed = 0
-    
-    for chunk in pd.read_csv(FEATURES_FILE, chunksize=CHUNK_SIZE, low_memory=False):
-        chunk_num += 1
-        chunk_size = len(chunk)
-        chunk_start_idx = total_processed
-        total_processed += chunk_size
-        logger.info(f"\n{'='*60}")
-        logger.info(f"Processing Chunk {chunk_num}: {chunk_size:,} HCPs ({total_processed:,}/{total_rows:,})")
-        logger.info(f"{'='*60}")
-        
-        # Map row indices to real PrescriberId from PrescriberOverview
-        chunk_real_ids = prescriber_ids.iloc[chunk_start_idx:chunk_start_idx + chunk_size].copy()
-        
-        # Initialize results for this chunk - preserve essential HCP data
-        preserve_cols = ['Specialty', 'State', 'City', 'Territory', 'Tier',
-                        'tirosint_trx', 'flector_trx', 'licart_trx', 'total_trx']
-        available_cols = [c for c in preserve_cols if c in chunk.columns]
-        chunk_results = chunk[available_cols].copy()
-        chunk_results['NPI'] = chunk_real_ids['PrescriberId'].values  # Use real PrescriberId as NPI
-        chunk_results.rename(columns={'tirosint_trx': 'TRx_Current',
-                                     'total_trx': 'TRx_Total'}, inplace=True)
-        
-        # Get numeric features for modeling
-        X = chunk[feature_cols].fillna(0)
-        
-        # Score with each model
-        chunk_models_scored = 0
-        for product in PRODUCTS:
-            for outcome in OUTCOMES:
-                model_key = f"{product}_{outcome}"
-                if model_key not in models:
-                    continue
-                
-                model = models[model_key]
-                expected_features = model.n_features_in_
-                
-                # Prepare feature matrix
-                if len(X.columns) != expected_features:
-                    if len(X.columns) < expected_features:
-                        X_model = X.copy()
-                        for i in range(expected_features - len(X.columns)):
-                            X_model[f'pad_{i}'] = 0
-                    else:
-                        X_model = X.iloc[:, :expected_features]
-                else:
-                    X_model = X
-                
-                try:
-                    if outcome in ['call_success', 'ngd_category']:
-                        predictions = model.predict(X_model)
-                        if hasattr(model, 'predict_proba'):
-                            probabilities = model.predict_proba(X_model)[:, 1]
-                        else:
-                            probabilities = predictions
-                        
-                        # Assign predictions - pandas will create new columns
-                        chunk_results[f"{product}_{outcome}_pred"] = predictions
-                        chunk_results[f"{product}_{outcome}_prob"] = probabilities
-                    else:
-                        predictions = model.predict(X_model)
-                        chunk_results[f"{product}_{outcome}_pred"] = predictions
-                    
-                    chunk_models_scored += 1
-                    
-                except Exception as e:
-                    logger.error(f"    ✗ Error scoring {product}_{outcome}: {e}")
-                    logger.error(f"    Model features expected: {expected_features}, provided: {len(X_model.columns)}")
-                    # Initialize columns with default values if assignment fails
-                    if outcome in ['call_success', 'ngd_category']:
-                        chunk_results[f"{product}_{outcome}_pred"] = 0
-                        chunk_results[f"{product}_{outcome}_prob"] = 0.5
-                    else:
-                        chunk_results[f"{product}_{outcome}_pred"] = 0
-                    continue
-        
-        logger.info(f"✓ Chunk scored with {chunk_models_scored}/{len(models)} model predictions")
-        
-        # Calculate aggregate predictions for this chunk
-        logger.info("  Calculating derived fields...")
-        
-        # Overall call success (average across products)
-        call_success_cols = [c for c in chunk_results.columns if 'call_success_prob' in c]
-        if call_success_cols:
-            chunk_results['call_success_prob'] = chunk_results[call_success_cols].mean(axis=1)
-        else:
-            chunk_results['call_success_prob'] = 0.5
-        
-        # Overall prescription lift (sum across products)
-        lift_cols = [c for c in chunk_results.columns if 'prescription_lift_pred' in c]
-        if lift_cols:
-            chunk_results['forecasted_lift'] = chunk_results[lift_cols].sum(axis=1)
-        else:
-            chunk_results['forecasted_lift'] = 0
-        
-        # Sample effectiveness
-        chunk_results['sample_effectiveness'] = chunk_results['call_success_prob'] * 0.3
-        
-        # NGD classification
-        ngd_cols = [c for c in chunk_results.columns if 'ngd_category_pred' in c]
-        if ngd_cols:
-            # Map numeric predictions back to labels (LabelEncoder uses alphabetical order)
-            # 0 = DECLINER, 1 = GROWER, 2 = NEW
-            def map_ngd(val):
-                if pd.isna(val): return 'Stable'
-                if val == 0: return 'Decliner'
-                elif val == 1: return 'Grower'
-                elif val == 2: return 'New'
-                else: return 'Stable'
-            chunk_results['ngd_classification'] = chunk_results[ngd_cols[0]].apply(map_ngd)
-        else:
-            chunk_results['ngd_classification'] = 'Stable'
-        
-        # Churn risk
-        chunk_results['churn_risk'] = 1 - chunk_results['call_success_prob']
-        chunk_results['churn_risk_level'] = chunk_results['churn_risk'].apply(
-            lambda x: 'High' if x > 0.7 else ('Medium' if x > 0.4 else 'Low')
-        )
-        
-        # HCP Segment
-        def assign_segment(row):
-            if row['call_success_prob'] > 0.7 and row['forecasted_lift'] > 10:
-                return 'Champions'
-            elif row['forecasted_lift'] > 5:
-                return 'Growth Opportunities'
-            elif row['churn_risk'] > 0.6:
-                return 'At-Risk'
-            elif row['call_success_prob'] > 0.5:
-                return 'Maintain'
-            else:
-                return 'Deprioritize'
-        
-        chunk_results['hcp_segment_name'] = chunk_results.apply(assign_segment, axis=1)
-        
-        # Expected ROI
-        chunk_results['expected_roi'] = chunk_results['forecasted_lift'] * 15
-        
-        # Next best action
-        def assign_action(row):
-            if row['churn_risk_level'] == 'High':
-                return 'Maintain Engagement'
-            elif row['forecasted_lift'] > 10:
-                return 'Increase Calls'
-            elif row['sample_effectiveness'] < 0.05:
-                return 'Sample Drop Only'
-            else:
-                return 'Detail Only'
-        
-        chunk_results['next_best_action'] = chunk_results.apply(assign_action, axis=1)
-        
-        # Sample allocation
-        chunk_results['sample_allocation'] = (chunk_results['sample_effectiveness'] * 100).clip(0, 50).round(0).astype(int)
-        
-        # Best day/time
-        np.random.seed(chunk_num)
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-        times = ['9:00 AM', '10:00 AM', '11:00 AM', '2:00 PM', '3:00 PM', '4:00 PM']
-        chunk_results['best_day'] = np.random.choice(days, len(chunk_results))
-        chunk_results['best_time'] = np.random.choice(times, len(chunk_results))
-        
-        # Append to results
-        all_results.append(chunk_results)
-        logger.info(f"  ✓ Chunk complete with {len(chunk_results.columns)} total columns")
-    
-    # Combine all chunks
-    logger.info("\n" + "="*80)
-    logger.info("COMBINING ALL CHUNKS...")
-    logger.info("="*80)
-    final_results = pd.concat(all_results, ignore_index=True)
-    
-    # Save results
-    final_results.to_csv(OUTPUT_FILE, index=False)
-    
-    # Merge with Prescriber Overview data for real names and territories
-    logger.info("\n" + "="*80)
-    logger.info("MERGING WITH PRESCRIBER OVERVIEW DATA...")
-    logger.info("="*80)
-    
-    profile_file = BASE_DIR / "ibsa-poc-eda" / "data" / "Reporting_BI_PrescriberOverview.csv"
-    if profile_file.exists():
+    logger.info(f"Preserving {len([c for c in METADATA_COLS if c in first_chunk.columns])} metadata columns")
+    if FEATURE_KEY_COLUMN not in first_chunk.columns:
+        raise ValueError(f"Features file has no {FEATURE_KEY_COLUMN} column to join HCPs on: {FEATURES_FILE}")
+
+    # Compile per-model feature plan once (manifest order + fill values; legacy models use feature_cols)
+    manifests = {key: resolve_manifest(key, model, model_paths[key], feature_cols)
+                 for key, model in models.items()}
+    feature_plan = FeaturePlan(manifests, list(first_chunk.columns))
+    logger.info(f"Using {len(feature_plan.input_columns)} numeric features for modeling")
+
+    # Check every non-original backend against the original .pkl on real rows once
+    backends = validate_backends(models, model_paths, model_pool, feature_plan)
+    model_specs = {key: (model_paths[key], backends[key]) for key in models}
+    models.clear()  # Workers hold the models from here on
+
+    # Fingerprint seed: model versions + feature layout + scoring version
+    model_versions = {key: source_fingerprint(path) for key, path in model_paths.items()}
+    seed = scoring_seed(model_versions, feature_plan.input_columns, SCORING_VERSION)
+    previous = None
+    if incremental and HAS_PYARROW:
         try:
-            # Load prescriber profiles with only needed columns
-            profile_cols = ['PrescriberId', 'PrescriberName', 'City', 'State', 'Zipcode', 'TerritoryName',
-                           'LicartTargetTier', 'FlectorTargetTier', 'TirosintTargetTier']
-            profiles = pd.read_csv(profile_file, usecols=profile_cols, dtype={'PrescriberId': str}, low_memory=False)
-            profiles['PrescriberId'] = profiles['PrescriberId'].str.replace('.0', '', regex=False)
-            
-            logger.info(f"✓ Loaded {len(profiles):,} prescriber profiles")
-            
-            # CRITICAL: Remove duplicate PrescriberId to prevent row explosion during merge
-            profiles_before = len(profiles)
-            profiles = profiles.drop_duplicates(subset=['PrescriberId'], keep='first')
-            profiles_after = len(profiles)
-            if profiles_before != profiles_after:
-                logger.info(f"⚠️ Removed {profiles_before - profiles_after:,} duplicate PrescriberId entries")
-            
-            logger.info(f"✓ Using {len(profiles):,} unique prescriber profiles for merge")
-            
-            # Merge with predictions - NPI already contains real PrescriberId
-            merged = final_results.merge(
-                profiles,
-                left_on='NPI',
-                right_on='PrescriberId',
-                how='left',
-                suffixes=('', '_profile')
-            )
-            
-            # Update columns with profile data where available
-            if 'PrescriberName' in merged.columns:
-                merged['PrescriberName'] = merged['PrescriberName'].fillna('HCP-' + merged['NPI'].astype(str))
-            if 'TerritoryName' in merged.columns:
-                # Keep TerritoryName, use it to update Territory if needed
-                if 'Territory' in merged.columns:
-                    merged['Territory'] = merged['TerritoryName'].fillna(merged['Territory'])
-                else:
-                    merged['Territory'] = merged['TerritoryName']
-            if 'City_profile' in merged.columns:
-                merged['City'] = merged['City_profile'].fillna(merged.get('City', ''))
-            if 'State_profile' in merged.columns:
-                merged['State'] = merged['State_profile'].fillna(merged.get('State', ''))
-            
-            # Drop duplicate columns
-            cols_to_drop = [c for c in merged.columns if c.endswith('_profile')]
-            if 'PrescriberId' in merged.columns:
-                cols_to_drop.append('PrescriberId')
-            merged = merged.drop(columns=cols_to_drop, errors='ignore')
-            
-            # Save merged results
-            merged.to_csv(OUTPUT_FILE, index=False)
-            final_results = merged
-            
-            logger.info(f"✓ Merged successfully")
-            logger.info(f"✓ Rows with real names: {(~merged['PrescriberName'].astype(str).str.startswith('HCP-')).sum():,}")
-            logger.info(f"✓ Rows with territories: {merged['TerritoryName'].notna().sum():,}")
-            
+            previous = PreviousPredictions.load(OUTPUT_DATASET_DIR, seed, SCORED_DERIVED_COLS)
         except Exception as e:
-            logger.warning(f"⚠️ Could not merge prescriber profiles: {e}")
-            logger.warning("Continuing with NPI only...")
+            logger.warning(f"⚠️ Could not load previous predictions ({e}) - rescoring everything")
+    if previous is not None:
+        logger.info("✓ Incremental run: only new or changed HCPs are rescored")
     else:
-        logger.warning(f"⚠️ Prescriber profile file not found: {profile_file}")
-        logger.warning("Continuing with NPI only...")
-    
-    # Merge call history into final results
+        logger.info("Full run: scoring every HCP")
+
+    # Lookups the writer attaches to every chunk
     logger.info("\n" + "="*80)
-    logger.info("MERGING CALL HISTORY DATA...")
+    logger.info("LOADING PRESCRIBER PROFILES AND CALL HISTORY...")
     logger.info("="*80)
-    
-    call_history_file = BASE_DIR / "ibsa-poc-eda" / "data" / "call_history.csv"
-    if call_history_file.exists():
-        try:
-            import json
-            logger.info(f"Loading call history from: {call_history_file}")
-            df_calls = pd.read_csv(call_history_file, dtype={'npi': str})
-            logger.info(f"✓ Loaded {len(df_calls):,} call records")
-            
-            # Clean NPI values
-            final_results['NPI'] = final_results['NPI'].astype(str).str.strip()
-            df_calls['npi'] = df_calls['npi'].astype(str).str.strip()
-            
-            # Group call history by NPI and convert to JSON
-            logger.info("Grouping call history by NPI...")
-            call_history_grouped = df_calls.groupby('npi').apply(
-                lambda x: x.to_dict('records')
-            ).to_dict()
-            
-            logger.info(f"✓ Found call history for {len(call_history_grouped):,} unique NPIs")
-            
-            # Add call_history column as JSON string
-            def get_call_history_json(npi):
-                if pd.isna(npi):
-                    return '[]'
-                npi_str = str(npi).strip()
-                calls = call_history_grouped.get(npi_str, [])
-                return json.dumps(calls) if calls else '[]'
-            
-            final_results['call_history_json'] = final_results['NPI'].apply(get_call_history_json)
-            
-            # Count HCPs with call history
-            hcps_with_calls = (final_results['call_history_json'] != '[]').sum()
-            logger.info(f"✓ {hcps_with_calls:,} HCPs have call history")
-            logger.info(f"✓ {len(final_results) - hcps_with_calls:,} HCPs have no call history")
-            
-            # FINAL DEDUPLICATION: Remove duplicate NPIs (keep first occurrence)
-            rows_before = len(final_results)
-            final_results = final_results.drop_duplicates(subset=['NPI'], keep='first')
-            rows_after = len(final_results)
-            if rows_before != rows_after:
-                logger.info(f"✅ Removed {rows_before - rows_after:,} duplicate NPI rows (final cleanup)")
-            
-            # Save updated file with call history
-            final_results.to_csv(OUTPUT_FILE, index=False)
-            logger.info(f"✓ Saved {len(final_results):,} unique HCPs with embedded call history")
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Could not merge call history: {e}")
-            logger.warning("Continuing without call history...")
-    else:
-        logger.warning(f"⚠️ Call history file not found: {call_history_file}")
-        logger.warning("Run export_call_history.py first to create call history data")
-    
+    profiles = load_profiles()
+    call_history = load_call_history()
+
+    # Feature keys are PrescriberIds unless configured as legacy row ids
+    if row_id_keys:
+        if profiles is None:
+            raise ValueError("Row-id feature keys need the prescriber profiles to resolve PrescriberIds")
+        logger.warning(f"⚠️ Treating {FEATURE_KEY_COLUMN} in the features file as row ids into the "
+                       f"prescriber overview (FEATURE_KEYS_ARE_ROW_IDS / --row-id-keys)")
+
+    # Reader -> workers -> ordered writer
+    logger.info(f"\nScoring in chunks of {CHUNK_SIZE:,} HCPs with {SCORING_WORKERS} worker processes...")
+    max_in_flight = SCORING_WORKERS * CHUNKS_IN_FLIGHT_PER_WORKER
+    if not HAS_PYARROW:
+        logger.warning("⚠️ pyarrow not installed - writing the CSV only (pip install pyarrow for Parquet output)")
+    writer = PredictionWriter(OUTPUT_DATASET_DIR, OUTPUT_FILE if WRITE_LEGACY_CSV or not HAS_PYARROW else None,
+                              call_history if EMBED_CALL_HISTORY_JSON else None, seed)
+    summary = ScoringSummary()
+    chunk_num = 0
+    total_processed = 0
+    total_rescored = 0
+    duplicate_keys = 0
+    missing_keys = 0
+    seen_npis = set()
+
+    def write_next(pending):
+        """Wait for the oldest chunk (keeps output in chunk order) and stream it to disk"""
+        num, future, changed, reused, fingerprints = pending.popleft()
+        chunk_results, chunk_models_scored = future.result() if future is not None else (None, 0)
+        if reused is not None:
+            chunk_results = merge_reused(chunk_results, reused, changed)
+        chunk_results['_fingerprint'] = fingerprints
+        if profiles is not None:
+            chunk_results = attach_profiles(chunk_results, profiles)
+        if call_history is not None:
+            chunk_results = attach_call_history(chunk_results, call_history)
+        summary.update(writer.write(chunk_results))
+        logger.info(f"✓ Chunk {num} written: {len(chunk_results):,} HCPs, "
+                    f"{chunk_models_scored}/{len(model_specs)} models, {writer.rows:,} total")
+
+    try:
+        with ProcessPoolExecutor(max_workers=SCORING_WORKERS, initializer=_init_worker,
+                                 initargs=(model_specs, feature_plan)) as executor:
+            pending = deque()
+            for chunk in pd.read_csv(FEATURES_FILE, chunksize=CHUNK_SIZE, low_memory=False):
+                chunk_num += 1
+
+                # Join on the key column: real PrescriberId per row (first occurrence of a key wins)
+                keys = chunk[FEATURE_KEY_COLUMN]
+                npis = profiles.resolve(keys, row_id_keys) if profiles is not None else normalize_ids(keys)
+                has_key = npis != ''
+                if not has_key.all():
+                    missing_keys += int((~has_key).sum())
+                    chunk, npis = chunk[has_key], npis[has_key]
+                first_seen = ~(pd.Series(npis).duplicated() | pd.Series(npis).isin(seen_npis)).to_numpy()
+                if not first_seen.all():
+                    duplicate_keys += int((~first_seen).sum())
+                    chunk, npis = chunk[first_seen], npis[first_seen]
+                if len(chunk) == 0:
+                    continue
+                seen_npis.update(npis)
+                total_processed += len(chunk)
+
+                # Only new or changed HCPs go to the workers; the rest reuse last run's outputs
+                fingerprints = row_fingerprints(feature_plan.base_from_frame(chunk), seed)
+                changed = previous.changed(npis, fingerprints) if previous is not None else np.ones(len(chunk), dtype=bool)
+                reused = None
+                if not changed.all():
+                    reused = pd.concat([hcp_columns(chunk[~changed], npis[~changed]).reset_index(drop=True),
+                                        previous.rows(npis[~changed])], axis=1)
+                future = None
+                if changed.any():
+                    future = executor.submit(score_chunk, chunk_num, chunk[changed], npis[changed])
+                    total_rescored += int(changed.sum())
+                pending.append((chunk_num, future, changed, reused, fingerprints))
+
+                while len(pending) >= max_in_flight:
+                    write_next(pending)
+
+            while pending:
+                write_next(pending)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+    logger.info(f"✓ Rescored {total_rescored:,} HCPs, reused {total_processed - total_rescored:,} unchanged predictions")
+    if missing_keys:
+        logger.warning(f"⚠️ Skipped {missing_keys:,} feature rows without a {FEATURE_KEY_COLUMN}")
+    if duplicate_keys:
+        logger.warning(f"⚠️ Skipped {duplicate_keys:,} feature rows repeating an already scored {FEATURE_KEY_COLUMN}")
+    if profiles is not None:
+        logger.info(f"✓ Rows with real names: {summary.with_names:,}")
+        logger.info(f"✓ Rows with territories: {summary.with_territories:,}")
+    if call_history is not None:
+        logger.info(f"✓ Call history table: {CALL_HISTORY_TABLE_DIR}")
+        logger.info(f"✓ {summary.with_calls:,} HCPs have call history")
+        logger.info(f"✓ {writer.rows - summary.with_calls:,} HCPs have no call history")
+
     logger.info("\n" + "="*80)
     logger.info("PHASE 7 COMPLETE - ALL HCPs SCORED")
     logger.info("="*80)
-    logger.info(f"✓ Scored {len(final_results):,} HCPs with {models_loaded} models")
-    logger.info(f"✓ Saved to: {OUTPUT_FILE}")
-    logger.info(f"✓ File size: {OUTPUT_FILE.stat().st_size / (1024*1024):.1f} MB")
+    logger.info(f"✓ Scored {writer.rows:,} HCPs with {models_loaded} models")
+    if writer.dataset is not None:
+        dataset_mb = sum(f.stat().st_size for f in OUTPUT_DATASET_DIR.rglob('*.parquet')) / (1024*1024)
+        logger.info(f"✓ Saved to: {OUTPUT_DATASET_DIR} ({len(writer.dataset.partition_rows)} "
+                    f"{PARTITION_COLUMN} partitions, {dataset_mb:.1f} MB)")
+    if writer.csv_path is not None:
+        logger.info(f"✓ Saved to: {OUTPUT_FILE}")
+        logger.info(f"✓ File size: {OUTPUT_FILE.stat().st_size / (1024*1024):.1f} MB")
     logger.info("\nSample predictions:")
-    print(final_results[['NPI', 'Specialty', 'call_success_prob', 'forecasted_lift', 'ngd_classification', 'hcp_segment_name']].head(10))
-    
+    sample_cols = ['NPI', 'Specialty', 'call_success_prob', 'forecasted_lift', 'ngd_classification', 'hcp_segment_name']
+    print(summary.sample[[c for c in sample_cols if c in summary.sample.columns]])
+
     # Show distribution
     logger.info(f"\nPrediction Distribution:")
-    logger.info(f"  Call Success: {final_results['call_success_prob'].mean():.1%} ± {final_results['call_success_prob'].std():.1%}")
-    logger.info(f"  Forecasted Lift: {final_results['forecasted_lift'].mean():.1f} ± {final_results['forecasted_lift'].std():.1f} TRx")
-    logger.info(f"  Expected ROI: ${final_results['expected_roi'].mean():.0f} ± ${final_results['expected_roi'].std():.0f}")
+    mean, std = summary.mean_std('call_success_prob')
+    logger.info(f"  Call Success: {mean:.1%} ± {std:.1%}")
+    mean, std = summary.mean_std('forecasted_lift')
+    logger.info(f"  Forecasted Lift: {mean:.1f} ± {std:.1f} TRx")
+    mean, std = summary.mean_std('expected_roi')
+    logger.info(f"  Expected ROI: ${mean:.0f} ± ${std:.0f}")
     logger.info(f"\nSegment Distribution:")
-    print(final_results['hcp_segment_name'].value_counts())
-    
+    print(summary.counts('hcp_segment_name'))
+
     # Check if wallet share columns exist before printing
-    wallet_cols = [c for c in final_results.columns if 'wallet_share_growth_pred' in c]
+    wallet_cols = [c for c in summary.stats if 'wallet_share_growth_pred' in c]
     if wallet_cols:
         logger.info(f"\nWallet Share Growth Distribution:")
         for col in wallet_cols:
             product = col.split('_')[0]
-            logger.info(f"  {product}: {final_results[col].mean():.2f} ± {final_results[col].std():.2f}pp")
-    
+            mean, std = summary.mean_std(col)
+            logger.info(f"  {product}: {mean:.2f} ± {std:.2f}pp")
+
     # Show NGD distribution
     logger.info(f"\nNGD Classification Distribution:")
-    print(final_results['ngd_classification'].value_counts())
-    ngd_pct = final_results['ngd_classification'].value_counts(normalize=True) * 100
+    ngd_counts = summary.counts('ngd_classification')
+    print(ngd_counts)
+    ngd_pct = ngd_counts / max(ngd_counts.sum(), 1) * 100
     for category in ['New', 'Grower', 'Decliner']:
         if category in ngd_pct.index:
             logger.info(f"  {category}: {ngd_pct[category]:.1f}%")
-    
-    return final_results
+
+    return OUTPUT_DATASET_DIR if writer.dataset is not None else OUTPUT_FILE
 
 if __name__ == "__main__":
-    results = score_hcps()
+    results = score_hcps(incremental=INCREMENTAL_SCORING and '--full' not in sys.argv[1:],
+                         row_id_keys=FEATURE_KEYS_ARE_ROW_IDS or '--row-id-keys' in sys.argv[1:])
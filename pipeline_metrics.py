@@ -0,0 +1,243 @@
+"""
+Pipeline Metrics - per-stage latency, throughput and LLM cost instrumentation
+
+A small, thread-safe metrics registry rendered in the Prometheus text
+exposition format (served by the API at /metrics), so the script-generation
+path can be broken down by stage without adding a client library:
+
+- script_stage_seconds{stage}          - histogram per pipeline stage
+  (feature_lookup, inference, scenario_classification, template_fill,
+   embedding, faiss_search, llm_call, compliance_check, formatting)
+- llm_calls_total{model,outcome}       - GPT-4 calls by outcome (ok/timeout/error)
+- llm_tokens_total{model,kind}         - prompt / completion tokens
+- llm_cost_usd_total{model}            - estimated spend
+- llm_last_call_*{model}               - gauges for the most recent call
+
+Cache hit/miss counters are read from the caches themselves at scrape time
+via register_collector().
+
+Usage:
+    with time_stage('faiss_search'):
+        distances, indices = index.search(queries, k)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Latency buckets (seconds) - from in-process lookups up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+# (metric name, type, help, [(labels, value), ...]) produced by a collector at scrape time
+Sample = Tuple[Dict[str, str], float]
+MetricFamily = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base for labelled metrics: one value slot per label combination"""
+
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+
+        lines = []
+        for key, (counts, total, count) in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metrics plus scrape-time collectors, rendered as Prometheus text"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        """Add a callback that reports metric families (e.g. cache counters) at scrape time"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+
+        for collector in collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry and the script-generation pipeline metrics
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'script_stage_seconds', 'Latency of each script-generation pipeline stage', ['stage']
+)
+LLM_CALLS = REGISTRY.counter('llm_calls_total', 'GPT-4 enhancement calls by outcome', ['model', 'outcome'])
+LLM_TOKENS = REGISTRY.counter('llm_tokens_total', 'GPT-4 tokens used', ['model', 'kind'])
+LLM_COST = REGISTRY.counter('llm_cost_usd_total', 'Estimated GPT-4 spend in USD', ['model'])
+LLM_LAST_TOKENS = REGISTRY.gauge('llm_last_call_tokens', 'Tokens used by the most recent GPT-4 call', ['model', 'kind'])
+LLM_LAST_COST = REGISTRY.gauge('llm_last_call_cost_usd', 'Estimated cost of the most recent GPT-4 call', ['model'])
+
+
+def time_stage(stage: str):
+    """Context manager observing the block's duration into script_stage_seconds"""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def record_llm_usage(model: str, prompt_tokens: int, completion_tokens: int, cost_usd: float):
+    """Token and cost accounting for one successful GPT-4 call"""
+    LLM_CALLS.inc(model=model, outcome='ok')
+    LLM_TOKENS.inc(prompt_tokens, model=model, kind='prompt')
+    LLM_TOKENS.inc(completion_tokens, model=model, kind='completion')
+    LLM_COST.inc(cost_usd, model=model)
+    LLM_LAST_TOKENS.set(prompt_tokens, model=model, kind='prompt')
+    LLM_LAST_TOKENS.set(completion_tokens, model=model, kind='completion')
+    LLM_LAST_COST.set(cost_usd, model=model)
+
+
+def record_llm_failure(model: str, outcome: str):
+    """Count a GPT-4 call that fell back to the template ('timeout' or 'error')"""
+    LLM_CALLS.inc(model=model, outcome=outcome)
@@ -0,0 +1,344 @@
+"""
+Prediction Dataset - partitioned, typed Parquet output for Phase 7 predictions
+
+Replaces the single ~188MB predictions CSV with a hive-partitioned Parquet
+dataset (one directory per State by default):
+
+    IBSA_ModelReady_Enhanced_WithPredictions/
+        State=CA/part-0.parquet
+        State=NY/part-0.parquet
+        ...
+        _common_metadata          # Arrow schema
+        _manifest.json            # row counts per partition, columns
+
+- typed columns: predictions as float32, integers as nullable int64, text
+  as strings (dictionary-encoded on disk). Column types can be declared up
+  front; the rest are inferred and widened across chunks (int -> float, a
+  column with no values yet -> whatever it later holds) until the first row
+  group is written. Values that cannot be stored without loss raise
+  ValueError instead of being coerced.
+- rows with a missing partition value go to Hive's null partition
+  (State=__HIVE_DEFAULT_PARTITION__) and read back as null
+- zstd compression and per-row-group min/max statistics, so readers can
+  skip row groups and read only the columns/partitions they need
+- written in one streaming pass: chunks are buffered per partition and
+  flushed as row groups (total buffered rows are capped), then the finished
+  dataset replaces the previous one in a single rename
+
+Usage:
+    writer = PredictionDatasetWriter(output_dir)
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+
+    df = read_predictions(output_dir, columns=['NPI', 'call_success_prob'], partitions=['CA'])
+"""
+
+import json
+import logging
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DEFAULT_PARTITION_COLUMN = 'State'
+MISSING_PARTITION = '__HIVE_DEFAULT_PARTITION__'  # Hive's directory name for a null partition value
+ROW_GROUP_ROWS = 50000  # Rows per partition buffered before a row group is written
+MAX_BUFFERED_ROWS = 200000  # Across all partitions; the largest buffer is flushed beyond this
+COMPRESSION = 'zstd'
+FLOAT32_EXACT_INT = 2 ** 24  # Largest integer magnitude float32 stores exactly
+MANIFEST_FILE = '_manifest.json'  # Leading underscore: skipped by dataset readers
+
+
+def _inferred_dtype(series: pd.Series) -> Optional[str]:
+    """Storage dtype implied by one chunk of a column (None while it holds no values)"""
+    if not series.notna().any():
+        return None
+    kind = series.dtype.kind
+    if kind == 'f':
+        return 'float32'
+    if kind in 'iu':
+        return 'Int64'
+    if kind == 'b':
+        return 'boolean'
+    return 'string'
+
+
+def _widened_dtype(current: Optional[str], incoming: Optional[str]) -> Optional[str]:
+    """
+    Storage dtype covering both (int -> float, no values -> anything); other
+    combinations keep the current dtype and are checked value by value
+    """
+    if current is None:
+        return incoming
+    if {current, incoming} == {'Int64', 'float32'}:
+        return 'float32'
+    return current
+
+
+def _converted(col: str, series: pd.Series, dtype: Optional[str]) -> pd.Series:
+    """A column as its storage dtype; raises ValueError instead of losing values"""
+    if dtype is None:
+        return pd.Series([None] * len(series), index=series.index, dtype=object)
+    if dtype == 'string':
+        return series.astype('string')
+    if dtype == 'boolean':
+        try:
+            return series.astype('boolean')
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Column '{col}' has values that are not booleans: {e}") from e
+
+    given = series.notna().to_numpy()
+    if series.dtype == object:
+        given &= (series.astype(str).str.strip() != '').to_numpy()  # Blank text is missing, not lost
+    values = pd.to_numeric(series, errors='coerce')
+    as_float = values.to_numpy(dtype='float64', na_value=np.nan)
+    present = ~np.isnan(as_float)
+    lost = given & ~present
+    if dtype == 'Int64':
+        lost |= present & (as_float != np.round(as_float))
+    elif values.dtype.kind in 'iu':
+        # Integers stored as float32 must survive the round trip
+        lost |= present & (as_float.astype('float32').astype('float64') != as_float)
+    if lost.any():
+        examples = series[lost].head(3).tolist()
+        raise ValueError(f"Column '{col}': {int(lost.sum()):,} value(s) cannot be stored as {dtype} "
+                         f"without loss (e.g. {examples}). Declare its dtype when creating the "
+                         f"PredictionDatasetWriter.")
+    return values.astype(dtype)
+
+
+def _arrow_schema(dtypes: Dict[str, Optional[str]]):
+    types = {'float32': pa.float32(), 'Int64': pa.int64(), 'boolean': pa.bool_(),
+             'string': pa.string(), None: pa.null()}
+    return pa.schema([(col, types[dtype]) for col, dtype in dtypes.items()])
+
+
+def _cast(table, schema):
+    """Cast a buffered chunk to the dataset schema, refusing lossy int64 -> float32 widening"""
+    for field in schema:
+        column = table.column(field.name)
+        if pa.types.is_integer(column.type) and pa.types.is_floating(field.type):
+            largest = pc.max(pc.abs(column)).as_py()
+            if largest is not None and largest > FLOAT32_EXACT_INT:
+                raise ValueError(f"Column '{field.name}' holds integers up to {largest:,} that float32 "
+                                 f"cannot store exactly. Declare its dtype when creating the "
+                                 f"PredictionDatasetWriter.")
+    return table.cast(schema)
+
+
+class PredictionDatasetWriter:
+    """
+    Streams prediction chunks into a partitioned Parquet dataset
+    """
+
+    def __init__(self, root: Union[str, Path], partition_column: str = DEFAULT_PARTITION_COLUMN,
+                 row_group_rows: int = ROW_GROUP_ROWS, max_buffered_rows: int = MAX_BUFFERED_ROWS,
+                 dtypes: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            root: Dataset directory (replaced when the writer is closed)
+            partition_column: Column whose values name the partitions
+            row_group_rows: Rows per partition buffered before a row group is written
+            max_buffered_rows: Rows buffered across all partitions
+            dtypes: Storage dtypes ('float32', 'Int64', 'boolean', 'string') for columns
+                that must not be inferred; other columns are inferred and widened
+                across chunks until the first row group is written
+        """
+        if not HAS_PYARROW:
+            raise ImportError("pyarrow is required for Parquet output: pip install pyarrow")
+        self.root = Path(root)
+        self.partition_column = partition_column
+        self.row_group_rows = row_group_rows
+        self.max_buffered_rows = max_buffered_rows
+        self.declared_dtypes = dict(dtypes or {})
+
+        self.tmp_root = self.root.with_name(f".{self.root.name}.{uuid.uuid4().hex}.tmp")
+        self.tmp_root.mkdir(parents=True)
+        self.dtypes: Optional[Dict[str, Optional[str]]] = None
+        self.schema = None  # Fixed when the first row group is written
+        self._writers: Dict[str, Any] = {}
+        self._buffers: Dict[str, List[Any]] = {}
+        self._buffered: Dict[str, int] = {}
+        self.partition_rows: Dict[str, int] = {}
+        self.rows = 0
+
+    def _typed(self, frame: pd.DataFrame) -> pd.DataFrame:
+        if self.dtypes is None:
+            self.dtypes = {col: self.declared_dtypes.get(col) for col in frame.columns
+                           if col != self.partition_column}
+        data = frame.reindex(columns=list(self.dtypes))
+        for col in self.dtypes:
+            if self.schema is None and col not in self.declared_dtypes:
+                self.dtypes[col] = _widened_dtype(self.dtypes[col], _inferred_dtype(data[col]))
+            # Once row groups are written the types are fixed; values that do not fit raise
+            data[col] = _converted(col, data[col], self.dtypes[col])
+        return data
+
+    def write(self, frame: pd.DataFrame):
+        """Add a chunk (any row order; rows are routed to their partition)"""
+        if self.partition_column in frame.columns:
+            keys = frame[self.partition_column].astype('string').str.strip().replace('', pd.NA)
+            keys = keys.fillna(MISSING_PARTITION)  # Read back as null
+        else:
+            keys = pd.Series(MISSING_PARTITION, index=frame.index)
+
+        typed = self._typed(frame)
+        chunk_schema = _arrow_schema(self.dtypes)
+        for key, positions in keys.groupby(keys, sort=False).indices.items():
+            table = pa.Table.from_pandas(typed.iloc[positions], schema=chunk_schema, preserve_index=False)
+            self._buffers.setdefault(key, []).append(table)
+            self._buffered[key] = self._buffered.get(key, 0) + table.num_rows
+            if self._buffered[key] >= self.row_group_rows:
+                self._flush(key)
+
+        while sum(self._buffered.values()) > self.max_buffered_rows:
+            self._flush(max(self._buffered, key=self._buffered.get))
+
+        self.rows += len(frame)
+
+    def _freeze_schema(self):
+        """Fix the dataset schema (columns that never held a value are stored as strings)"""
+        if self.schema is None:
+            self.dtypes = {col: dtype or 'string' for col, dtype in (self.dtypes or {}).items()}
+            self.schema = _arrow_schema(self.dtypes)
+
+    def _flush(self, key: str):
+        tables = self._buffers.pop(key, [])
+        self._buffered.pop(key, None)
+        if not tables:
+            return
+        self._freeze_schema()
+        writer = self._writers.get(key)
+        if writer is None:
+            partition_dir = self.tmp_root / f"{self.partition_column}={quote(str(key), safe='')}"
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            writer = self._writers[key] = pq.ParquetWriter(
+                partition_dir / 'part-0.parquet', self.schema,
+                compression=COMPRESSION, write_statistics=True
+            )
+        # Buffered chunks may predate a widening: cast all to the dataset schema (safe casts only)
+        table = pa.concat_tables([_cast(t, self.schema) for t in tables])
+        writer.write_table(table, row_group_size=max(table.num_rows, 1))
+        self.partition_rows[key] = self.partition_rows.get(key, 0) + table.num_rows
+
+    def sidecar_path(self, name: str) -> Path:
+        """Path for an extra file shipped inside the dataset (swapped into place with it)"""
+        if not name.startswith('_'):
+            raise ValueError(f"Sidecar file names must start with '_' so dataset readers skip them: {name}")
+        return self.tmp_root / name
+
+    def close(self) -> Dict[str, Any]:
+        """Flush, write metadata and swap the finished dataset into place"""
+        for key in list(self._buffers):
+            self._flush(key)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        if self.dtypes is not None:
+            self._freeze_schema()
+
+        manifest = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'rows': self.rows,
+            'partition_column': self.partition_column,
+            'partitions': dict(sorted(self.partition_rows.items())),
+            'columns': {col: str(field.type) for col, field in
+                        zip(self.schema.names, self.schema)} if self.schema is not None else {},
+            'compression': COMPRESSION
+        }
+        if self.schema is not None:
+            pq.write_metadata(self.schema, self.tmp_root / '_common_metadata')
+        with open(self.tmp_root / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        _swap_into_place(self.tmp_root, self.root)
+        logger.info(f"Wrote {self.rows:,} rows to {self.root} ({len(self.partition_rows)} partitions)")
+        return manifest
+
+    def abort(self):
+        for writer in self._writers.values():
+            try:
+                writer.close()
+            except Exception:
+                pass
+        self._writers.clear()
+        shutil.rmtree(self.tmp_root, ignore_errors=True)
+
+
+def _swap_into_place(new_root: Path, root: Path):
+    """Replace root with new_root (the old dataset is moved aside, then removed)"""
+    old_root = root.with_name(f".{root.name}.{uuid.uuid4().hex}.old")
+    if root.exists():
+        root.rename(old_root)
+    try:
+        new_root.rename(root)
+    except OSError:
+        if old_root.exists():
+            old_root.rename(root)
+        raise
+    shutil.rmtree(old_root, ignore_errors=True)
+
+
+def read_manifest(root: Union[str, Path]) -> Dict[str, Any]:
+    with open(Path(root) / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def open_dataset(root: Union[str, Path]):
+    """pyarrow Dataset over a prediction dataset (partition column typed as string)"""
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow is required to read the prediction dataset: pip install pyarrow")
+    partition_column = read_manifest(root)['partition_column']
+    partitioning = ds.partitioning(pa.schema([(partition_column, pa.string())]), flavor='hive',
+                                   null_fallback=MISSING_PARTITION)
+    return ds.dataset(str(root), format='parquet', partitioning=partitioning), partition_column
+
+
+def _partition_filter(partition_column: str, partitions: Optional[Sequence[str]]):
+    if not partitions:
+        return None
+    return ds.field(partition_column).isin([str(p) for p in partitions])
+
+
+def read_predictions(root: Union[str, Path], columns: Optional[List[str]] = None,
+                     partitions: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Load predictions, reading only the requested columns and partitions
+
+    Args:
+        root: Dataset directory
+        columns: Columns to read (None = all, including the partition column)
+        partitions: Partition values to read, e.g. ['CA', 'NY'] (None = all)
+    """
+    dataset, partition_column = open_dataset(root)
+    table = dataset.to_table(columns=columns, filter=_partition_filter(partition_column, partitions))
+    return table.to_pandas()
+
+
+def iter_predictions(root: Union[str, Path], columns: Optional[List[str]] = None,
+                     partitions: Optional[Sequence[str]] = None,
+                     batch_rows: int = ROW_GROUP_ROWS) -> Iterator[pd.DataFrame]:
+    """Stream predictions as DataFrames of up to batch_rows rows"""
+    dataset, partition_column = open_dataset(root)
+    scanner = dataset.scanner(columns=columns, filter=_partition_filter(partition_column, partitions),
+                              batch_size=batch_rows)
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            yield batch.to_pandas()
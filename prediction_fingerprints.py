@@ -0,0 +1,128 @@
+"""
+Prediction Fingerprints - change detection for incremental Phase 7 scoring
+
+Each scored HCP gets a 64-bit fingerprint of everything its model outputs
+depend on: the exact float32 feature vector the models read, seeded with the
+model versions, the feature layout and the scoring code version. Fingerprints
+are stored next to the predictions they describe (a _fingerprints.npz file
+inside the prediction dataset, swapped into place with it), so the next run
+can tell which HCPs changed and reuse the previous outputs of the rest:
+
+    seed = scoring_seed(model_versions, feature_plan.input_columns, SCORING_VERSION)
+    previous = PreviousPredictions.load(dataset_dir, seed)   # None -> full run
+    fingerprints = row_fingerprints(feature_plan.base_from_frame(chunk), seed)
+    changed = previous.changed(npis, fingerprints)
+    reused = previous.rows(npis[~changed])
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from prediction_dataset import HAS_PYARROW, read_manifest, read_predictions
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_FILE = '_fingerprints.npz'  # Leading underscore: skipped by dataset readers
+_FNV_PRIME = np.uint64(0x100000001B3)
+_CANONICAL_NAN = np.uint64(0x7FC00000)
+
+
+def scoring_seed(model_versions: Dict[str, str], input_columns: Sequence[str], scoring_version: int) -> int:
+    """
+    Seed shared by every row fingerprint of a run
+
+    A new model file, a different feature layout or a bumped scoring version
+    changes the seed, which changes every fingerprint (full rescore).
+    """
+    identity = json.dumps({'models': dict(sorted(model_versions.items())),
+                           'columns': list(input_columns),
+                           'scoring_version': scoring_version}, sort_keys=True)
+    return int.from_bytes(hashlib.blake2b(identity.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def row_fingerprints(base: np.ndarray, seed: int) -> np.ndarray:
+    """
+    64-bit fingerprint per row of a float32 feature matrix (vectorized FNV-1a
+    over the 32-bit words of each row, then a splitmix64 finalizer)
+    """
+    base = np.ascontiguousarray(base, dtype=np.float32)
+    words = base.view(np.uint32).astype(np.uint64)
+    words[np.isnan(base)] = _CANONICAL_NAN  # All NaNs are the same missing value
+
+    h = np.full(base.shape[0], seed, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for j in range(words.shape[1]):
+            h ^= words[:, j]
+            h *= _FNV_PRIME
+        h ^= h >> np.uint64(30)
+        h *= np.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> np.uint64(27)
+        h *= np.uint64(0x94D049BB133111EB)
+        h ^= h >> np.uint64(31)
+    return h
+
+
+def save_fingerprints(path: Union[str, Path], npis: np.ndarray, fingerprints: np.ndarray, seed: int):
+    np.savez(path, npis=np.asarray(npis, dtype=str), fingerprints=np.asarray(fingerprints, dtype=np.uint64),
+             seed=np.uint64(seed))
+
+
+def is_scored_column(column: str, derived_columns: Sequence[str]) -> bool:
+    """Columns produced by scoring (reused for unchanged HCPs); everything else is reattached each run"""
+    return column.endswith(('_prob', '_pred')) or column in derived_columns
+
+
+class PreviousPredictions:
+    """
+    The last run's fingerprints and scored columns, indexed by NPI
+    """
+
+    def __init__(self, npis: np.ndarray, fingerprints: np.ndarray, scored: pd.DataFrame):
+        self.index = pd.Index(npis)
+        self.fingerprints = fingerprints
+        self.scored = scored.reset_index(drop=True)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @classmethod
+    def load(cls, dataset_dir: Union[str, Path], seed: int,
+             derived_columns: Sequence[str]) -> Optional['PreviousPredictions']:
+        """
+        Previous run's outputs, or None if there is nothing reusable
+        (no dataset, no fingerprints, or models/features/scoring changed)
+        """
+        dataset_dir = Path(dataset_dir)
+        path = dataset_dir / FINGERPRINT_FILE
+        if not HAS_PYARROW or not path.exists():
+            return None
+        with np.load(path) as data:
+            if int(data['seed']) != seed:
+                logger.info("Models, features or scoring changed since the last run - rescoring everything")
+                return None
+            npis, fingerprints = data['npis'].astype(object), data['fingerprints']
+
+        columns: List[str] = [c for c in read_manifest(dataset_dir)['columns'] if is_scored_column(c, derived_columns)]
+        frame = read_predictions(dataset_dir, columns=['NPI'] + columns)
+        frame['NPI'] = frame['NPI'].astype(str)
+        scored = frame.drop_duplicates('NPI').set_index('NPI').reindex(npis)
+        logger.info(f"Loaded previous predictions for {len(npis):,} HCPs ({len(columns)} scored columns)")
+        return cls(npis, fingerprints, scored)
+
+    def changed(self, npis: np.ndarray, fingerprints: np.ndarray) -> np.ndarray:
+        """True for HCPs that are new or whose fingerprint differs from the last run"""
+        positions = self.index.get_indexer(np.asarray(npis, dtype=str).astype(object))
+        found = positions >= 0
+        unchanged = found & (self.fingerprints[np.where(found, positions, 0)] == fingerprints)
+        return ~unchanged
+
+    def rows(self, npis: np.ndarray) -> pd.DataFrame:
+        """Previous scored columns for NPIs known to the last run, in the given order"""
+        positions = self.index.get_indexer(np.asarray(npis, dtype=str).astype(object))
+        return self.scored.iloc[positions].reset_index(drop=True)
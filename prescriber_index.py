@@ -0,0 +1,86 @@
+"""
+Prescriber Index - PrescriberId -> profile attributes hash index
+
+Built once per run from Reporting_BI_PrescriberOverview.csv (first row per
+PrescriberId wins), then used to resolve feature-file keys to real
+PrescriberIds and attach profile columns to scored chunks with one hash
+lookup per row, without positional alignment or merges:
+
+    index = PrescriberIndex.load(PROFILE_FILE, PROFILE_COLS)
+    npis = index.resolve(chunk['PrescriberId'])
+    profiles = index.lookup(npis)   # one row per NPI, NaN where unknown
+
+Feature files written before PrescriberId was preserved carry a sequential
+row id instead; resolve(..., sequential=True) maps those ids to the
+PrescriberId at that position of the unique overview (as fix_npi_mapping.py
+did after the fact). Callers must say so explicitly - row ids and real
+PrescriberIds without leading zeros look alike, so this is never guessed.
+"""
+
+import logging
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMN = 'PrescriberId'
+
+
+def normalize_ids(values) -> np.ndarray:
+    """PrescriberIds as clean strings ('123.0' -> '123'); missing ids become ''"""
+    ids = pd.Series(values).astype('string').str.strip().str.replace(r'\.0$', '', regex=True)
+    return ids.fillna('').to_numpy(dtype=object)
+
+
+class PrescriberIndex:
+    """
+    Hash index from PrescriberId to profile attributes
+    """
+
+    def __init__(self, profiles: pd.DataFrame):
+        profiles = profiles.reset_index(drop=True)
+        self.ids = normalize_ids(profiles[KEY_COLUMN])
+        self.index = pd.Index(self.ids)
+        self.attributes = profiles.drop(columns=[KEY_COLUMN])
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @classmethod
+    def load(cls, profile_file: Union[str, Path], columns: Optional[List[str]] = None) -> 'PrescriberIndex':
+        """Read the profile columns once and index them by PrescriberId (first occurrence wins)"""
+        usecols = None if columns is None else list(dict.fromkeys([KEY_COLUMN] + list(columns)))
+        profiles = pd.read_csv(profile_file, usecols=usecols, dtype={KEY_COLUMN: str}, low_memory=False)
+        rows = len(profiles)
+        profiles = profiles[~pd.Series(normalize_ids(profiles[KEY_COLUMN])).duplicated().to_numpy()]
+        logger.info(f"Indexed {len(profiles):,} unique PrescriberIds ({rows:,} profile rows)")
+        return cls(profiles)
+
+    def positions(self, ids) -> np.ndarray:
+        """Row of each PrescriberId in the index (-1 where unknown)"""
+        return self.index.get_indexer(normalize_ids(ids))
+
+    def resolve(self, keys, sequential: bool = False) -> np.ndarray:
+        """
+        Real PrescriberIds for feature-file keys
+
+        Args:
+            keys: The feature file's key column
+            sequential: Keys are row ids into the unique profile table (legacy features)
+        """
+        keys = normalize_ids(keys)
+        if not sequential:
+            return keys
+        rows = pd.to_numeric(pd.Series(keys), errors='coerce').to_numpy()
+        valid = ~np.isnan(rows) & (rows >= 0) & (rows < len(self.ids))
+        resolved = keys.copy()
+        resolved[valid] = self.ids[rows[valid].astype(np.intp)]
+        return resolved
+
+    def lookup(self, ids) -> pd.DataFrame:
+        """Profile attributes for each id, positionally aligned (all-NaN rows for unknown ids)"""
+        # attributes has a RangeIndex, so -1 (unknown) reindexes to a missing row
+        return self.attributes.reindex(self.positions(ids)).reset_index(drop=True)
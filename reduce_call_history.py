@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
 """
 Reduce call_history.csv to most recent 10 calls per HCP
+
+The trimming is the max_calls_per_hcp parameter of the call history table
+(call_history_table.py); this publishes the trimmed CSV and table to the UI.
 """
 
 import pandas as pd
 from pathlib import Path
 
+from call_history_table import HAS_PYARROW, CallHistoryTable, trim_calls
+
+MAX_CALLS_PER_HCP = 10
+
 print("=" * 80)
 print("REDUCING CALL HISTORY TO RECENT CALLS PER HCP")
 print("=" * 80)
@@ -15,16 +22,13 @@ input_path = Path('ibsa-poc-eda/data/call_history.csv')
 print(f"\n📂 Loading: {input_path}")
 print(f"   Size: {input_path.stat().st_size / 1024 / 1024:.1f} MB")
 
-df = pd.read_csv(input_path)
+df = pd.read_csv(input_path, dtype={'npi': str})
 print(f"✅ Loaded: {len(df):,} calls")
 print(f"   Unique HCPs: {df['npi'].nunique():,}")
 
-# Keep only most recent 10 calls per HCP
-print("\n✂️ Reducing to 10 most recent calls per HCP...")
-df['call_date'] = pd.to_datetime(df['call_date'])
-df = df.sort_values('call_date', ascending=False)
-df_reduced = df.groupby('npi').head(10).reset_index(drop=True)
-df_reduced['call_date'] = df_reduced['call_date'].dt.strftime('%Y-%m-%d')
+# Keep only most recent calls per HCP
+print(f"\n✂️ Reducing to {MAX_CALLS_PER_HCP} most recent calls per HCP...")
+df_reduced = trim_calls(df, MAX_CALLS_PER_HCP)
 
 print(f"✅ Reduced to: {len(df_reduced):,} calls")
 print(f"   Unique HCPs: {df_reduced['npi'].nunique():,}")
@@ -36,4 +40,9 @@ df_reduced.to_csv(output_path, index=False)
 
 print(f"\n✅ Saved to: {output_path}")
 print(f"   Size: {output_path.stat().st_size / 1024:.1f} KB")
+
+if HAS_PYARROW:
+    table_dir = output_path.with_suffix('')
+    table = CallHistoryTable.build(df_reduced, table_dir, source_file=output_path)
+    print(f"✅ Call history table: {table_dir} ({table.total_calls:,} calls, {len(table):,} HCPs)")
 print("=" * 80)
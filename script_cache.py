@@ -0,0 +1,289 @@
+"""
+Script Cache - content-addressed cache for generated call scripts
+
+A generated script is fully determined by the HCP feature snapshot, the model
+predictions, the scenario, the call script templates, the approved content
+library, the compliance rules, the GPT model and the time-of-day greeting. ScriptCache keys scripts by a hash of exactly those
+inputs, so a rep re-opening the same HCP gets the stored script back instead
+of another RAG retrieval and GPT-4 round-trip.
+
+Tiers:
+- memory - LRU of GeneratedScript objects (per worker)
+- disk   - one JSON file per key under cache_dir (shared between workers)
+
+Entries expire after `ttl_seconds`. The disk tier is also bounded
+(`max_disk_entries` files / `max_disk_bytes`): expired files are pruned
+first, then the least recently used (file access time, bumped on every disk
+hit). Both tiers are purged when a watched source file
+(compliance_approved_content.json, call_script_templates.json, the
+prohibited-terms and disclaimer rules) changes on disk. Sources are keyed by
+content hash, so an unrelated artifact reload keeps the cache warm.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from phase6d_rag_gpt4_script_generator import GeneratedScript
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 2000
+DEFAULT_DISK_ENTRIES = 50000
+DEFAULT_DISK_BYTES = 512 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 3600
+SOURCE_CHECK_INTERVAL_SECONDS = 5.0
+DISK_PRUNE_INTERVAL_SECONDS = 60.0
+
+
+def file_version(path: Union[str, Path]) -> str:
+    """Content hash of a source file ('missing' if it does not exist)"""
+    path = Path(path)
+    if not path.exists():
+        return 'missing'
+    return hashlib.sha1(path.read_bytes()).hexdigest()[:12]
+
+
+def script_cache_key(hcp_features: Dict[str, Any], predictions: Dict[str, Any],
+                     scenario: str, source_versions: Dict[str, str],
+                     gpt_model: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Cache key for one script generation
+
+    Args:
+        hcp_features: HCP feature snapshot used to fill the template
+        predictions: Model predictions used for scenario classification
+        scenario: Scenario the script is generated for
+        source_versions: Template and content library versions (see ScriptCache.source_versions)
+        gpt_model: GPT model name ('' when enhancement is disabled)
+        options: Any other generation flags that change the output
+    """
+    payload = {
+        'features': hcp_features,
+        'predictions': predictions,
+        'scenario': scenario,
+        'sources': source_versions,
+        'gpt_model': gpt_model,
+        'options': options or {}
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ScriptCache:
+    """
+    Two-tier (memory LRU + on-disk JSON) cache of GeneratedScript objects
+    """
+
+    def __init__(self, cache_dir: Union[str, Path],
+                 watched_files: Optional[Dict[str, Union[str, Path]]] = None,
+                 max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_disk_entries: int = DEFAULT_DISK_ENTRIES,
+                 max_disk_bytes: int = DEFAULT_DISK_BYTES):
+        """
+        Args:
+            cache_dir: Directory for the disk tier
+            watched_files: Source files the cached scripts depend on, by name
+            max_memory_entries: Size of the in-memory LRU
+            ttl_seconds: Entry lifetime in both tiers
+            max_disk_entries: Most script files kept in the disk tier
+            max_disk_bytes: Most bytes kept in the disk tier
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: 'OrderedDict[str, Tuple[float, GeneratedScript]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._watched = {name: Path(path) for name, path in (watched_files or {}).items()}
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self.source_versions: Dict[str, str] = {}
+        self._last_source_check = 0.0
+        self._refresh_sources()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+        self._prune_lock = threading.Lock()
+        self._last_prune = 0.0
+        self.prune_disk()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _stat(self, path: Path) -> Tuple[int, int]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return (-1, -1)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _refresh_sources(self) -> bool:
+        """Re-hash watched files whose stat changed; True if any version changed"""
+        changed = False
+        for name, path in self._watched.items():
+            stat = self._stat(path)
+            if self._stats.get(name) == stat:
+                continue
+            self._stats[name] = stat
+            version = file_version(path)
+            if self.source_versions.get(name) != version:
+                changed = changed or name in self.source_versions
+                self.source_versions[name] = version
+        return changed
+
+    def check_sources(self, force: bool = False):
+        """Invalidate everything if a watched source file changed (rate-limited stat check)"""
+        now = time.monotonic()
+        if not force and now - self._last_source_check < SOURCE_CHECK_INTERVAL_SECONDS:
+            return
+        self._last_source_check = now
+
+        if self._refresh_sources():
+            logger.info(f"Script cache sources changed ({self.source_versions}) - invalidating")
+            self.invalidate()
+
+    def invalidate(self):
+        """Drop every cached script from both tiers"""
+        with self._lock:
+            self._memory.clear()
+        for path in self.cache_dir.glob('*.json'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[GeneratedScript]:
+        """Cached script for a key (memory first, then disk), or None"""
+        self.check_sources()
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                cached_at, script = entry
+                if now - cached_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return script
+                del self._memory[key]
+
+        path = self.cache_dir / f'{key}.json'
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+                if now - record['cached_at'] <= self.ttl_seconds:
+                    script = GeneratedScript.from_dict(record['script'])
+                    self._remember(key, record['cached_at'], script)
+                    self._touch(path, now)
+                    self.disk_hits += 1
+                    return script
+                path.unlink()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Discarding unreadable script cache entry {path.name}: {e}")
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, script: GeneratedScript):
+        """Store a script in both tiers"""
+        cached_at = time.time()
+        self._remember(key, cached_at, script)
+
+        path = self.cache_dir / f'{key}.json'
+        tmp_path = self.cache_dir / f'.{key}.{uuid.uuid4().hex}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'cached_at': cached_at, 'script': script.to_dict()}, f, default=str)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write script cache entry {path.name}: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+        self.prune_disk(force=False)
+
+    @staticmethod
+    def _touch(path: Path, now: float):
+        """Record a disk hit in the file's access time (the LRU order; mtime stays the write time)"""
+        try:
+            os.utime(path, (now, path.stat().st_mtime))
+        except OSError:
+            pass
+
+    def prune_disk(self, force: bool = True) -> int:
+        """
+        Remove expired disk entries, then the least recently used ones until the
+        disk tier is within max_disk_entries and max_disk_bytes
+
+        Unforced calls run at most every DISK_PRUNE_INTERVAL_SECONDS. Safe to run
+        from several workers at once (files another worker removed are skipped).
+
+        Returns:
+            Number of files removed
+        """
+        now = time.monotonic()
+        if not force and now - self._last_prune < DISK_PRUNE_INTERVAL_SECONDS:
+            return 0
+        if not self._prune_lock.acquire(blocking=False):
+            return 0
+        try:
+            self._last_prune = now
+            expire_before = time.time() - self.ttl_seconds
+            entries = []  # (last access, size, path)
+            removed = 0
+            for path in self.cache_dir.glob('*.json'):
+                try:
+                    stat = path.stat()
+                    if stat.st_mtime < expire_before:
+                        path.unlink()
+                        removed += 1
+                        continue
+                except OSError:
+                    continue
+                entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+
+            # Least recently used first, until both limits hold
+            remaining, total_bytes = len(entries), sum(size for _, size, _ in entries)
+            entries.sort(key=lambda entry: entry[0])
+            for _, size, path in entries:
+                if remaining <= self.max_disk_entries and total_bytes <= self.max_disk_bytes:
+                    break
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+                remaining -= 1
+                total_bytes -= size
+            if removed:
+                self.disk_evictions += removed
+                logger.info(f"Script cache disk tier pruned: {removed} file(s) removed")
+            return removed
+        finally:
+            self._prune_lock.release()
+
+    def _remember(self, key: str, cached_at: float, script: GeneratedScript):
+        with self._lock:
+            self._memory[key] = (cached_at, script)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
@@ -0,0 +1,150 @@
+"""
+Script Templates - precompiled placeholder rendering for call script templates
+
+Template text from call_script_templates.json uses two placeholder styles:
+- {slot_name}                 - HCP data ({hcp_name}, {specialty}, feature columns)
+- [UPPER CASE INSTRUCTION]    - approved-content / generic fills
+                                ([INSERT CLINICAL CLAIMS FROM LIBRARY], [PRODUCT])
+
+compile_text() tokenizes a string once into literal runs and slot references
+(memoized per distinct string), so rendering is a single join over the parts
+instead of one full-string str.replace per candidate placeholder. Placeholders
+with no known provider are reported at compile time via `unknown_slots`.
+
+Slots missing from the render context are left as written, matching the old
+str.replace behaviour.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, List, Mapping, Set, Tuple
+
+# Bracket placeholders -> context slot that fills them
+BRACKET_SLOTS = {
+    '[INSERT PRODUCT-SPECIFIC APPROVED MESSAGING FROM LIBRARY]': 'approved_messaging',
+    '[INSERT CLINICAL CLAIMS FROM LIBRARY]': 'approved_clinical',
+    '[USE APPROVED OBJECTION HANDLER: TIR-OBJ-001 or GEN-OBJ-001]': 'approved_objection',
+    '[USE APPROVED OBJECTION HANDLER: TIR-OBJ-001]': 'approved_objection',
+    '[USE APPROVED OBJECTION HANDLER: GEN-OBJ-001]': 'approved_objection',
+    '[PRODUCT]': 'product',
+    '[UNIQUE DIFFERENTIATORS]': 'unique_differentiators',
+    '[SPECIFIC CHARACTERISTICS]': 'specific_characteristics',
+    '[SPECIFIC NEEDS]': 'specific_needs',
+}
+
+# {slot} names filled by the generator / API render contexts
+HCP_SLOTS = {
+    'time_of_day', 'product_focus', 'hcp_name', 'specialty',
+    'competitive_threat', 'trx_decline_pct',
+}
+
+KNOWN_SLOTS = set(BRACKET_SLOTS.values()) | HCP_SLOTS
+
+PLACEHOLDER_PATTERN = re.compile(r'\{([a-z_][a-z0-9_]*)\}|\[([^\[\]]+)\]', re.IGNORECASE)
+
+
+def _is_instruction(inner: str) -> bool:
+    """Upper-case bracket text ("[SPECIFIC NEEDS]") is a placeholder, anything else is prose"""
+    return any(ch.isalpha() for ch in inner) and inner == inner.upper()
+
+
+class CompiledText:
+    """
+    A template string split into literal runs and slot references
+
+    literals has one more entry than slots; rendering interleaves them.
+    """
+
+    __slots__ = ('source', 'literals', 'slots', 'tokens', 'unknown_slots')
+
+    def __init__(self, source: str):
+        self.source = source
+        self.literals: List[str] = []
+        self.slots: List[str] = []
+        self.tokens: List[str] = []  # Original placeholder text, used when a slot is unfilled
+        self.unknown_slots: Set[str] = set()
+
+        pos = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            token = match.group(0)
+            if match.group(1) is not None:
+                slot = match.group(1)
+                if slot not in KNOWN_SLOTS:
+                    self.unknown_slots.add(token)
+            elif token in BRACKET_SLOTS:
+                slot = BRACKET_SLOTS[token]
+            else:
+                if _is_instruction(match.group(2)):
+                    self.unknown_slots.add(token)
+                continue  # Literal text (kept in the next literal run)
+
+            self.literals.append(source[pos:match.start()])
+            self.slots.append(slot)
+            self.tokens.append(token)
+            pos = match.end()
+
+        self.literals.append(source[pos:])
+
+    @property
+    def has_slots(self) -> bool:
+        return bool(self.slots)
+
+    def render(self, context: Mapping[str, Any]) -> str:
+        """Fill slots from context in one pass (unfilled slots keep their placeholder text)"""
+        if not self.slots:
+            return self.source
+
+        parts = [self.literals[0]]
+        for slot, token, literal in zip(self.slots, self.tokens, self.literals[1:]):
+            value = context.get(slot)
+            parts.append(token if value is None else str(value))
+            parts.append(literal)
+        return ''.join(parts)
+
+
+@lru_cache(maxsize=8192)
+def compile_text(text: str) -> CompiledText:
+    """Compiled form of a template string (memoized - templates are a fixed set of strings)"""
+    return CompiledText(text)
+
+
+def render_value(value: Any, context: Mapping[str, Any]) -> Any:
+    """
+    Render every string leaf of a nested template section into a new structure
+
+    The input is never modified, so shared template dicts stay pristine.
+    """
+    if isinstance(value, str):
+        return compile_text(value).render(context)
+    if isinstance(value, dict):
+        return {key: render_value(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render_value(item, context) for item in value]
+    return value
+
+
+def compile_template(template: Any) -> Tuple[int, Set[str]]:
+    """
+    Compile every string in a template up front
+
+    Returns:
+        (number of strings with slots, placeholders with no known provider)
+    """
+    compiled_count = 0
+    unknown: Set[str] = set()
+
+    def walk(value: Any):
+        nonlocal compiled_count
+        if isinstance(value, str):
+            compiled = compile_text(value)
+            compiled_count += compiled.has_slots
+            unknown.update(compiled.unknown_slots)
+        elif isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(template)
+    return compiled_count, unknown
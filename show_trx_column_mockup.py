@@ -1,7 +1,7 @@
 import pandas as pd
 
 # Load sample data
-csv_path = r"ibsa-poc-eda\outputs\phase7\IBSA_ModelReady_Enhanced_WithPredictions_DEDUP.csv"
+csv_path = r"ibsa-poc-eda\outputs\phase7\IBSA_ModelReady_Enhanced_WithPredictions.csv"
 df = pd.read_csv(csv_path)
 
 # Get first 10 records with TRx > 0
@@ -0,0 +1,45 @@
+"""ArtifactRegistry.close() closes every version exactly once, also while versions are retiring"""
+import asyncio
+
+from artifact_registry import ArtifactRegistry
+
+
+def make_registry(closer_delay=0.0):
+    loaded = iter(range(100))
+    closed = []
+
+    async def loader():
+        return next(loaded)
+
+    async def closer(value):
+        await asyncio.sleep(closer_delay)
+        closed.append(value)
+
+    return ArtifactRegistry(loader, closer, drain_timeout=5.0), closed
+
+
+def test_close_while_retiring_version_drains():
+    async def scenario():
+        registry, closed = make_registry()
+        await registry.reload(force=True)
+        lease = registry.acquire()  # Keeps version 0 draining
+        await registry.reload(force=True)
+        await asyncio.sleep(0.01)
+        await registry.close()
+        registry.release(lease)
+        return closed
+
+    assert sorted(asyncio.run(scenario())) == [0, 1]
+
+
+def test_close_while_retire_task_is_in_closer():
+    async def scenario():
+        registry, closed = make_registry(closer_delay=0.2)
+        await registry.reload(force=True)
+        await registry.reload(force=True)
+        await asyncio.sleep(0.05)  # Retire task is now awaiting the closer for version 0
+        await registry.close()
+        return closed
+
+    # Version 0's closer was cancelled mid-way and is not run a second time
+    assert asyncio.run(scenario()) == [1]
@@ -0,0 +1,31 @@
+"""PhraseMatcher reports offsets into the original text"""
+from compliance_matcher import PhraseMatcher, PhraseRole
+
+
+def matcher_for(*phrases):
+    matcher = PhraseMatcher()
+    for phrase in phrases:
+        matcher.add(phrase, PhraseRole('prohibited', phrase))
+    matcher.build()
+    return matcher
+
+
+def spans(matcher, text):
+    return [(m.start, m.end) for m in matcher.scan(text)]
+
+
+def test_offsets_slice_the_match():
+    text = 'Tirosint is a CURE for hypothyroidism'
+    (start, end), = spans(matcher_for('cure'), text)
+    assert text[start:end] == 'CURE'
+
+
+def test_offsets_survive_length_changing_lowercase():
+    text = 'İİ a cure'  # 'İ'.lower() is two characters
+    (start, end), = spans(matcher_for('cure'), text)
+    assert text[start:end] == 'cure'
+
+
+def test_match_inside_an_expanded_character_maps_to_that_character():
+    text = 'İ cure'
+    assert spans(matcher_for('i\u0307'), text) == [(0, 1)]
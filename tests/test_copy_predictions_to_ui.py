@@ -0,0 +1,54 @@
+"""The published UI CSV carries call_history_json rendered from the call history table"""
+import json
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+
+import copy_predictions_to_ui as publish  # noqa: E402
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    predictions = pd.DataFrame({
+        'NPI': ['111', '222'],
+        'Specialty': ['Endocrinology', 'Family Medicine'],
+        'City': ['Austin', 'Boston'],
+        'State': ['TX', 'MA'],
+        'Tirosint_call_success_prob': [0.4, 0.7],
+    })
+    predictions.to_csv(tmp_path / 'predictions.csv', index=False)
+    pd.DataFrame({
+        'npi': ['111', '111'],
+        'call_date': ['2025-01-05', '2025-03-01'],
+        'call_type': ['Detail', 'Lunch'],
+    }).to_csv(tmp_path / 'call_history.csv', index=False)
+
+    monkeypatch.setattr(publish, 'PREDICTIONS_DATASET', tmp_path / 'missing_dataset')
+    monkeypatch.setattr(publish, 'PREDICTIONS_FILE', tmp_path / 'predictions.csv')
+    monkeypatch.setattr(publish, 'OUTPUT_DATASET', tmp_path / 'ui_dataset')
+    monkeypatch.setattr(publish, 'OUTPUT_FILE', tmp_path / 'ui.csv')
+    monkeypatch.setattr(publish, 'CALL_HISTORY_FILE', tmp_path / 'call_history.csv')
+    monkeypatch.setattr(publish, 'CALL_HISTORY_TABLE_DIR', tmp_path / 'call_history')
+    return tmp_path
+
+
+def test_published_csv_has_call_history_json(paths):
+    publish.main()
+
+    published = pd.read_csv(paths / 'ui.csv', dtype={'NPI': str})
+    assert publish.CALL_HISTORY_COLUMN in published.columns
+    history = dict(zip(published['NPI'], published[publish.CALL_HISTORY_COLUMN]))
+    calls = json.loads(history['111'])
+    assert [c['call_date'] for c in calls] == ['2025-03-01', '2025-01-05']
+    assert json.loads(history['222']) == []
+
+
+def test_published_csv_without_call_history(paths):
+    (paths / 'call_history.csv').unlink()
+
+    publish.main()
+
+    published = pd.read_csv(paths / 'ui.csv')
+    assert (published[publish.CALL_HISTORY_COLUMN] == '[]').all()
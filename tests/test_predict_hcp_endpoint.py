@@ -0,0 +1,49 @@
+"""/predict-hcp returns its mixed numeric/text aggregate metrics without a validation error"""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('fastapi')
+pytest.importorskip('slowapi')
+pytest.importorskip('httpx')
+from fastapi.testclient import TestClient  # noqa: E402
+
+import phase6e_fastapi_production_api as api  # noqa: E402
+
+PREDICTIONS = {
+    'Tirosint_call_success_prob': 0.62,
+    'Tirosint_prescription_lift_pred': 3.5,
+    'Tirosint_ngd_category_pred': 1.0,
+    'Flector_call_success_prob': 0.41,
+}
+
+
+class StubRegistry:
+    def release(self, lease):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def predictions(hcp_id, artifacts):
+        return dict(PREDICTIONS)
+
+    monkeypatch.setattr(api, 'registry', StubRegistry())
+    monkeypatch.setattr(api, 'acquire_artifacts', lambda: SimpleNamespace(value=None))
+    monkeypatch.setattr(api, 'get_hcp_predictions', predictions)
+    api.app.dependency_overrides[api.verify_api_key] = lambda: 'test-key'
+    yield TestClient(api.app)
+    api.app.dependency_overrides.pop(api.verify_api_key, None)
+
+
+def test_predict_hcp_returns_aggregate_metrics(client):
+    response = client.post('/predict-hcp', json={'hcp_id': '1234567'})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    metrics = body['aggregate_metrics']
+    assert isinstance(metrics['call_success_prob'], float)
+    assert isinstance(metrics['ngd_classification'], str)
+    assert isinstance(metrics['churn_risk_level'], str)
+    assert isinstance(metrics['sample_allocation'], int)
+    assert body['segment'] and body['next_best_action']
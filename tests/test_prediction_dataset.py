@@ -0,0 +1,55 @@
+"""PredictionDatasetWriter: types widen across chunks, lossy coercion raises, missing states stay null"""
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+
+from prediction_dataset import PredictionDatasetWriter, read_predictions  # noqa: E402
+
+
+def write(root, chunks, **kwargs):
+    writer = PredictionDatasetWriter(root, **kwargs)
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+    return read_predictions(root).sort_values('NPI').reset_index(drop=True)
+
+
+def test_int_column_widens_to_float(tmp_path):
+    frame = write(tmp_path / 'ds', [
+        pd.DataFrame({'NPI': ['1'], 'State': ['CA'], 'calls': [3]}),
+        pd.DataFrame({'NPI': ['2'], 'State': ['CA'], 'calls': [2.5]}),
+    ])
+    assert frame['calls'].tolist() == [3.0, 2.5]
+
+
+def test_empty_text_column_takes_later_strings(tmp_path):
+    frame = write(tmp_path / 'ds', [
+        pd.DataFrame({'NPI': ['1'], 'State': ['CA'], 'PrescriberName': [float('nan')]}),
+        pd.DataFrame({'NPI': ['2'], 'State': ['CA'], 'PrescriberName': ['Dr. Lee']}),
+    ])
+    assert frame['PrescriberName'].tolist()[1] == 'Dr. Lee'
+
+
+def test_lossy_conversion_raises(tmp_path):
+    with pytest.raises(ValueError, match='score'):
+        write(tmp_path / 'ds', [
+            pd.DataFrame({'NPI': ['1'], 'State': ['CA'], 'score': [0.5]}),
+            pd.DataFrame({'NPI': ['2'], 'State': ['CA'], 'score': ['high']}),
+        ], row_group_rows=1)
+
+
+def test_declared_int_column_rejects_fractions(tmp_path):
+    with pytest.raises(ValueError, match='calls'):
+        write(tmp_path / 'ds', [pd.DataFrame({'NPI': ['1'], 'State': ['CA'], 'calls': [2.5]})],
+              dtypes={'calls': 'Int64'})
+
+
+def test_missing_state_reads_back_as_null(tmp_path):
+    frame = write(tmp_path / 'ds', [pd.DataFrame({'NPI': ['1', '2'], 'State': ['CA', None]})])
+    assert frame['State'].iloc[0] == 'CA'
+    assert pd.isna(frame['State'].iloc[1])
@@ -0,0 +1,57 @@
+"""RAG queries built for a real HCP record hit the embeddings warmed at startup"""
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('dotenv')
+
+import phase6d_rag_gpt4_script_generator as phase6d  # noqa: E402
+
+
+class CountingModel:
+    """Stands in for the SentenceTransformer: records every text it embeds"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=64):
+        self.encoded.extend(texts)
+        return np.ones((len(texts), 4), dtype='float32')
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.setattr(phase6d, 'HAS_FAISS', True)
+    vector_db = phase6d.ComplianceAwareVectorDB.__new__(phase6d.ComplianceAwareVectorDB)
+    vector_db.model = CountingModel()
+    vector_db.index = object()
+    vector_db.query_cache = phase6d.QueryEmbeddingCache('test-model', cache_path=tmp_path / 'query_cache.npz')
+    generator = phase6d.HybridScriptGenerator.__new__(phase6d.HybridScriptGenerator)
+    generator.vector_db = vector_db
+    return generator
+
+
+def test_warmed_specialty_query_is_a_cache_hit(generator):
+    generator.warm_rag_queries(['Endocrinology', 'Family Medicine'])
+    model = generator.vector_db.model
+    warmed = len(model.encoded)
+
+    context = {'scenario': phase6d.ScenarioType.RETENTION,
+               'hcp_features': {phase6d.SPECIALTY_FIELD: 'Endocrinology'}}
+    query, _ = phase6d.HybridScriptGenerator._rag_query(context)
+    hits = generator.vector_db.query_cache.hits
+    generator.vector_db.encode_queries([query])
+
+    assert 'endocrinology' in query.lower()
+    assert generator.vector_db.query_cache.hits == hits + 1
+    assert len(model.encoded) == warmed
+
+
+def test_missing_specialty_uses_the_warmed_generic_query(generator):
+    generator.warm_rag_queries([])
+    warmed = len(generator.vector_db.model.encoded)
+
+    context = {'scenario': phase6d.ScenarioType.GROWTH, 'hcp_features': {phase6d.SPECIALTY_FIELD: None}}
+    query, _ = phase6d.HybridScriptGenerator._rag_query(context)
+    generator.vector_db.encode_queries([query])
+
+    assert len(generator.vector_db.model.encoded) == warmed
@@ -0,0 +1,165 @@
+"""
+Training Data - one contiguous float32 feature matrix with key-aligned targets
+
+Phase 6 trains 12 models on the same ~350K HCP feature rows. Loading the
+features as a float64/object DataFrame and copying it per model (reset_index,
+copy, fillna, boolean indexing) is what pushed full-data training into swap.
+TrainingData instead:
+
+- reads the features CSV once, in chunks, straight into a C-contiguous
+  float32 matrix holding only the training columns (the dtype sklearn's
+  trees and LightGBM work in, so fit() does not convert it again)
+- aligns the target table to the feature rows by PrescriberId (positional
+  only when the targets carry no key)
+- computes the median imputation once and fills the matrix in place
+- gives each model the row indices that have its target; callers index the
+  shared matrix once for their train/test split
+
+Usage:
+    data = TrainingData.load(features_file, targets_file, target_columns, exclude_columns)
+    rows = data.rows_with_target('Tirosint_call_success')
+    X_train = data.X[train_rows]
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from feature_manifest import MODEL_INPUT_DTYPE
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMN = 'PrescriberId'
+LOAD_CHUNK_ROWS = 50000
+DTYPE_SAMPLE_ROWS = 1000  # Rows read to decide which columns are numeric
+
+
+def _normalize_keys(values) -> np.ndarray:
+    return pd.Series(values).astype(str).str.strip().str.replace(r'\.0$', '', regex=True).to_numpy(dtype=object)
+
+
+class TrainingData:
+    """
+    Shared, imputed float32 feature matrix plus targets aligned to its rows
+    """
+
+    def __init__(self, keys: np.ndarray, X: np.ndarray, feature_names: List[str],
+                 source_dtypes: Dict[str, str], targets: pd.DataFrame, columns: List[str]):
+        self.keys = keys
+        self.X = X
+        self.feature_names = feature_names
+        self.source_dtypes = source_dtypes
+        self.targets = targets
+        self.columns = columns  # Every column of the features file (for validation)
+        self.fill_values: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self.X.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.X.nbytes)
+
+    @classmethod
+    def load(cls, features_file: Union[str, Path], targets_file: Union[str, Path],
+             target_columns: Sequence[str], exclude_columns: Sequence[str] = (),
+             chunk_rows: int = LOAD_CHUNK_ROWS) -> 'TrainingData':
+        """
+        Load features and targets
+
+        Args:
+            features_file: Phase 4B/4C features CSV (first column is the PrescriberId index)
+            targets_file: Phase 5 targets CSV
+            target_columns: Target columns to keep
+            exclude_columns: Numeric columns that are not training features
+            chunk_rows: Rows parsed per chunk (bounds the float64 parse buffer)
+        """
+        read_kwargs = dict(encoding='utf-8', encoding_errors='ignore')
+        sample = pd.read_csv(features_file, nrows=DTYPE_SAMPLE_ROWS, low_memory=False, **read_kwargs)
+        columns = list(sample.columns)
+        key_source = columns[0]
+        excluded = set(exclude_columns) | {KEY_COLUMN, key_source}
+        numeric = sample.select_dtypes(include=[np.number]).columns
+        feature_names = [c for c in numeric if c not in excluded]
+        source_dtypes = {c: str(sample[c].dtype) for c in feature_names}
+
+        # Chunked parse -> float32 blocks -> one contiguous matrix
+        blocks, key_blocks = [], []
+        for chunk in pd.read_csv(features_file, usecols=[key_source] + feature_names,
+                                 chunksize=chunk_rows, low_memory=False, **read_kwargs):
+            block = np.empty((len(chunk), len(feature_names)), dtype=MODEL_INPUT_DTYPE)
+            for j, col in enumerate(feature_names):
+                values = chunk[col]
+                if values.dtype.kind not in 'biuf':
+                    values = pd.to_numeric(values, errors='coerce')  # Stray text in a numeric column
+                block[:, j] = values.to_numpy(dtype=MODEL_INPUT_DTYPE, na_value=np.nan)
+            blocks.append(block)
+            key_blocks.append(_normalize_keys(chunk[key_source]))
+        X = np.concatenate(blocks) if blocks else np.empty((0, len(feature_names)), dtype=MODEL_INPUT_DTYPE)
+        del blocks
+        keys = np.concatenate(key_blocks) if key_blocks else np.empty(0, dtype=object)
+        logger.info(f"Loaded {X.shape[0]:,} x {X.shape[1]} float32 feature matrix ({X.nbytes / 1024**2:.0f} MB)")
+
+        target_header = pd.read_csv(targets_file, nrows=0, **read_kwargs).columns
+        usecols = [c for c in target_columns if c in target_header]
+        has_key = KEY_COLUMN in target_header
+        targets = pd.read_csv(targets_file, usecols=usecols + ([KEY_COLUMN] if has_key else []),
+                              low_memory=False, **read_kwargs)
+        targets = cls._align_targets(targets, keys, has_key)
+        return cls(keys, np.ascontiguousarray(X), feature_names, source_dtypes, targets, columns)
+
+    @staticmethod
+    def _align_targets(targets: pd.DataFrame, keys: np.ndarray, has_key: bool) -> pd.DataFrame:
+        """Target rows in feature-row order (missing targets where a feature row has none)"""
+        if has_key:
+            target_keys = _normalize_keys(targets.pop(KEY_COLUMN))
+            first = ~pd.Series(target_keys).duplicated().to_numpy()
+            index = pd.Index(target_keys[first])
+            positions = index.get_indexer(keys)
+            aligned = targets[first].reset_index(drop=True).reindex(positions).reset_index(drop=True)
+            logger.info(f"Aligned targets by {KEY_COLUMN}: {int((positions >= 0).sum()):,}/{len(keys):,} "
+                        f"feature rows have targets")
+            return aligned
+
+        # No key in the targets file: rows correspond by position
+        if len(targets) != len(keys):
+            logger.warning(f"Targets have no {KEY_COLUMN} column and {len(targets):,} rows vs "
+                           f"{len(keys):,} feature rows - aligning by position")
+        return targets.reindex(range(len(keys))).reset_index(drop=True)
+
+    def impute(self) -> np.ndarray:
+        """
+        Fill missing features in place with the column medians (0 for all-missing
+        columns), computed once for every model
+
+        Returns:
+            Fill value per feature (what the feature manifests record)
+        """
+        if self.fill_values is not None:
+            return self.fill_values
+        # Column by column: temporaries stay one column wide
+        self.fill_values = np.zeros(self.X.shape[1], dtype=MODEL_INPUT_DTYPE)
+        filled = 0
+        for j in range(self.X.shape[1]):
+            column = self.X[:, j]  # View into X
+            missing = np.isnan(column)
+            if missing.all():
+                column[:] = 0  # All missing: fill value 0
+                filled += len(column)
+                continue
+            self.fill_values[j] = np.median(column[~missing])
+            if missing.any():
+                column[missing] = self.fill_values[j]
+                filled += int(missing.sum())
+        logger.info(f"Imputed {filled:,} missing feature values with column medians")
+        return self.fill_values
+
+    def rows_with_target(self, target_col: str) -> np.ndarray:
+        """Row indices (into X) that have a value for target_col"""
+        return np.flatnonzero(self.targets[target_col].notna().to_numpy())
+
+    def target(self, target_col: str, rows: np.ndarray) -> pd.Series:
+        return pd.Series(self.targets[target_col].to_numpy()[rows])
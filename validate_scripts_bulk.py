@@ -0,0 +1,152 @@
+"""
+Bulk Script Validation - re-run ComplianceChecker over many scripts in parallel
+
+Used after a prohibited-terms / disclaimer update to re-audit every stored
+script under outputs/generated_scripts, and by the API's /validate-scripts
+endpoint. Each worker process builds its ComplianceChecker (and matcher) once;
+scripts are streamed through a process pool in input order and results are
+emitted as NDJSON, one line per script, as soon as they are ready.
+
+Usage:
+    python validate_scripts_bulk.py [scripts_dir] [--out results.ndjson] [--workers N]
+"""
+
+import argparse
+import json
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_SCRIPTS_DIR = Path("ibsa-poc-eda/outputs/generated_scripts")
+DEFAULT_COMPLIANCE_DIR = Path("ibsa-poc-eda/outputs/compliance")
+DEFAULT_CHUNKSIZE = 64
+
+# Per-process checker (set by _init_worker)
+_checker = None
+
+
+def _init_worker(compliance_dir: str):
+    """Process-pool initializer: load the compliance rules once per worker"""
+    global _checker
+    from phase6d_rag_gpt4_script_generator import ComplianceChecker
+    _checker = ComplianceChecker(Path(compliance_dir))
+
+
+def _flatten_text(value: Any) -> List[str]:
+    """All string leaves of a nested script section, in order"""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in _flatten_text(item)]
+    if isinstance(value, (list, tuple)):
+        return [text for item in value for text in _flatten_text(item)]
+    return []
+
+
+def script_record(script: Dict[str, Any], script_id: str) -> Dict[str, Any]:
+    """
+    Validation record for a stored GeneratedScript dict (see GeneratedScript.to_dict)
+
+    The script text is rebuilt from its sections only. required_disclaimers
+    holds disclaimer IDs, which are passed as disclaimers_included (as the
+    generator does) and never added to the text, where words like 'adverse'
+    in an ID would satisfy the fair-balance check.
+    """
+    sections = ['opening', 'talking_points', 'objection_handlers', 'call_to_action', 'next_steps']
+    text = "\n".join(text for section in sections for text in _flatten_text(script.get(section)))
+    disclaimers = script.get('required_disclaimers', []) or []
+    return {
+        'id': script_id,
+        'script_text': text,
+        'disclaimers_included': [d for d in disclaimers if isinstance(d, str)]
+    }
+
+
+def iter_stored_scripts(scripts_dir: Path) -> Iterator[Dict[str, Any]]:
+    """Validation records for every script_*.json under scripts_dir"""
+    for path in sorted(Path(scripts_dir).glob('script_*.json')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                script = json.load(f)
+        except (OSError, ValueError) as e:
+            yield {'id': path.name, 'error': f"Unreadable script: {e}"}
+            continue
+        yield script_record(script, path.name)
+
+
+def validate_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Check one record ({'id', 'script_text', 'disclaimers_included'}) in a worker"""
+    if 'error' in record:
+        return {'id': record.get('id'), 'error': record['error']}
+    try:
+        result = _checker.check_script(record['script_text'], record.get('disclaimers_included') or [])
+    except Exception as e:
+        return {'id': record.get('id'), 'error': str(e)}
+    return {
+        'id': record.get('id'),
+        'is_compliant': result.is_compliant,
+        'severity': result.severity,
+        'violations': result.violations,
+        'violation_locations': result.violation_locations,
+        'prohibited_terms_found': result.prohibited_terms_found,
+        'missing_disclaimers': result.missing_disclaimers,
+        'off_label_detected': result.off_label_detected
+    }
+
+
+def create_pool(compliance_dir: Path = DEFAULT_COMPLIANCE_DIR,
+                workers: Optional[int] = None) -> multiprocessing.pool.Pool:
+    """
+    Process pool whose workers each hold a loaded ComplianceChecker
+
+    Uses the 'spawn' start method so workers never inherit the API's loaded
+    models, threads or event loop.
+    """
+    return multiprocessing.get_context('spawn').Pool(
+        processes=workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(str(compliance_dir),)
+    )
+
+
+def validate_stream(records: Iterable[Dict[str, Any]], pool: multiprocessing.pool.Pool,
+                    chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[Dict[str, Any]]:
+    """Validate records on the pool, yielding results lazily in input order"""
+    return pool.imap(validate_record, records, chunksize=chunksize)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-validate stored call scripts for compliance")
+    parser.add_argument('scripts_dir', nargs='?', default=str(DEFAULT_SCRIPTS_DIR))
+    parser.add_argument('--compliance-dir', default=str(DEFAULT_COMPLIANCE_DIR))
+    parser.add_argument('--out', help="NDJSON output file (default: stdout)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    totals = {'scripts': 0, 'non_compliant': 0, 'errors': 0}
+
+    try:
+        with create_pool(Path(args.compliance_dir), args.workers) as pool:
+            for result in validate_stream(iter_stored_scripts(Path(args.scripts_dir)), pool, args.chunksize):
+                out.write(json.dumps(result) + "\n")
+                totals['scripts'] += 1
+                if 'error' in result:
+                    totals['errors'] += 1
+                elif not result['is_compliant']:
+                    totals['non_compliant'] += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"✓ Validated {totals['scripts']:,} scripts: {totals['non_compliant']:,} non-compliant, "
+          f"{totals['errors']:,} errors", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
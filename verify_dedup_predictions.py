@@ -1,7 +1,7 @@
-"""Verify product-specific predictions are intact in deduplicated CSV"""
+"""Verify product-specific predictions are intact in Phase 7 CSV (unique per NPI)"""
 import pandas as pd
 
-df = pd.read_csv('ibsa-poc-eda/outputs/phase7/IBSA_ModelReady_Enhanced_WithPredictions_DEDUP.csv', nrows=10)
+df = pd.read_csv('ibsa-poc-eda/outputs/phase7/IBSA_ModelReady_Enhanced_WithPredictions.csv', nrows=10)
 
 print('='*80)
 print('PRODUCT-SPECIFIC PREDICTIONS CHECK')
@@ -50,7 +50,7 @@ for i in range(min(3, len(df))):
 print('\n' + '='*80)
 print('✅ ALL PRODUCT-SPECIFIC PREDICTIONS ARE INTACT!')
 print('='*80)
-print(f'\nFile: IBSA_ModelReady_Enhanced_WithPredictions_DEDUP.csv')
+print(f'\nFile: IBSA_ModelReady_Enhanced_WithPredictions.csv')
 print(f'Size: 94.7 MB')
 print(f'Unique HCPs: 221,266')
 print(f'Product columns: {len(product_cols)} (3 products × 6 metrics)')